@@ -4,6 +4,18 @@ import math
 # Constante: Velocidad de la luz (vacío)
 C = 299792458 
 
+# Clases de tráfico (QoS). Prioridad menor = se atiende antes en las colas de los enlaces.
+# "delay": llena primero las rutas de menor delay; "ratio": usa los ratios del split_policy.
+# deadline (segundos de simulación desde el inicio de la transferencia) es opcional.
+TRAFFIC_CLASSES = {
+    "control":   {"priority": 0, "scheduling": "delay", "deadline": 0.5},
+    "telemetry": {"priority": 1, "scheduling": "delay", "deadline": 1.0},
+    "bulk":      {"priority": 2, "scheduling": "ratio", "deadline": None},
+}
+
+# Políticas de reparto entre candidatas (ver TransmissionSimulator.process_and_send)
+SPLIT_POLICIES = ("drl", "single", "hops", "equal")
+
 
 
 def PathDelay(q_delays: list, r_delays: list, distances: list) -> float:
@@ -44,3 +56,65 @@ def TrainingFunction(avg_throughput: float, avg_delay: float, beta1: float = 0.5
     term2 = beta2 * math.log(avg_delay + epsilon)
     return term1 - term2
 
+
+def LargestRemainder(total: int, ratios: list) -> list:
+    # Reparto entero de `total` elementos proporcional a `ratios` (método de Hamilton):
+    # piso de cada cuota y el sobrante a las mayores fracciones. La suma siempre es `total`.
+    weight = sum(ratios)
+    if total <= 0 or weight <= 0:
+        return [0] * len(ratios)
+    quotas = [total * r / weight for r in ratios]
+    counts = [int(q) for q in quotas]
+    remainder = total - sum(counts)
+    order = sorted(range(len(ratios)), key=lambda i: quotas[i] - counts[i], reverse=True)
+    for i in order[:remainder]:
+        counts[i] += 1
+    return counts
+
+def FragmentSize(throughput: float, delay: float, route_bytes: int, header_bytes: int = 24,
+                 min_size: int = 256, max_size: int = 65536, inflight_target: int = 64,
+                 min_fragments: int = 16, max_overhead: float = 0.05) -> int:
+    # Tamaño de fragmento para una ruta a partir de su producto ancho de banda-retraso (BDP).
+    # throughput en Mbps, delay en segundos. Se buscan ~inflight_target fragmentos por BDP:
+    # rutas rápidas usan fragmentos grandes (menos eventos y cabeceras) y rutas lentas
+    # fragmentos pequeños. La cabecera no debe superar max_overhead del paquete y cada ruta
+    # conserva al menos min_fragments fragmentos para poder reequilibrar el multipath.
+    bdp = throughput * 1e6 * delay / 8
+    size = bdp / inflight_target
+    size = max(size, header_bytes * (1 - max_overhead) / max_overhead)
+    size = min(size, route_bytes / min_fragments)
+    size = int(max(min_size, min(max_size, size)))
+    return size - size % 64 if size >= 128 else size
+
+def EarliestFinishSplit(total_bytes: int, delays: list, throughputs: list) -> list:
+    # Reparto "water-filling" para tráfico urgente: se llenan primero las rutas de menor
+    # delay y solo se abre la siguiente cuando terminar por las actuales tardaría más que
+    # su delay. Devuelve ratios (suman 1) que minimizan el instante de llegada del último byte.
+    # delays en segundos, throughputs en Mbps.
+    n = len(delays)
+    if n == 0:
+        return []
+    order = sorted(range(n), key=lambda i: delays[i])
+    rates = [max(tp, 1e-9) * 1e6 / 8 for tp in throughputs]  # bytes/s
+
+    active_rate, weighted_delay, finish = 0.0, 0.0, 0.0
+    for k, i in enumerate(order):
+        active_rate += rates[i]
+        weighted_delay += rates[i] * delays[i]
+        finish = (total_bytes + weighted_delay) / active_rate
+        if k + 1 == n or finish <= delays[order[k + 1]]:
+            break
+
+    shares = [max(0.0, (finish - delays[i]) * rates[i]) for i in range(n)]
+    total = sum(shares)
+    if total <= 0:
+        return [1.0 if i == order[0] else 0.0 for i in range(n)]
+    return [s / total for s in shares]
+
+def Percentile(values: list, p: float) -> float:
+    # Percentil por rango más cercano (p en [0, 100])
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, math.ceil(p / 100 * len(ordered)) - 1)
+    return ordered[min(rank, len(ordered) - 1)]
@@ -0,0 +1,136 @@
+import heapq
+
+# Constante: Velocidad de la luz (vacío)
+C = 299792458
+
+# Escala que traduce backlog de cola (segundos) a carga del satélite.
+# Coincide con q_delay = current_load * 0.05 en ConstellationManager.get_link_metrics,
+# así la carga que ve el router refleja el backlog real de los enlaces.
+QUEUE_DELAY_SCALE = 0.05
+
+
+class Link:
+    """
+    Enlace dirigido u -> v modelado como un servidor FIFO de capacidad limitada.
+
+    No usa un proceso SimPy por enlace: la cola es un heap (prioridad, orden de llegada)
+    y cada paquete solo espera su turno, su serialización y su propagación.
+    El ancho de banda es el disponible en el satélite destino (igual que el router).
+    """
+
+    def __init__(self, env, link_id, node_u, node_v, distance):
+        self.env = env
+        self.link_id = link_id
+        self.node_u = node_u
+        self.node_v = node_v
+        self.propagation = distance / C
+
+        self.busy = False
+        self._queue = []  # heap de (prioridad, seq, ticket)
+        self._seq = 0
+
+        # Estadísticas
+        self.created_at = env.now
+        self.packets = 0
+        self.bytes = 0
+        self.busy_time = 0.0
+        self.total_queue_delay = 0.0
+        self.max_queue_delay = 0.0
+        self.max_queue_len = 0
+        self.dropped = 0
+
+    def transmit(self, size_bytes, priority=0):
+        """
+        Sub-generador SimPy (usar con `yield from`): encola, serializa y propaga un paquete.
+        Retorna el retraso de cola sufrido en este enlace, o None si el paquete se pierde
+        porque alguno de los extremos está caído.
+        Prioridades menores se atienden primero.
+        """
+        if not (self.node_u.is_active and self.node_v.is_active):
+            self.dropped += 1
+            return None
+
+        arrival = self.env.now
+        serialization = (size_bytes * 8) / max(self.node_v.available_bandwidth * 1e6, 1e-9)
+
+        # Retroalimentación: el backlog en el enlace cuenta como carga del satélite destino
+        load_delta = serialization / QUEUE_DELAY_SCALE
+        self.node_v.add_traffic_load(load_delta)
+
+        if self.busy:
+            ticket = self.env.event()
+            heapq.heappush(self._queue, (priority, self._seq, ticket))
+            self._seq += 1
+            self.max_queue_len = max(self.max_queue_len, len(self._queue))
+            yield ticket
+        else:
+            self.busy = True
+
+        queue_delay = self.env.now - arrival
+        yield self.env.timeout(serialization)
+
+        self.node_v.add_traffic_load(-load_delta)
+        self._release()
+
+        if not self.node_v.is_active:
+            # El destino cayó mientras el paquete esperaba o se serializaba
+            self.dropped += 1
+            return None
+
+        self.packets += 1
+        self.bytes += size_bytes
+        self.busy_time += serialization
+        self.total_queue_delay += queue_delay
+        self.max_queue_delay = max(self.max_queue_delay, queue_delay)
+
+        # Propagación + retraso de procesamiento por tráfico de fondo en el nodo destino
+        yield self.env.timeout(self.propagation + self.node_v.background_load * QUEUE_DELAY_SCALE)
+        return queue_delay
+
+    def _release(self):
+        if self._queue:
+            _, _, ticket = heapq.heappop(self._queue)
+            ticket.succeed()
+        else:
+            self.busy = False
+
+    def stats(self):
+        elapsed = self.env.now - self.created_at
+        return {
+            "link": self.link_id,
+            "packets": self.packets,
+            "bytes": self.bytes,
+            "utilization": self.busy_time / elapsed if elapsed > 0 else 0.0,
+            "avg_queue_delay": self.total_queue_delay / self.packets if self.packets else 0.0,
+            "max_queue_delay": self.max_queue_delay,
+            "max_queue_len": self.max_queue_len,
+            "queued": len(self._queue),
+            "dropped": self.dropped,
+        }
+
+
+class LinkManager:
+    """Registro de enlaces de una constelación. Los enlaces se crean al primer uso."""
+
+    def __init__(self, constellation):
+        self.constellation = constellation
+        self.links = {}  # Diccionario mapeado por "S{p}_{s}-S{p}_{s}"
+
+    def get(self, link_id):
+        link = self.links.get(link_id)
+        if link is None:
+            u, v = link_id.split('-')
+            node_u = self.constellation.satellites[u]
+            node_v = self.constellation.satellites[v]
+            distance = self.constellation.fixed_distance(u, v)
+            link = Link(self.constellation.env, link_id, node_u, node_v, distance)
+            self.links[link_id] = link
+        return link
+
+    def stats(self, link_ids=None):
+        """Estadísticas por enlace (solo los usados), ordenadas por utilización descendente."""
+        if link_ids is None:
+            selected = self.links.values()
+        else:
+            selected = [self.links[l] for l in dict.fromkeys(link_ids) if l in self.links]
+        return sorted((l.stats() for l in selected), key=lambda s: s["utilization"], reverse=True)
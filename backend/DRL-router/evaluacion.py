@@ -0,0 +1,355 @@
+"""
+Evaluación offline de modelos entrenados a gran escala.
+
+Cada escenario se genera a partir de su semilla (reproducible) y se simula con cada
+política: los ratios de cada modelo candidato ("drl:<nombre>") y las líneas base de
+transmisor ("hops": todo por la ruta de menos saltos, "equal": reparto uniforme, ...).
+Todas las políticas de un escenario parten de la misma constelación, los mismos fallos
+y el mismo tráfico. Los escenarios se reparten entre los procesos de un pool.
+
+Tipos de escenario:
+    random        un flujo entre dos satélites aleatorios
+    hotspot       varios flujos simultáneos hacia la vecindad de un satélite
+    fail_single   un satélite de las rutas candidatas cae (antes o durante el envío)
+    fail_multi    varios satélites de las rutas candidatas caen
+    fail_plane    cae un plano orbital entero atravesado por las candidatas
+
+Uso (desde la raíz del repo):
+    python backend/DRL-router/evaluacion.py --models a/best_model.pth b/best_model.pth \\
+        --scenarios 2000 --workers 8 --output informe.json
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import multiprocessing
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import simpy
+import torch
+
+import consideraciones
+from satelites import ConstellationManager, NUMBER_OF_PLANES, NUMBER_OF_SATS
+from router import RouterModel
+from transmisor import TransmissionSimulator
+
+KINDS = ("random", "hotspot", "fail_single", "fail_multi", "fail_plane")
+BASELINES = ("hops", "equal")
+HOTSPOT_FLOWS = 6
+MULTI_FAILURES = 3
+# Instante (s de simulación) de los fallos "durante": una transferencia típica dura ~0.7 s
+FAIL_DURING = (0.05, 0.5)
+
+_models = {}   # nombre -> RouterModel (uno por proceso del pool)
+_config = {}
+
+
+def init_worker(models, config):
+    """Carga cada modelo candidato una vez por proceso."""
+    torch.set_num_threads(1)
+    with _quiet():
+        for name, path in models.items():
+            model_dir, model_name = os.path.split(path)
+            _models[name] = RouterModel(model_dir, model_name)
+    _config.update(config)
+
+
+@contextlib.contextmanager
+def _quiet():
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def _constellation(seed):
+    # torch también: el agente muestrea sus ratios y cada política debe partir del mismo estado
+    random.seed(seed)
+    torch.manual_seed(seed)
+    env = simpy.Environment()
+    return env, ConstellationManager(env, _config["planes"], _config["sats"])
+
+
+def _traffic(kind, rng, N_P, N_S):
+    """Flujos (src_p, src_s, dst_p, dst_s) del escenario."""
+    def sat():
+        return rng.randrange(N_P), rng.randrange(N_S)
+
+    def pair(dst=None):
+        while True:
+            src, end = sat(), dst or sat()
+            if src != end:
+                return (*src, *end)
+
+    if kind != "hotspot":
+        return [pair()]
+    hot_p, hot_s = sat()
+    flows = []
+    for _ in range(HOTSPOT_FLOWS):
+        dst = ((hot_p + rng.randint(-1, 1)) % N_P, (hot_s + rng.randint(-2, 2)) % N_S)
+        flows.append(pair(dst))
+    return flows
+
+
+def _failures(kind, rng, constellation, flows):
+    """
+    Satélites que caen y cuándo. Se eligen entre los nodos intermedios de las rutas
+    candidatas (un satélite al azar casi nunca estaría en el camino).
+    """
+    if not kind.startswith("fail_"):
+        return {"satellites": [], "at": None}
+    router = next(iter(_models.values())).routing(constellation)
+    endpoints = {(p, s) for f in flows for p, s in (f[:2], f[2:])}
+    on_path = set()
+    for flow in flows:
+        candidates, _, _ = router.find_best_routes(*flow)
+        for cand in candidates or []:
+            for link in cand["enlaces"]:
+                plane, sat = link.split("-")[1][1:].split("_")
+                on_path.add((int(plane), int(sat)))
+    on_path = sorted(on_path - endpoints)
+    if not on_path:
+        return {"satellites": [], "at": None}
+
+    if kind == "fail_single":
+        down = [rng.choice(on_path)]
+    elif kind == "fail_multi":
+        down = rng.sample(on_path, min(MULTI_FAILURES, len(on_path)))
+    else:
+        plane = rng.choice(sorted({p for p, _ in on_path}))
+        down = [(plane, s) for s in range(constellation.sats_per_plane) if (plane, s) not in endpoints]
+    # La mitad de los escenarios de fallo cae antes de enrutar y la otra mitad en pleno envío
+    at = 0.0 if rng.random() < 0.5 else rng.uniform(*FAIL_DURING)
+    return {"satellites": down, "at": at}
+
+
+def _fail(env, constellation, failures):
+    if failures["at"]:
+        yield env.timeout(failures["at"])
+    for p, s in failures["satellites"]:
+        constellation.fail_satellite(p, s)
+
+
+def run_scenario(spec):
+    """Simula un escenario con todas las políticas. Devuelve un registro por (política, flujo)."""
+    seed, kind = spec["seed"], spec["kind"]
+    rng = random.Random(seed)
+    with _quiet():
+        _, probe = _constellation(seed)
+        flows = _traffic(kind, rng, probe.planes, probe.sats_per_plane)
+        failures = _failures(kind, rng, probe, flows)
+        payload = rng.randbytes(_config["size"] // 2) * 2  # mitad compresible
+
+        records = []
+        for policy in _config["policies"]:
+            model_name = policy.split(":", 1)[1] if policy.startswith("drl:") else next(iter(_models))
+            split_policy = "drl" if policy.startswith("drl:") else policy
+            env, constellation = _constellation(seed)
+            router = _models[model_name].routing(constellation)
+            if failures["satellites"]:
+                if failures["at"]:
+                    env.process(_fail(env, constellation, failures))
+                else:
+                    list(_fail(env, constellation, failures))
+
+            simulators, procs = [], []
+            for flow in flows:
+                simulator = TransmissionSimulator(env, constellation, router)
+                simulators.append(simulator)
+                procs.append(env.process(simulator.process_and_send(payload, *flow, split_policy=split_policy)))
+            env.run(until=simpy.AllOf(env, procs))
+
+            for i, (simulator, proc) in enumerate(zip(simulators, procs)):
+                result = proc.value
+                meta = result.get("meta", {})
+                records.append({
+                    "scenario": spec["id"], "kind": kind, "policy": policy, "flow": i,
+                    "failed_before": bool(failures["satellites"]) and not failures["at"],
+                    "ok": "completion_time" in meta,
+                    "completion_time": meta.get("completion_time"),
+                    "goodput_mbps": meta.get("goodput_mbps"),
+                    "lost_fraction": meta["lost_fragments"] / meta["total_fragments"] if meta.get("total_fragments") else None,
+                    "verified": meta.get("receiver", {}).get("verified", False),
+                    "inference_ms": simulator.stage_times["inference"],
+                })
+    return records
+
+
+def _distribution(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    return {
+        "mean": sum(values) / len(values),
+        "p5": consideraciones.Percentile(values, 5),
+        "p50": consideraciones.Percentile(values, 50),
+        "p95": consideraciones.Percentile(values, 95),
+        "p99": consideraciones.Percentile(values, 99),
+    }
+
+
+def _summary(records):
+    done = [r for r in records if r["ok"]]
+    return {
+        "flows": len(records),
+        "no_route": len(records) - len(done),
+        "verified_rate": sum(r["verified"] for r in records) / len(records) if records else None,
+        "completion_time": _distribution([r["completion_time"] for r in done]),
+        "goodput_mbps": _distribution([r["goodput_mbps"] for r in done]),
+        "lost_fraction": _distribution([r["lost_fraction"] for r in done]),
+        "inference_ms": _distribution([r["inference_ms"] for r in records if r["inference_ms"]]),
+    }
+
+
+def _paired(records, policy, baseline):
+    """
+    Comparación flujo a flujo (mismo escenario y flujo): proporción de flujos en que la
+    política entrega verificado y termina antes que la línea base (gana), igual (empata),
+    y mediana del cociente de tiempos de finalización (<1 = más rápida).
+    """
+    by_key = {}
+    for r in records:
+        by_key.setdefault((r["scenario"], r["flow"]), {})[r["policy"]] = r
+    wins, ties, ratios, pairs = 0, 0, [], 0
+    for entry in by_key.values():
+        a, b = entry.get(policy), entry.get(baseline)
+        if a is None or b is None:
+            continue
+        pairs += 1
+        a_good = a["verified"] and a["ok"]
+        b_good = b["verified"] and b["ok"]
+        if a_good and b_good and math.isclose(a["completion_time"], b["completion_time"], rel_tol=1e-9):
+            ties += 1
+        elif not a_good and not b_good:
+            ties += 1
+        elif a_good and (not b_good or a["completion_time"] < b["completion_time"]):
+            wins += 1
+        if a["ok"] and b["ok"] and b["completion_time"]:
+            ratios.append(a["completion_time"] / b["completion_time"])
+    return {
+        "pairs": pairs,
+        "win_rate": wins / pairs if pairs else None,
+        "tie_rate": ties / pairs if pairs else None,
+        "completion_ratio_p50": consideraciones.Percentile(ratios, 50) if ratios else None,
+        "completion_ratio_mean": math.exp(sum(math.log(x) for x in ratios) / len(ratios)) if ratios else None,
+    }
+
+
+def build_report(records, policies, elapsed, config):
+    by_policy = {p: [r for r in records if r["policy"] == p] for p in policies}
+    report = {
+        "config": config,
+        "wall_time_s": elapsed,
+        "policies": {p: _summary(rs) for p, rs in by_policy.items()},
+        "by_kind": {
+            kind: {p: _summary([r for r in rs if r["kind"] == kind]) for p, rs in by_policy.items()}
+            for kind in config["kinds"]
+        },
+        "versus": {},
+    }
+    for policy in policies:
+        if policy.startswith("drl:"):
+            report["versus"][policy] = {other: _paired(records, policy, other) for other in policies if other != policy}
+    return report
+
+
+def _fmt(dist, key, scale=1.0, spec=".3f"):
+    return format(dist[key] * scale, spec) if dist else "-"
+
+
+def _num(value, spec=".3f"):
+    """Como _fmt para valores sueltos (tasas y cocientes), que son None sin datos."""
+    return "-" if value is None else format(value, spec)
+
+
+def print_report(report):
+    print(f"\n{'política':<22} {'flujos':>7} {'verif.':>7} {'t p50 (s)':>10} {'t p95 (s)':>10} "
+          f"{'goodput p50':>12} {'pérdida media':>14} {'inf. p50 (ms)':>14}")
+    for policy, s in report["policies"].items():
+        print(f"{policy:<22} {s['flows']:>7} {_num(s['verified_rate'], '.1%'):>7} "
+              f"{_fmt(s['completion_time'], 'p50'):>10} {_fmt(s['completion_time'], 'p95'):>10} "
+              f"{_fmt(s['goodput_mbps'], 'p50'):>12} {_fmt(s['lost_fraction'], 'mean', 100, '.2f'):>13}% "
+              f"{_fmt(s['inference_ms'], 'p50'):>14}")
+
+    print("\n[*] Por tipo de escenario (tiempo de finalización p50 / tasa de verificación):")
+    for kind, per_policy in report["by_kind"].items():
+        cells = "  ".join(f"{p}: {_fmt(s['completion_time'], 'p50')} s / {_num(s['verified_rate'], '.0%')}"
+                          for p, s in per_policy.items() if s["flows"])
+        print(f"    {kind:<12} {cells}")
+
+    for policy, versus in report["versus"].items():
+        print(f"\n[*] {policy} frente a:")
+        for other, v in versus.items():
+            if v["pairs"]:
+                print(f"    {other:<20} gana en {_num(v['win_rate'], '.1%')} y empata en {_num(v['tie_rate'], '.1%')} de {v['pairs']} flujos | "
+                      f"cociente de tiempos p50 {_num(v['completion_ratio_p50'])}, media geom. {_num(v['completion_ratio_mean'])}")
+
+
+def _model_names(paths):
+    """Nombre corto por modelo: el directorio que lo contiene (o el índice si se repite)."""
+    names = [os.path.basename(os.path.dirname(os.path.abspath(p))) or f"m{i}" for i, p in enumerate(paths)]
+    if len(set(names)) != len(names):
+        names = [f"m{i}" for i in range(len(paths))]
+    return dict(zip(names, paths))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluación offline de modelos de enrutamiento")
+    parser.add_argument("--models", nargs="+", default=[os.path.join("backend", "DRL-router", "mejorModelo", "best_model.pth")],
+                        help="Checkpoints (.pth) a evaluar y comparar")
+    parser.add_argument("--scenarios", type=int, default=1000)
+    parser.add_argument("--kinds", nargs="+", default=list(KINDS), choices=KINDS)
+    parser.add_argument("--baselines", nargs="+", default=list(BASELINES), choices=("hops", "equal", "single"))
+    parser.add_argument("--size", type=int, default=65536, help="Bytes por flujo")
+    parser.add_argument("--planes", type=int, default=NUMBER_OF_PLANES)
+    parser.add_argument("--sats", type=int, default=NUMBER_OF_SATS)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=2024)
+    parser.add_argument("--output", help="Archivo JSON para el informe")
+    parser.add_argument("--raw", help="Archivo JSON Lines con cada registro (política, flujo)")
+    args = parser.parse_args()
+
+    for path in args.models:
+        if not os.path.exists(path):
+            parser.error(f"No existe el modelo {path}")
+    models = _model_names(args.models)
+    policies = [f"drl:{name}" for name in models] + list(args.baselines)
+    config = {"models": models, "policies": policies, "kinds": args.kinds, "scenarios": args.scenarios,
+              "size": args.size, "planes": args.planes, "sats": args.sats, "seed": args.seed}
+    specs = [{"id": i, "seed": args.seed + i, "kind": args.kinds[i % len(args.kinds)]} for i in range(args.scenarios)]
+
+    print(f"[*] {args.scenarios} escenarios x {len(policies)} políticas en {args.workers} procesos "
+          f"(constelación {args.planes}x{args.sats})")
+    t0 = time.time()
+    records, errors = [], 0
+    # spawn: cada proceso carga torch y los modelos una vez (sin heredar hilos del padre)
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=init_worker, initargs=(models, config)) as pool:
+        futures = [pool.submit(run_scenario, spec) for spec in specs]
+        for done, future in enumerate(futures, start=1):
+            try:
+                records.extend(future.result())
+            except Exception as e:
+                errors += 1
+                print(f"[!] Escenario {done - 1} falló: {type(e).__name__}: {e}")
+            if done % max(1, len(specs) // 10) == 0:
+                print(f"    {done}/{len(specs)} escenarios ({time.time() - t0:.0f} s)")
+
+    report = build_report(records, policies, time.time() - t0, config)
+    report["errors"] = errors
+    print_report(report)
+    print(f"\n[*] {len(records)} registros en {report['wall_time_s']:.1f} s ({errors} escenarios con error)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"[*] Informe guardado en {args.output}")
+    if args.raw:
+        with open(args.raw, "w") as f:
+            for r in records:
+                f.write(json.dumps(r) + "\n")
@@ -1,9 +1,12 @@
-import matplotlib.pyplot as plt
 import os
-import networkx as nx
+
+# matplotlib y networkx se importan dentro de las funciones que dibujan: router importa
+# este módulo y el servidor no debe cargarlos para enrutar
 
 
 def plot_training_results(epochs, rewards, throughputs):
+    import matplotlib.pyplot as plt
+
     fig, ax1 = plt.subplots(figsize=(10, 5))
 
     # Eje para la Recompensa
@@ -57,6 +60,9 @@ def visualize_satellite_routes(candidates, n_planes, n_sats, src, dst):
     """
     Dibuja la malla de satélites y resalta las rutas candidatas.
     """
+    import matplotlib.pyplot as plt
+    import networkx as nx
+
     G = nx.Graph()
     pos = {}
 
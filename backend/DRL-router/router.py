@@ -36,7 +36,30 @@ class GMTS_Agent(nn.Module):
 
         # logits por ruta -> softmax sobre dim=0
         logits = self.actor_head(embeddings).squeeze(-1)           # [n]
+        ratios = self._ratios(logits, temperature, training)
 
+        value = self.critic(global_repr)
+        return ratios, value
+
+    def forward_batch(self, xs, adjs, temperature=1.0, training=True):
+        """
+        Varias consultas (una por flujo) en una sola pasada: los grafos de candidatas se unen
+        en una adyacencia diagonal por bloques, así que ningún flujo ve las rutas de otro.
+        El softmax y el valor se calculan por bloque. Devuelve [(ratios, value), ...].
+        """
+        sizes = [x.size(0) for x in xs]
+        x = torch.cat(xs)
+        blocks = [torch.eye(n, device=x.device) if a is None else a.to(x.device) for n, a in zip(sizes, adjs)]
+        degree_matrix = torch.eye(x.size(0), device=x.device) + torch.block_diag(*blocks)
+        embeddings = F.relu(torch.matmul(degree_matrix, self.gnn_layer(x)))
+        logits = self.actor_head(embeddings).squeeze(-1)
+
+        per_query = embeddings.split(sizes)
+        values = self.critic(torch.stack([e.mean(dim=0) for e in per_query]))
+        return [(self._ratios(l, temperature, training), v)
+                for l, v in zip(logits.split(sizes), values)]
+
+    def _ratios(self, logits, temperature, training):
         if training:
             ratios = F.softmax(logits / temperature, dim=0)
             noise = torch.randn_like(ratios) * 0.05
@@ -46,9 +69,7 @@ class GMTS_Agent(nn.Module):
             ratios = F.softmax(logits / 0.8, dim=0)
             ratios = torch.clamp(ratios, min=0.1)
             ratios = ratios / ratios.sum()
-
-        value = self.critic(global_repr)
-        return ratios, value
+        return ratios
 
 
 
@@ -91,32 +112,68 @@ class SatelliteTrainer:
 
         return reward.item() if isinstance(reward, torch.Tensor) else reward
 
-# --- CLASE BRIDGE: ROUTER INTELIGENTE ---
-class IntelligentRouter:
-    def __init__(self, constellation_manager, model_dir="backend/DRL-router/mejorModelo", model_name="best_model.pth", train_mode=True):
-        self.constellation = constellation_manager
+# --- MODELO COMPARTIDO ---
+class RouterModel:
+    """
+    Pesos del GMTS_Agent y dispositivo. En inferencia no se modifica tras cargarse, así que
+    una sola instancia se comparte entre todas las simulaciones (y hilos) de un proceso.
+    Cada simulación usa su propio RoutingContext ligado a su constelación.
+    """
+
+    def __init__(self, model_dir="backend/DRL-router/mejorModelo", model_name="best_model.pth", trainable=False):
         self.model_dir = model_dir
         self.model_name = model_name
         self.model_path = os.path.join(self.model_dir, self.model_name)
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.train_mode = train_mode  # New parameter to control training mode
+        self.trainable = trainable
 
         self.input_dim = 4 
         self.hidden_dim = 64
         self.agent = GMTS_Agent(self.input_dim, self.hidden_dim).to(self.device)
 
-        if self.train_mode:
-            self.optimizer = torch.optim.Adam(self.agent.parameters(), lr=0.001)
-            self.trainer = SatelliteTrainer(self.agent, self.optimizer)
-            self.best_reward = -float('inf')
-
         # Ensure the model directory exists
         os.makedirs(self.model_dir, exist_ok=True)
 
         if os.path.exists(self.model_path):
-            self.agent.load_state_dict(torch.load(self.model_path))
+            self.agent.load_state_dict(torch.load(self.model_path, map_location=self.device))
             print(f"[*] Modelo cargado desde {self.model_path}")
 
+        if not trainable:
+            # Sin gradientes: el forward no guarda estado y se puede llamar concurrentemente
+            self.agent.requires_grad_(False)
+
+    def forward(self, features, adj=None, **kwargs):
+        """Ratios y valor para las features de las candidatas (kwargs pasan a GMTS_Agent.forward)."""
+        state_tensor = torch.tensor(features, dtype=torch.float32, device=self.device)
+        adj_tensor = adj.to(self.device) if adj is not None else None
+        with torch.inference_mode():
+            return self.agent(state_tensor, adj_tensor, **kwargs)
+
+    def forward_batch(self, features_list, adj_list, **kwargs):
+        """forward para varias consultas en una sola pasada (ver GMTS_Agent.forward_batch)."""
+        xs = [torch.tensor(f, dtype=torch.float32, device=self.device) for f in features_list]
+        with torch.inference_mode():
+            return self.agent.forward_batch(xs, adj_list, **kwargs)
+
+    def routing(self, constellation):
+        """Contexto de enrutamiento barato para una constelación concreta."""
+        return RoutingContext(self, constellation)
+
+
+# --- CONTEXTO DE ENRUTAMIENTO (uno por simulación) ---
+class RoutingContext:
+    def __init__(self, model, constellation):
+        self.model = model
+        self.constellation = constellation
+
+    @property
+    def device(self):
+        return self.model.device
+
+    @property
+    def agent(self):
+        return self.model.agent
+
     def _build_candidate_adjacency(self, routes):
         # Adyacencia entre rutas: 1 si comparten al menos un enlace
         n = len(routes)
@@ -138,21 +195,15 @@ class IntelligentRouter:
         return hops_h, formulas.CardinalDirectionsHops(e_lat, w_lat, N_S)
 
     def _extract_path_metrics(self, path_links):
-        total_q, total_r, dists, throughputs, loads = 0, 0, [], [], []
-        for link in path_links:
-            u, v = link.split('-')
-            m = self.constellation.get_link_metrics(u, v)
-            if m.get('link_down'):
-                return None  # ruta inválida por enlace caído
-            total_q += m['q_delay']; total_r += m['r_delay']
-            dists.append(m['distance']); throughputs.append(m['link_throughput'])
-            loads.append(self.constellation.satellites[v].current_load)
-
-        dist_sum = sum(dists) if dists else 0.0
+        # Agregados incrementales: solo se recalculan los enlaces de satélites que cambiaron
+        totals = self.constellation.path_metrics(path_links)
+        if totals is None:
+            return None  # ruta inválida por enlace caído
+        throughputs = totals['throughputs']
         return {
-            'delay': consideraciones.PathDelay([total_q], [total_r], [dist_sum]),
+            'delay': consideraciones.PathDelay([totals['q_delay']], [totals['r_delay']], [totals['distance']]),
             'throughput': consideraciones.PathThroughput(throughputs) if throughputs else 0.0,
-            'max_load': max(loads) if loads else 0.0
+            'max_load': totals['max_load']
         }
 
     def find_best_routes(self, src_p, src_s, dst_p, dst_s):
@@ -177,6 +228,21 @@ class IntelligentRouter:
         adj = self._build_candidate_adjacency(augmented)
         return augmented, features, adj
 
+
+# --- CLASE BRIDGE: ROUTER INTELIGENTE (entrenamiento) ---
+class IntelligentRouter(RoutingContext):
+    """Contexto con modelo propio; con train_mode=True además entrena y guarda el mejor modelo."""
+
+    def __init__(self, constellation_manager, model_dir="backend/DRL-router/mejorModelo", model_name="best_model.pth", train_mode=True):
+        super().__init__(RouterModel(model_dir, model_name, trainable=train_mode), constellation_manager)
+        self.model_path = self.model.model_path
+        self.train_mode = train_mode  # New parameter to control training mode
+
+        if self.train_mode:
+            self.optimizer = torch.optim.Adam(self.agent.parameters(), lr=0.001)
+            self.trainer = SatelliteTrainer(self.agent, self.optimizer)
+            self.best_reward = -float('inf')
+
     def save_if_best(self, current_reward):
         if self.train_mode and current_reward > self.best_reward:
             self.best_reward = current_reward
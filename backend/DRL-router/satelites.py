@@ -1,16 +1,24 @@
 import simpy
 import random
+from collections import OrderedDict
+from enlaces import LinkManager
 
 # --- CONSTANTES HARCODEDAS (Como solicitado) ---
 NUMBER_OF_PLANES = 24   # N_P
 NUMBER_OF_SATS = 66    # N_S
 # -----------------------------------------------
 
+# Rutas cuyas métricas agregadas se conservan (las candidatas usadas más recientemente)
+PATH_CACHE_SIZE = 4096
+
 class Satellite:
-    def __init__(self, env, plane_id, sat_id):
+    def __init__(self, env, plane_id, sat_id, constellation=None):
         self.env = env
         self.plane_id = plane_id
         self.sat_id = sat_id
+        self.constellation = constellation
+        # Cambia con cada cambio de estado (_refresh_load): invalida las métricas de sus enlaces
+        self.version = 0
         
         # Identificador único para logs
         self.full_id = f"S{plane_id}_{sat_id}"
@@ -22,8 +30,13 @@ class Satellite:
         self.max_bandwidth = 1000.0 
         
         # Estado actual (Variable en el tiempo)
-        self.current_load = random.uniform(0.1, 0.4) # 10% a 40% de carga inicial
+        # La carga total es la de fondo (tráfico de usuarios simulado) más la
+        # generada por nuestras transmisiones en los enlaces entrantes.
+        self.background_load = random.uniform(0.1, 0.4) # 10% a 40% de carga inicial
+        self.traffic_load = 0.0
+        self.current_load = self.background_load
         self.available_bandwidth = self.max_bandwidth
+        self.is_active = True
         
         # Iniciar proceso de comportamiento
         self.action = env.process(self.run())
@@ -37,10 +50,26 @@ class Satellite:
             
             # Fluctuación procedural de la carga (Simula tráfico de usuarios)
             change = random.uniform(-0.1, 0.1)
-            self.current_load = max(0.0, min(1.0, self.current_load + change))
-            
-            # El ancho de banda disponible fluctúa inversamente a la carga
-            self.available_bandwidth = self.max_bandwidth * (1 - (self.current_load * 0.5))
+            self.background_load = max(0.0, min(1.0, self.background_load + change))
+            self._refresh_load()
+
+    def add_traffic_load(self, delta):
+        """Suma (o resta) carga generada por paquetes encolados hacia este satélite."""
+        self.traffic_load = max(0.0, self.traffic_load + delta)
+        self._refresh_load()
+
+    def _refresh_load(self):
+        self.version += 1
+        if self.constellation is not None:
+            self.constellation.epoch += 1
+        if not self.is_active:
+            # Satélite caído: el ciclo de carga no debe sobrescribir el fallo
+            self.current_load = 1.0
+            self.available_bandwidth = 0.000001
+            return
+        self.current_load = min(1.0, self.background_load + self.traffic_load)
+        # El ancho de banda disponible fluctúa inversamente a la carga
+        self.available_bandwidth = self.max_bandwidth * (1 - (self.current_load * 0.5))
 
     def get_state(self):
         """Retorna el estado actual para la IA"""
@@ -53,13 +82,25 @@ class Satellite:
         }
 
 class ConstellationManager:
-    def __init__(self, env):
+    def __init__(self, env, planes=NUMBER_OF_PLANES, sats_per_plane=NUMBER_OF_SATS):
         self.env = env
         self.satellites = {} # Diccionario mapeado por "S{plane}_{sat}"
-        self.planes = NUMBER_OF_PLANES
-        self.sats_per_plane = NUMBER_OF_SATS
-        
+        # Por defecto la constelación del servidor; otros tamaños para benchmarks
+        self.planes = planes
+        self.sats_per_plane = sats_per_plane
+        # Caché de métricas: se recalcula solo lo que tocan los satélites que cambiaron.
+        # epoch sube con cualquier cambio de estado; cada satélite lleva además su versión.
+        self.epoch = 0
+        self._distances = {}                # (u, v) -> distancia (fija por enlace)
+        self._link_cache = {}               # (u, v, packet_size) -> (versión u, versión v, métricas)
+        self._path_cache = OrderedDict()    # tupla de enlaces -> agregados de la ruta (LRU)
+        self.metrics_stats = {"link_hits": 0, "link_misses": 0, "path_hits": 0, "path_updates": 0, "path_misses": 0}
+
         self._generate_constellation()
+        # Enlaces con colas (compartidos por todas las transmisiones de este entorno)
+        self.links = LinkManager(self)
+        # Evento que se dispara (y se renueva) en cada fallo de satélite
+        self.failure_event = env.event()
 
     def _generate_constellation(self):
         """Generación procedural de la constelación"""
@@ -67,21 +108,50 @@ class ConstellationManager:
         for p in range(self.planes):
             for s in range(self.sats_per_plane):
                 # Crear satélite y añadir a la gestión
-                sat = Satellite(self.env, p, s)
+                sat = Satellite(self.env, p, s, self)
                 self.satellites[sat.full_id] = sat
 
     def get_satellite(self, plane_idx, sat_idx):
         key = f"S{plane_idx}_{sat_idx}"
         return self.satellites.get(key)
 
+    def link_distance(self, node_u, node_v):
+        """
+        Distancia aproximada (simplificada para simulación, idealmente usaría física orbital)
+        Aquí usamos una distancia base + ruido procedural
+        """
+        base_dist = 500000 # metros (intra-plane)
+        if node_u.plane_id != node_v.plane_id:
+            base_dist = 800000 # metros (inter-plane)
+        return base_dist + random.uniform(-1000, 1000)
+
+    def fixed_distance(self, u, v):
+        """link_distance sorteada una sola vez por enlace: la geometría no cambia entre lecturas."""
+        distance = self._distances.get((u, v))
+        if distance is None:
+            distance = self._distances[(u, v)] = self.link_distance(self.satellites[u], self.satellites[v])
+        return distance
+
     def get_link_metrics(self, u, v, packet_size=1500):
         """
         Calcula métricas en tiempo real entre dos nodos.
         Integra lógica de 'consideraciones.py' simulada.
+        Se recalculan solo si alguno de los dos extremos cambió de estado desde la última
+        lectura; el diccionario devuelto se comparte, no debe modificarse.
         """
         node_u = self.satellites[u]
         node_v = self.satellites[v]
+        key = (u, v, packet_size)
+        cached = self._link_cache.get(key)
+        if cached is not None and cached[0] == node_u.version and cached[1] == node_v.version:
+            self.metrics_stats["link_hits"] += 1
+            return cached[2]
+        self.metrics_stats["link_misses"] += 1
+        metrics = self._link_metrics(u, v, node_u, node_v, packet_size)
+        self._link_cache[key] = (node_u.version, node_v.version, metrics)
+        return metrics
 
+    def _link_metrics(self, u, v, node_u, node_v, packet_size):
         u_active = getattr(node_u, "is_active", getattr(node_u, "active", True))
         v_active = getattr(node_v, "is_active", getattr(node_v, "active", True))
         v_bw = float(getattr(node_v, "available_bandwidth", 0.0))
@@ -98,13 +168,7 @@ class ConstellationManager:
         denom = max(v_bw * 1e6, 1e-9)
         r_delay = packet_size / denom
 
-        # Distancia aproximada (simplificada para simulación, idealmente usaría física orbital)
-        # Aquí usamos una distancia base + ruido procedural
-        base_dist = 500000 # metros (intra-plane)
-        if node_u.plane_id != node_v.plane_id:
-            base_dist = 800000 # metros (inter-plane)
-            
-        distance = base_dist + random.uniform(-1000, 1000)
+        distance = self.fixed_distance(u, v)
 
         # Queue Delay (q) basado en la carga del nodo destino
         q_delay = node_v.current_load * 0.05 # max 50ms si está al 100%
@@ -120,21 +184,84 @@ class ConstellationManager:
             'link_down': False,
         }
         
+    def path_metrics(self, path_links):
+        """
+        Agregados de una ruta (lista de enlaces "u-v"): sumas de q_delay, r_delay y distancia,
+        throughput de cada enlace y carga máxima de los nodos destino. None si hay un enlace caído.
+        Si ningún satélite cambió desde la última lectura se devuelven tal cual; si no, solo se
+        recalculan los enlaces con algún extremo modificado y las sumas se rehacen desde la caché
+        de enlaces (sin acumular deltas: sin deriva de coma flotante ni inf - inf).
+        """
+        key = tuple(path_links)
+        entry = self._path_cache.get(key)
+        if entry is not None:
+            self._path_cache.move_to_end(key)
+            if entry["epoch"] == self.epoch:
+                self.metrics_stats["path_hits"] += 1
+                return entry["totals"]
+            hops = entry["hops"]
+            dirty = [i for i, (node_u, node_v, vu, vv, _) in enumerate(hops)
+                     if node_u.version != vu or node_v.version != vv]
+            if not dirty:
+                entry["epoch"] = self.epoch
+                self.metrics_stats["path_hits"] += 1
+                return entry["totals"]
+            self.metrics_stats["path_updates"] += 1
+            for i in dirty:
+                hops[i] = self._hop(hops[i][0], hops[i][1])
+        else:
+            self.metrics_stats["path_misses"] += 1
+            hops = []
+            for link in path_links:
+                u, v = link.split('-')
+                hops.append(self._hop(self.satellites[u], self.satellites[v]))
+            entry = self._path_cache[key] = {"hops": hops}
+            if len(self._path_cache) > PATH_CACHE_SIZE:
+                self._path_cache.popitem(last=False)
+
+        entry["epoch"] = self.epoch
+        entry["totals"] = self._path_totals(hops)
+        return entry["totals"]
+
+    def _hop(self, node_u, node_v):
+        metrics = self.get_link_metrics(node_u.full_id, node_v.full_id)
+        return node_u, node_v, node_u.version, node_v.version, (metrics, node_v.current_load)
+
+    @staticmethod
+    def _path_totals(hops):
+        q_delay = r_delay = distance = 0.0
+        throughputs, max_load = [], 0.0
+        for _, _, _, _, (m, load) in hops:
+            if m['link_down']:
+                return None
+            q_delay += m['q_delay']
+            r_delay += m['r_delay']
+            distance += m['distance']
+            throughputs.append(m['link_throughput'])
+            max_load = max(max_load, load)
+        return {"q_delay": q_delay, "r_delay": r_delay, "distance": distance,
+                "throughputs": throughputs, "max_load": max_load}
+
     def fail_satellite(self, plane_id, sat_id):
         """Desactiva un satélite para probar la resiliencia de la GNN."""
         sat_id_str = f"S{plane_id}_{sat_id}"
         if sat_id_str in self.satellites:
-       
-            self.satellites[sat_id_str].available_bandwidth = 0.000001
-            self.satellites[sat_id_str].current_load = 1.0
-            print(f"[!] FALLO : Satélite {sat_id_str} fuera de servicio.") #TODO corregir logica de sobreescritura de estado
+            sat = self.satellites[sat_id_str]
+            sat.is_active = False
+            sat._refresh_load()
+            print(f"[!] FALLO : Satélite {sat_id_str} fuera de servicio.")
+
+            # Notificar a quien esté esperando fallos (p.ej. re-enrutamiento adaptativo)
+            event, self.failure_event = self.failure_event, self.env.event()
+            event.succeed(sat_id_str)
 
 
     def recover_all_satellites(self):
         """Restaura la salud de todos los satélites de la constelación."""
         for sat in self.satellites.values():
-            sat.available_bandwidth = sat.max_bandwidth
-            sat.current_load = random.uniform(0.1, 0.4)
+            sat.is_active = True
+            sat.background_load = random.uniform(0.1, 0.4)
+            sat._refresh_load()
         print("[*] Constelación restaurada: Todos los sistemas operativos.")
 
 
@@ -0,0 +1,67 @@
+"""
+Benchmark de contención: N flujos concurrentes comparten los enlaces de una misma
+constelación. Compara el throughput agregado de los ratios DRL contra ruta única y
+reparto uniforme.
+
+Uso (desde la raíz del repo):
+    python backend/benchmarks/contention.py --flows 20 --size 200000
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "DRL-router"))
+
+import argparse
+import random
+import simpy
+
+from transmisor import TransmissionSimulator
+from satelites import ConstellationManager
+from router import RouterModel
+
+
+def run_policy(policy, n_flows, size, seed, model):
+    random.seed(seed)
+    env = simpy.Environment()
+    constellation = ConstellationManager(env)
+    router = model.routing(constellation)
+
+    N_P, N_S = constellation.planes, constellation.sats_per_plane
+    procs = []
+    for _ in range(n_flows):
+        payload = os.urandom(size // 2) * 2  # mitad compresible
+        src_p, src_s = random.randint(0, N_P - 1), random.randint(0, N_S - 1)
+        dst_p, dst_s = random.randint(0, N_P - 1), random.randint(0, N_S - 1)
+        simulator = TransmissionSimulator(env, constellation, router)
+        procs.append(env.process(simulator.process_and_send(payload, src_p, src_s, dst_p, dst_s, split_policy=policy)))
+
+    env.run(until=simpy.AllOf(env, procs))
+    results = [p.value for p in procs if p.value.get("meta")]
+    total_bits = sum(r["meta"]["compressed_size"] * 8 for r in results)
+    makespan = env.now
+    link_stats = constellation.links.stats()
+    return {
+        "policy": policy,
+        "flows": len(results),
+        "makespan_s": makespan,
+        "aggregate_mbps": total_bits / makespan / 1e6 if makespan > 0 else 0.0,
+        "mean_completion_s": sum(r["meta"]["completion_time"] for r in results) / max(len(results), 1),
+        "max_link_utilization": link_stats[0]["utilization"] if link_stats else 0.0,
+        "max_queue_delay_s": max((l["max_queue_delay"] for l in link_stats), default=0.0),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--flows", type=int, default=20)
+    parser.add_argument("--size", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    model = RouterModel()
+
+    for policy in ("drl", "equal", "single"):
+        r = run_policy(policy, args.flows, args.size, args.seed, model)
+        print(f"{r['policy']:>6} | flujos {r['flows']} | makespan {r['makespan_s']:.4f}s | "
+              f"agregado {r['aggregate_mbps']:.2f} Mbps | completion medio {r['mean_completion_s']:.4f}s | "
+              f"util. max {r['max_link_utilization']:.2%} | cola max {r['max_queue_delay_s']*1000:.3f} ms")
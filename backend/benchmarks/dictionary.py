@@ -0,0 +1,74 @@
+"""
+Entrena un diccionario LZ4 con mensajes cortos de telemetry.csv y compara el ratio y la
+velocidad de compresión con y sin diccionario por tamaño de mensaje. Se entrena con la
+primera mitad de las filas y se evalúa con la segunda.
+
+Uso (desde la raíz del repo):
+    python backend/benchmarks/dictionary.py --version 1 --save
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+import time
+
+import cpp_core
+from compresion import DICTIONARY_DIR
+
+TELEMETRY = os.path.join(os.path.dirname(__file__), "..", "pybindBuild", "data", "input", "telemetry.csv")
+MESSAGE_SIZES = [256, 1024, 4096, 16384]
+
+
+def split_messages(header, rows, size):
+    """Agrupa filas completas en mensajes de ~size bytes, cada uno con la cabecera del CSV."""
+    messages, current = [], header
+    for row in rows:
+        current += row + b"\n"
+        if len(current) >= size:
+            messages.append(current)
+            current = header
+    return messages
+
+
+def timed(fn, messages):
+    t0 = time.perf_counter()
+    out = [fn(m) for m in messages]
+    return out, time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--version", type=int, default=1, help="Versión: se guarda como telemetry-v<N>.dict")
+    parser.add_argument("--size", type=int, default=64 * 1024, help="Tamaño del diccionario (máx. 64 KiB)")
+    parser.add_argument("--train-message", type=int, default=1024, help="Tamaño de los mensajes de entrenamiento")
+    parser.add_argument("--save", action="store_true")
+    args = parser.parse_args()
+
+    with open(TELEMETRY, "rb") as f:
+        lines = f.read().split(b"\n")
+    header, rows = lines[0] + b"\n", [l for l in lines[1:] if l]
+    train_rows, eval_rows = rows[: len(rows) // 2], rows[len(rows) // 2 :]
+
+    t0 = time.perf_counter()
+    dictionary = cpp_core.train_dictionary(
+        split_messages(header, train_rows, args.train_message), args.size, dict_id=args.version
+    )
+    print(f"[*] Diccionario v{dictionary.id}: {dictionary.size} bytes, entrenado en {time.perf_counter() - t0:.3f}s")
+
+    if args.save:
+        os.makedirs(DICTIONARY_DIR, exist_ok=True)
+        path = os.path.join(DICTIONARY_DIR, f"telemetry-v{args.version}.dict")
+        with open(path, "wb") as f:
+            f.write(dictionary.to_bytes())
+        print(f"[*] Guardado en {path}")
+
+    for size in MESSAGE_SIZES:
+        messages = split_messages(header, eval_rows, size)
+        raw = sum(len(m) for m in messages)
+        plain, t_plain = timed(cpp_core.compress, messages)
+        primed, t_dict = timed(dictionary.compress, messages)
+        assert all(dictionary.decompress(c) == m for c, m in zip(primed, messages))
+        print(f"mensajes de {size:>5} B | sin diccionario {sum(map(len, plain)) / raw:6.1%} "
+              f"({raw / t_plain / 1e6:6.1f} MB/s) | con diccionario {sum(map(len, primed)) / raw:6.1%} "
+              f"({raw / t_dict / 1e6:6.1f} MB/s)")
@@ -0,0 +1,120 @@
+"""
+Benchmark de FEC: velocidad de codificación/decodificación de cpp_core.fec_encode /
+fec_decode y probabilidad de recuperar un grupo en función de la sobrecarga de paridad,
+con pérdidas aleatorias por fragmento y con caída completa de una ruta.
+Antes de medir comprueba la ida y vuelta encode -> pérdida -> decode de cada configuración
+(shards de longitudes distintas y todas las combinaciones de hasta m pérdidas); si falla,
+termina con código de salida 1.
+
+Uso (desde la raíz del repo):
+    python backend/benchmarks/fec.py --shard 16384 --loss 0.05
+    python backend/benchmarks/fec.py --check-only
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+import itertools
+import random
+import time
+
+import cpp_core
+
+CONFIGS = [("xor", 4, 1), ("xor", 8, 1), ("cauchy", 4, 2), ("cauchy", 8, 2), ("cauchy", 10, 4), ("cauchy", 16, 4)]
+
+
+def codec_speed(code, k, m, shard, rounds):
+    data = [os.urandom(shard) for _ in range(k)]
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        parity = cpp_core.fec_encode(data, m, code)
+    enc = k * shard * rounds / (time.perf_counter() - t0) / 1e9
+
+    # Peor caso: se pierden los m primeros fragmentos de datos
+    shards = [None] * m + data[m:] + parity
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        restored = cpp_core.fec_decode(shards, k, m, code)
+    dec = k * shard * rounds / (time.perf_counter() - t0) / 1e9
+    assert restored == data
+    return enc, dec
+
+
+def roundtrip_errors(code, k, m, max_shard=300, max_patterns=2000):
+    """
+    Codifica k shards de longitudes distintas, borra cada combinación de hasta m shards
+    (muestreadas si hay demasiadas) y comprueba que decode devuelve los datos originales,
+    todos rellenos al tamaño del más largo. Devuelve la lista de fallos (vacía = correcto).
+    """
+    data = [os.urandom(random.randint(1, max_shard)) for _ in range(k)]
+    size = max(len(d) for d in data)
+    parity = cpp_core.fec_encode(data, m, code)
+    errors = []
+    if any(len(p) != size for p in parity):
+        errors.append(f"{code} {k}+{m}: paridad de tamaño distinto a {size}")
+
+    patterns = [c for lost in range(1, m + 1) for c in itertools.combinations(range(k + m), lost)]
+    if len(patterns) > max_patterns:
+        patterns = random.sample(patterns, max_patterns)
+    for lost in [()] + patterns:
+        shards = [None if i in lost else s for i, s in enumerate(data + parity)]
+        restored = cpp_core.fec_decode(shards, k, m, code)
+        if len(restored) != k or any(len(r) != size or bytes(r[: len(d)]) != d or any(r[len(d) :])
+                                     for r, d in zip(restored, data)):
+            errors.append(f"{code} {k}+{m}: datos distintos al perder {list(lost)}")
+
+    # Más de m pérdidas y formas inválidas deben rechazarse, no devolver basura
+    try:
+        cpp_core.fec_decode([None] * (m + 1) + (data + parity)[m + 1 :], k, m, code)
+        errors.append(f"{code} {k}+{m}: decode aceptó {m + 1} pérdidas")
+    except RuntimeError:
+        pass
+    for bad in ((data, -1), (data, 0), ([], m)):
+        try:
+            cpp_core.fec_encode(bad[0], bad[1], code)
+            errors.append(f"{code}: encode aceptó k={len(bad[0])}, m={bad[1]}")
+        except ValueError:
+            pass
+    return errors
+
+
+def recovery_rate(k, m, loss, routes, trials):
+    """Fracción de grupos recuperables (pérdida aleatoria, y una ruta caída por grupo)."""
+    random_ok = sum(
+        sum(random.random() < loss for _ in range(k + m)) <= m for _ in range(trials)
+    ) / trials
+    # Reparto por turnos entre rutas, como _add_parity; cae la ruta más cargada del grupo
+    per_route = [0] * routes
+    for i in range(k + m):
+        per_route[i % routes] += 1
+    return random_ok, max(per_route) <= m
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--shard", type=int, default=16384)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--loss", type=float, default=0.05)
+    parser.add_argument("--routes", type=int, default=3)
+    parser.add_argument("--trials", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--check-only", action="store_true", help="Solo la comprobación de ida y vuelta")
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    errors = [e for code, k, m in CONFIGS for e in roundtrip_errors(code, k, m)]
+    for error in errors:
+        print(f"[!] {error}")
+    if errors:
+        sys.exit(1)
+    print(f"[*] Ida y vuelta encode -> pérdida -> decode correcta en {len(CONFIGS)} configuraciones")
+    if args.check_only:
+        sys.exit(0)
+
+    for code, k, m in CONFIGS:
+        enc, dec = codec_speed(code, k, m, args.shard, args.rounds)
+        ok, route_ok = recovery_rate(k, m, args.loss, args.routes, args.trials)
+        print(f"{code:>6} {k:>2}+{m} | sobrecarga {m / k:5.1%} | encode {enc:6.2f} GB/s | decode {dec:6.2f} GB/s | "
+              f"recuperación (pérdida {args.loss:.0%}) {ok:.4f} | "
+              f"caída de 1 de {args.routes} rutas {'sí' if route_ok else 'no'}")
@@ -0,0 +1,50 @@
+"""
+Benchmark de fragmentación: cpp_core.fragment (un memoryview por fragmento) contra
+cpp_core.fragment_index (buffer contiguo + arreglos de offsets/longitudes/crc32c),
+y verificación de integridad en bloque con crc32c_fragments.
+
+Uso (desde la raíz del repo):
+    python backend/benchmarks/fragment.py --size 64000000 --fragment 1400
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+import gc
+import time
+
+import cpp_core
+
+
+def timed(fn, rounds):
+    gc.collect()
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        result = fn()
+    elapsed = (time.perf_counter() - t0) / rounds
+    return result, elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=64_000_000)
+    parser.add_argument("--fragment", type=int, default=1400)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    payload = os.urandom(args.size)
+
+    frags, t_list = timed(lambda: cpp_core.fragment(payload, args.fragment), args.rounds)
+    print(f"fragment        | {len(frags)} fragmentos | {t_list * 1000:8.2f} ms | "
+          f"{args.size / t_list / 1e9:6.2f} GB/s | {len(frags) + 1} objetos Python")
+
+    index, t_index = timed(lambda: cpp_core.fragment_index(payload, args.fragment), args.rounds)
+    buf, offsets, lengths, checksums = index
+    print(f"fragment_index  | {len(offsets)} fragmentos | {t_index * 1000:8.2f} ms | "
+          f"{args.size / t_index / 1e9:6.2f} GB/s | 4 objetos Python (incluye crc32c)")
+
+    verified, t_verify = timed(lambda: cpp_core.crc32c_fragments(buf, offsets, lengths), args.rounds)
+    ok = verified.tobytes() == checksums.tobytes()
+    print(f"crc32c_fragments| verificación {'correcta' if ok else 'FALLIDA'} | {t_verify * 1000:8.2f} ms | "
+          f"{args.size / t_verify / 1e9:6.2f} GB/s")
@@ -0,0 +1,86 @@
+"""
+Benchmark del camino de datos subida -> fragmentos: compara el camino antiguo
+(decode a str, re-encode a UTF-8, fragmentos como bytes independientes) contra el
+camino binario sin copias (buffer protocol + memoryviews) y su variante LZ4 por
+bloques en paralelo. Cada caso corre en un
+proceso aparte para medir su pico de RSS de forma aislada.
+
+Uso (desde la raíz del repo):
+    python backend/benchmarks/pipeline.py --sizes 16 64 256
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+import multiprocessing as mp
+import resource
+import time
+
+SAMPLE = os.path.join(os.path.dirname(__file__), "..", "pybindBuild", "data", "input", "telemetry.csv")
+
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Linux: KiB
+
+
+def legacy_path(cpp_core, content):
+    try:
+        information = content.decode('utf-8')
+    except UnicodeDecodeError:
+        information = str(content)
+    raw = information.encode('utf-8')
+    compressed = cpp_core.compress(raw)
+    return compressed, [bytes(f) for f in cpp_core.fragment(compressed, 1024)]
+
+
+def zero_copy_path(cpp_core, content):
+    compressed = cpp_core.compress(content)
+    return compressed, cpp_core.fragment(memoryview(compressed), 1024)
+
+
+def chunked_path(cpp_core, content):
+    compressed = cpp_core.compress_chunked(content, 1 << 20)
+    return compressed, cpp_core.fragment(memoryview(compressed), 1024)
+
+
+PATHS = {"legacy": legacy_path, "zero-copy": zero_copy_path, "chunked": chunked_path}
+
+
+def _worker(mode, size_mb, queue):
+    from transmisor import cpp_core
+
+    with open(SAMPLE, "rb") as f:
+        sample = f.read()
+    content = (sample * (size_mb * 1024 * 1024 // len(sample) + 1))[: size_mb * 1024 * 1024]
+    baseline = _peak_rss_mb()
+
+    run = PATHS[mode]
+    t0 = time.perf_counter()
+    compressed, fragments = run(cpp_core, content)
+    elapsed = time.perf_counter() - t0
+
+    queue.put({
+        "mode": mode,
+        "size_mb": size_mb,
+        "throughput_mb_s": size_mb / elapsed,
+        "extra_peak_rss_mb": _peak_rss_mb() - baseline,
+        "fragments": len(fragments),
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16, 64, 256], help="MiB")
+    args = parser.parse_args()
+
+    ctx = mp.get_context("spawn")
+    for size_mb in args.sizes:
+        for mode in PATHS:
+            queue = ctx.Queue()
+            proc = ctx.Process(target=_worker, args=(mode, size_mb, queue))
+            proc.start()
+            r = queue.get()
+            proc.join()
+            print(f"{r['size_mb']:>5} MiB | {r['mode']:>9} | {r['throughput_mb_s']:.1f} MiB/s | "
+                  f"RSS extra pico {r['extra_peak_rss_mb']:.1f} MiB | fragmentos {r['fragments']}")
@@ -0,0 +1,78 @@
+"""
+Benchmark de QoS: una subida masiva (bulk) y mensajes de telemetría periódicos comparten
+origen, destino y enlaces. Compara telemetría con su clase (prioridad + rutas de menor
+delay) contra telemetría tratada como bulk.
+
+Uso (desde la raíz del repo):
+    python backend/benchmarks/qos.py --bulk-size 20000000 --messages 50
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "DRL-router"))
+
+import argparse
+import random
+import simpy
+
+from transmisor import TransmissionSimulator, TRAFFIC_CLASSES
+from satelites import ConstellationManager
+from router import RouterModel
+import consideraciones
+
+
+def run_mix(telemetry_class, args, model):
+    random.seed(args.seed)
+    env = simpy.Environment()
+    constellation = ConstellationManager(env)
+    router = model.routing(constellation)
+
+    N_P, N_S = constellation.planes, constellation.sats_per_plane
+    src_p, src_s = random.randint(0, N_P - 1), random.randint(0, N_S - 1)
+    dst_p, dst_s = (src_p + N_P // 3) % N_P, (src_s + N_S // 4) % N_S
+    deadline = TRAFFIC_CLASSES["telemetry"]["deadline"]
+
+    bulk = env.process(TransmissionSimulator(env, constellation, router).process_and_send(
+        os.urandom(args.bulk_size), src_p, src_s, dst_p, dst_s, traffic_class="bulk"
+    ))
+
+    messages = []
+
+    def telemetry_source():
+        for _ in range(args.messages):
+            payload = os.urandom(args.message_size)
+            sim = TransmissionSimulator(env, constellation, router)
+            messages.append(env.process(sim.process_and_send(
+                payload, src_p, src_s, dst_p, dst_s, traffic_class=telemetry_class, deadline=deadline
+            )))
+            yield env.timeout(args.period)
+
+    env.process(telemetry_source())
+    env.run(until=bulk)
+    env.run(until=simpy.AllOf(env, messages))
+
+    latencies = [m.value["meta"]["completion_time"] for m in messages]
+    return {
+        "bulk_completion": bulk.value["meta"]["completion_time"],
+        "p50": consideraciones.Percentile(latencies, 50),
+        "p95": consideraciones.Percentile(latencies, 95),
+        "p99": consideraciones.Percentile(latencies, 99),
+        "miss_rate": sum(1 for l in latencies if l > deadline) / len(latencies),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bulk-size", type=int, default=20_000_000)
+    parser.add_argument("--messages", type=int, default=50)
+    parser.add_argument("--message-size", type=int, default=2048)
+    parser.add_argument("--period", type=float, default=0.002)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    model = RouterModel()
+
+    for telemetry_class in ("telemetry", "bulk"):
+        r = run_mix(telemetry_class, args, model)
+        print(f"telemetría como {telemetry_class:>9} | p50 {r['p50']*1000:.1f} ms | p95 {r['p95']*1000:.1f} ms | "
+              f"p99 {r['p99']*1000:.1f} ms | deadline miss {r['miss_rate']:.1%} | bulk {r['bulk_completion']:.3f}s")
@@ -0,0 +1,139 @@
+"""
+Benchmark de arranque en frío: tiempo de `import server` en un intérprete nuevo y, con
+--health, tiempo desde que se lanza uvicorn hasta que /health responde 200.
+Falla (código de salida 1) si se supera el presupuesto o si el proceso de la API carga
+módulos pesados que solo necesitan los workers o el entrenamiento (torch, matplotlib...).
+
+Uso (desde la raíz del repo):
+    python backend/benchmarks/startup.py --runs 5 --import-budget-ms 600
+    python backend/benchmarks/startup.py --health --lazy --health-budget-ms 2000
+"""
+import sys
+import os
+
+import argparse
+import json
+import socket
+import statistics
+import subprocess
+import time
+import urllib.request
+
+BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+ROOT = os.path.dirname(BACKEND)
+# El proceso de la API no debe importarlos: solo los usan los workers o el entrenamiento
+HEAVY_MODULES = ("torch", "matplotlib", "networkx", "router", "transmisor")
+
+PROBE = (
+    "import sys, json, time\n"
+    "t0 = time.perf_counter()\n"
+    "import server\n"
+    "ms = (time.perf_counter() - t0) * 1000\n"
+    f"print(json.dumps({{'import_ms': ms, 'heavy': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))\n"
+)
+
+
+def _env(extra=None):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (BACKEND, env.get("PYTHONPATH")) if p)
+    env.update(extra or {})
+    return env
+
+
+def measure_import():
+    """Un intérprete nuevo: (ms totales del proceso, ms de `import server`, módulos pesados)."""
+    t0 = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, env=_env(),
+                         capture_output=True, text=True, check=True)
+    total_ms = (time.perf_counter() - t0) * 1000
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    return total_ms, result["import_ms"], result["heavy"]
+
+
+def slowest_imports(top=8):
+    """Módulos con mayor tiempo acumulado según -X importtime (excluye `server`)."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import server"], cwd=ROOT,
+                         env=_env(), capture_output=True, text=True, check=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        rows.append((int(parts[1]) / 1000, parts[2].strip()))
+    return sorted((r for r in rows if r[1] != "server"), reverse=True)[:top]
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_health(lazy, timeout):
+    """ms desde lanzar uvicorn hasta el primer 200 de /health (None si no llega)."""
+    port = _free_port()
+    env = _env({"STARS_LAZY_MODEL": "1" if lazy else "0"})
+    cmd = [sys.executable, "-m", "uvicorn", "--app-dir", BACKEND, "server:app", "--port", str(port)]
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - t0 < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as r:
+                    if r.status == 200:
+                        return (time.perf_counter() - t0) * 1000
+            except OSError:
+                time.sleep(0.02)
+        return None
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tiempo de arranque del servidor con presupuesto")
+    parser.add_argument("--runs", type=int, default=5, help="Intérpretes nuevos por medición")
+    parser.add_argument("--import-budget-ms", type=float, default=600,
+                        help="Máximo para la mediana de `import server`")
+    parser.add_argument("--health", action="store_true", help="Mide también el arranque hasta /health")
+    parser.add_argument("--lazy", action="store_true", help="Arranca con STARS_LAZY_MODEL=1")
+    parser.add_argument("--health-budget-ms", type=float, default=3000,
+                        help="Máximo para la mediana hasta el primer 200 de /health")
+    parser.add_argument("--timeout", type=float, default=120, help="Segundos máximos por arranque")
+    args = parser.parse_args()
+
+    failures = []
+    totals, imports, heavy = [], [], set()
+    for _ in range(args.runs):
+        total_ms, import_ms, loaded = measure_import()
+        totals.append(total_ms)
+        imports.append(import_ms)
+        heavy.update(loaded)
+
+    median_import = statistics.median(imports)
+    print(f"[*] import server: mediana {median_import:.0f} ms, mín {min(imports):.0f} ms "
+          f"(proceso completo: mediana {statistics.median(totals):.0f} ms, {args.runs} ejecuciones)")
+    print("[*] Importaciones más lentas:")
+    for ms, name in slowest_imports():
+        print(f"    {ms:8.1f} ms  {name}")
+    if median_import > args.import_budget_ms:
+        failures.append(f"import server {median_import:.0f} ms > presupuesto {args.import_budget_ms:g} ms")
+    if heavy:
+        failures.append(f"el proceso de la API importa módulos pesados: {', '.join(sorted(heavy))}")
+
+    if args.health:
+        times = [measure_health(args.lazy, args.timeout) for _ in range(args.runs)]
+        if None in times:
+            failures.append(f"/health no respondió en {args.timeout:g} s")
+        else:
+            median_health = statistics.median(times)
+            mode = "modelo diferido" if args.lazy else "modelo cargado al arrancar"
+            print(f"[*] Arranque hasta /health ({mode}): mediana {median_health:.0f} ms, mín {min(times):.0f} ms")
+            if median_health > args.health_budget_ms:
+                failures.append(f"/health {median_health:.0f} ms > presupuesto {args.health_budget_ms:g} ms")
+
+    for failure in failures:
+        print(f"[!] {failure}")
+    if failures:
+        sys.exit(1)
+    print("[*] Dentro del presupuesto")
@@ -0,0 +1,291 @@
+"""
+Suite de benchmarks reproducible (sin red, RNG con semilla fija).
+
+Cubre, para cada tamaño de constelación: construcción, fórmulas de caminos (un par y un
+lote de pares), find_best_routes, forward del agente (individual y por lotes), un paso de
+entrenamiento y process_and_send completo a varios tamaños de archivo. Aparte mide las
+primitivas de cpp_core (compresión, fragmentación, XOR y paridad FEC).
+
+Guarda los resultados en JSON y, con --baseline, los compara con una ejecución anterior:
+marca como regresión toda mediana que empeore más de --threshold y termina con código 1.
+
+Uso (desde la raíz del repo):
+    python backend/benchmarks/suite.py --output base.json
+    python backend/benchmarks/suite.py --baseline base.json --sizes iridium current mega
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "DRL-router"))
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import statistics
+import time
+
+import simpy
+import torch
+
+import formulas
+from satelites import ConstellationManager
+from router import GMTS_Agent, RouterModel, SatelliteTrainer
+from transmisor import TransmissionSimulator
+from compresion import BACKEND, CHUNK_BLOCK_SIZE, cpp_core
+
+# Tamaños de constelación (planos, satélites por plano)
+SIZES = {
+    "iridium": (6, 11),
+    "current": (24, 66),
+    "mega": (72, 22),
+    "large": (72, 66),
+    "xl": (120, 100),
+}
+SAMPLE = os.path.join(os.path.dirname(__file__), "..", "pybindBuild", "data", "input", "telemetry.csv")
+PAIRS_PER_BATCH = 256
+FORWARD_BATCH = 64
+# Por debajo de esta diferencia absoluta (ms) no se marca regresión: es ruido del reloj
+NOISE_FLOOR_MS = 0.05
+
+
+@contextlib.contextmanager
+def _quiet():
+    """Silencia los prints del simulador: no son parte de lo que se mide."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def _reseed(seed):
+    random.seed(seed)
+    torch.manual_seed(seed)
+
+
+def measure(run, repeat, seed, setup=None, ops=1, warmup=1):
+    """
+    Mide `run(*setup())` `repeat` veces (más `warmup` sin contar). setup se vuelve a llamar
+    (y la semilla a fijar) en cada repetición y no entra en el tiempo. ops: operaciones
+    por llamada, para dar el coste por operación.
+    """
+    times = []
+    for i in range(warmup + repeat):
+        _reseed(seed)
+        with _quiet():
+            args = setup() if setup else ()
+            t0 = time.perf_counter()
+            run(*args)
+            elapsed = (time.perf_counter() - t0) * 1000
+        if i >= warmup:
+            times.append(elapsed)
+    median = statistics.median(times)
+    return {
+        "median_ms": median,
+        "min_ms": min(times),
+        "mean_ms": statistics.fmean(times),
+        "stdev_ms": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "ops": ops,
+        "per_op_us": median * 1000 / ops,
+    }
+
+
+def _payload(size):
+    """Telemetría real repetida hasta `size` bytes (comprimible como los archivos reales)."""
+    with open(SAMPLE, "rb") as f:
+        sample = f.read()
+    return (sample * (size // len(sample) + 1))[:size]
+
+
+def _constellation(planes, sats):
+    env = simpy.Environment()
+    return env, ConstellationManager(env, planes, sats)
+
+
+def _pairs(planes, sats, n, seed):
+    rng = random.Random(seed)
+    return [(rng.randrange(planes), rng.randrange(sats), rng.randrange(planes), rng.randrange(sats))
+            for _ in range(n)]
+
+
+def bench_constellation(name, planes, sats, model, args):
+    results = {}
+    pairs = _pairs(planes, sats, PAIRS_PER_BATCH, args.seed)
+
+    results["build"] = measure(lambda: _constellation(planes, sats), args.repeat, args.seed)
+
+    with _quiet():
+        _reseed(args.seed)
+        _, constellation = _constellation(planes, sats)
+    router = model.routing(constellation)
+
+    def paths(src_p, src_s, dst_p, dst_s):
+        h_h, h_v = router._calculate_formulas_inputs(src_p, src_s, dst_p, dst_s)
+        return formulas.GetOptimalPaths(src_s, src_p, h_h, h_v, sats, planes)
+
+    pair = (0, 0, planes // 2, sats // 2)
+    results["formulas_pair"] = measure(lambda: [paths(*pair) for _ in range(100)], args.repeat, args.seed, ops=100)
+    results["formulas_batch"] = measure(lambda: [paths(*p) for p in pairs], args.repeat, args.seed, ops=len(pairs))
+    results["find_best_routes"] = measure(lambda: [router.find_best_routes(*p) for p in pairs[:64]],
+                                          args.repeat, args.seed, ops=64)
+
+    # Consultas válidas (con candidatas) para el modelo
+    queries = []
+    _reseed(args.seed)
+    for p in pairs:
+        candidates, features, adj = router.find_best_routes(*p)
+        if candidates:
+            queries.append((candidates, features, adj))
+        if len(queries) == FORWARD_BATCH:
+            break
+    if queries:
+        _, features, adj = queries[0]
+        results["forward"] = measure(lambda: [model.forward(features, adj, training=False) for _ in range(100)],
+                                     args.repeat, args.seed, ops=100)
+        results["forward_batch"] = measure(
+            lambda: model.forward_batch([q[1] for q in queries], [q[2] for q in queries], training=False),
+            args.repeat, args.seed, ops=len(queries))
+        results["train_step"] = _bench_train_step(queries[0], args)
+
+    for kib in args.file_sizes:
+        results[f"process_and_send_{kib}KiB"] = _bench_transmission(planes, sats, model, kib * 1024, pairs[0], args)
+    return results
+
+
+def _bench_train_step(query, args):
+    """Forward en modo entrenamiento + SatelliteTrainer.train_step con un agente nuevo."""
+    candidates, features, adj = query
+    _reseed(args.seed)
+    agent = GMTS_Agent(4, 64)
+    trainer = SatelliteTrainer(agent, torch.optim.Adam(agent.parameters(), lr=0.001))
+    state = torch.tensor(features, dtype=torch.float32)
+
+    def steps():
+        for _ in range(20):
+            ratios, value = agent(state, adj, temperature=1.0, training=True)
+            trainer.train_step(ratios, value, candidates)
+
+    return measure(steps, args.repeat, args.seed, ops=20)
+
+
+def _bench_transmission(planes, sats, model, size, pair, args):
+    payload = _payload(size)
+
+    def setup():
+        env, constellation = _constellation(planes, sats)
+        return env, TransmissionSimulator(env, constellation, model.routing(constellation))
+
+    def run(env, simulator):
+        proc = env.process(simulator.process_and_send(payload, *pair))
+        env.run(until=proc)
+        if proc.value.get("status") == "FAILED":
+            raise RuntimeError(proc.value.get("reason"))
+
+    return measure(run, args.repeat, args.seed, setup=setup)
+
+
+def bench_cpp_core(args):
+    results = {}
+    for kib in args.payload_sizes:
+        data = _payload(kib * 1024)
+        compressed = cpp_core.compress(data)
+        suffix = f"{kib}KiB"
+        results[f"compress_{suffix}"] = measure(lambda: cpp_core.compress(data), args.repeat, args.seed)
+        if hasattr(cpp_core, "compress_chunked"):
+            results[f"compress_chunked_{suffix}"] = measure(
+                lambda: cpp_core.compress_chunked(data, CHUNK_BLOCK_SIZE), args.repeat, args.seed)
+        results[f"fragment_{suffix}"] = measure(lambda: cpp_core.fragment(compressed, 1024), args.repeat, args.seed)
+        results[f"fragment_index_{suffix}"] = measure(
+            lambda: cpp_core.fragment_index(compressed, 1024), args.repeat, args.seed)
+        if hasattr(cpp_core, "xor_blocks"):
+            results[f"xor_{suffix}"] = measure(lambda: cpp_core.xor_blocks(data, data[::-1]), args.repeat, args.seed)
+    if hasattr(cpp_core, "fec_encode"):
+        # Un grupo FEC típico: k = 32 fragmentos de 1 KiB, m = 2 paridades
+        shards = [bytes(f) for f in cpp_core.fragment(_payload(32 * 1024), 1024)]
+        for code in ("xor", "cauchy"):
+            m = 1 if code == "xor" else 2
+            results[f"fec_{code}_32x1KiB"] = measure(
+                lambda: cpp_core.fec_encode(shards, m, code), args.repeat, args.seed)
+    return results
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "compression_backend": BACKEND,
+        "cpu_count": os.cpu_count(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Imprime la comparación y devuelve la lista de regresiones."""
+    if baseline["environment"] != results["environment"]:
+        print("[!] El entorno de la línea base es distinto; las diferencias pueden no ser del código:")
+        for key, value in results["environment"].items():
+            if baseline["environment"].get(key) != value:
+                print(f"    {key}: {baseline['environment'].get(key)} -> {value}")
+
+    regressions = []
+    print(f"\n{'benchmark':<46} {'base (ms)':>11} {'actual (ms)':>12} {'cambio':>8}")
+    for name, current in results["benchmarks"].items():
+        previous = baseline["benchmarks"].get(name)
+        if previous is None:
+            print(f"{name:<46} {'-':>11} {current['median_ms']:>12.3f}    nuevo")
+            continue
+        ratio = current["median_ms"] / previous["median_ms"] if previous["median_ms"] else 1.0
+        regressed = ratio > 1 + threshold and current["median_ms"] - previous["median_ms"] > NOISE_FLOOR_MS
+        flag = "  REGRESIÓN" if regressed else ("  mejora" if ratio < 1 - threshold else "")
+        print(f"{name:<46} {previous['median_ms']:>11.3f} {current['median_ms']:>12.3f} {ratio - 1:>+8.1%}{flag}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Suite de benchmarks reproducible")
+    parser.add_argument("--sizes", nargs="+", default=["iridium", "current", "mega"],
+                        help=f"Constelaciones: {', '.join(SIZES)} o PxS (p.ej. 40x40)")
+    parser.add_argument("--file-sizes", type=int, nargs="+", default=[64, 1024], help="KiB para process_and_send")
+    parser.add_argument("--payload-sizes", type=int, nargs="+", default=[64, 4096], help="KiB para cpp_core")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--skip-cpp", action="store_true", help="No medir las primitivas de cpp_core")
+    parser.add_argument("--output", help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--baseline", help="JSON de una ejecución anterior con el que comparar")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Empeoramiento tolerado (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    torch.set_num_threads(1)  # resultados comparables entre máquinas con distinto nº de núcleos
+    with _quiet():
+        model = RouterModel()
+
+    results = {"environment": environment(), "seed": args.seed, "repeat": args.repeat,
+               "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "benchmarks": {}}
+    for size in args.sizes:
+        planes, sats = SIZES[size] if size in SIZES else map(int, size.lower().split("x"))
+        print(f"[*] Constelación {size} ({planes}x{sats})...")
+        for name, r in bench_constellation(size, planes, sats, model, args).items():
+            results["benchmarks"][f"{size}/{name}"] = r
+            print(f"    {name:<32} mediana {r['median_ms']:10.3f} ms  ({r['per_op_us']:.1f} µs/op)")
+    if not args.skip_cpp:
+        print(f"[*] Primitivas de compresión ({BACKEND})...")
+        for name, r in bench_cpp_core(args).items():
+            results["benchmarks"][f"cpp_core/{name}"] = r
+            print(f"    {name:<32} mediana {r['median_ms']:10.3f} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"[*] Resultados guardados en {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n[!] {len(regressions)} regresiones por encima del {args.threshold:.0%}")
+            sys.exit(1)
+        print("\n[*] Sin regresiones")
@@ -0,0 +1,207 @@
+"""
+Caché de payloads comprimidos direccionada por contenido.
+
+La clave es un sha256 de los bytes subidos y de los parámetros del códec (códec pedido,
+contenido del diccionario, nivel y backend), así que volver a subir el mismo archivo no lo
+comprime otra vez. Cada entrada guarda el buffer comprimido y los índices de fragmentación (offsets,
+longitudes y checksums) ya calculados para cada porción y tamaño de fragmento.
+
+Dos niveles: memoria (LRU acotada por bytes, una por proceso) y, opcionalmente, disco
+(un directorio que pueden compartir todos los workers; solo guarda el buffer comprimido).
+"""
+import hashlib
+import os
+import struct
+import tempfile
+import time
+from collections import OrderedDict
+
+from compresion import BACKEND, CPP_AVAILABLE, DEFAULT_DICTIONARY, cpp_core, compress_payload, dictionary_digest, payload_format
+
+# Por debajo de este tamaño comprimir cuesta menos que calcular la clave
+MIN_CACHED_BYTES = 4096
+# Índices de fragmentación guardados por entrada (uno por porción y tamaño de fragmento)
+MAX_INDEXES_PER_ENTRY = 16
+# Cabecera de los archivos en disco: magic, ms que costó comprimir, tamaño original
+DISK_HEADER = struct.Struct("<4sdQ")
+DISK_MAGIC = b"SPC1"
+
+
+class PayloadCache:
+    """
+    max_bytes: tope de la LRU en memoria (0 = sin memoria).
+    disk_dir: directorio del nivel en disco (None = sin disco); disk_max_bytes, su tope.
+    """
+
+    def __init__(self, max_bytes, disk_dir=None, disk_max_bytes=1 << 30):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._entries = OrderedDict()  # clave -> entrada (la más reciente al final)
+        self.bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.saved_ms = 0.0     # tiempo de compresión ahorrado
+        self.saved_bytes = 0    # bytes de entrada que no hubo que comprimir
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def key(raw_bytes, codec, dictionary=None, level=None):
+        # El diccionario entra por su contenido, no por su nombre: uno reentrenado con el mismo
+        # nombre no debe servir entradas (de memoria o del disco compartido) comprimidas con otro
+        if codec == "lz4-dict" and CPP_AVAILABLE:
+            dictionary = dictionary_digest(dictionary or DEFAULT_DICTIONARY)
+        params = f"{BACKEND}|{codec}|{dictionary or ''}|{'' if level is None else level}|"
+        digest = hashlib.sha256(params.encode())
+        digest.update(memoryview(raw_bytes))
+        return digest.hexdigest()
+
+    def compress(self, raw_bytes, codec="auto", dictionary=None, level=None):
+        """
+        Como compress_payload, pero consultando la caché. Devuelve (comprimido, códec usado,
+        entrada); la entrada es None si el payload es demasiado pequeño para cachearse.
+        """
+        size = memoryview(raw_bytes).nbytes
+        if size < MIN_CACHED_BYTES:
+            return (*compress_payload(raw_bytes, codec, dictionary, level), None)
+
+        key = self.key(raw_bytes, codec, dictionary, level)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        else:
+            entry = self._load(key)
+            if entry is not None:
+                self.disk_hits += 1
+                self._remember(key, entry)
+        if entry is not None:
+            self.saved_ms += entry["compress_ms"]
+            self.saved_bytes += size
+            return entry["compressed"], entry["codec"], entry
+
+        self.misses += 1
+        t0 = time.perf_counter()
+        compressed, used = compress_payload(raw_bytes, codec, dictionary, level)
+        entry = {
+            "compressed": bytes(compressed),  # inmutable: los fragmentos son vistas sobre él
+            "codec": used,
+            "compress_ms": (time.perf_counter() - t0) * 1000,
+            "original_size": size,
+            "indexes": OrderedDict(),
+        }
+        entry["bytes"] = len(entry["compressed"])
+        self._remember(key, entry)
+        self._store(key, entry)
+        return entry["compressed"], used, entry
+
+    def fragment_index(self, entry, view, offset, count, size):
+        """
+        cpp_core.fragment_index de view[offset:offset + count] con fragmentos de `size`,
+        reutilizando el de una transmisión anterior del mismo payload si lo hay.
+        """
+        index_key = (offset, count, size)
+        cached = entry["indexes"].get(index_key)
+        part = view[offset : offset + count]
+        if cached is not None:
+            return (part, *cached)
+
+        buf, offsets, lengths, crcs = cpp_core.fragment_index(part, size)
+        indexes = entry["indexes"]
+        indexes[index_key] = (offsets, lengths, crcs)
+        added = sum(_nbytes(a) for a in (offsets, lengths, crcs))
+        if len(indexes) > MAX_INDEXES_PER_ENTRY:
+            _, old = indexes.popitem(last=False)
+            added -= sum(_nbytes(a) for a in old)
+        entry["bytes"] += added
+        if entry.get("cached"):
+            self.bytes += added
+            self._evict()
+        return buf, offsets, lengths, crcs
+
+    def _remember(self, key, entry):
+        if entry["bytes"] > self.max_bytes:
+            return
+        entry["cached"] = True
+        self._entries[key] = entry
+        self.bytes += entry["bytes"]
+        self._evict()
+
+    def _evict(self):
+        while self.bytes > self.max_bytes and self._entries:
+            _, old = self._entries.popitem(last=False)
+            old["cached"] = False
+            self.bytes -= old["bytes"]
+
+    # --- Nivel en disco ---
+    def _path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.bin")
+
+    def _load(self, key):
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+            os.utime(self._path(key))  # LRU en disco por fecha de modificación
+        except OSError:
+            return None
+        if len(data) < DISK_HEADER.size:
+            return None
+        magic, compress_ms, original_size = DISK_HEADER.unpack_from(data)
+        if magic != DISK_MAGIC:
+            return None
+        compressed = data[DISK_HEADER.size:]
+        try:
+            codec = payload_format(compressed)
+        except ValueError:
+            return None
+        return {"compressed": compressed, "codec": codec, "compress_ms": compress_ms,
+                "original_size": original_size, "indexes": OrderedDict(), "bytes": len(compressed)}
+
+    def _store(self, key, entry):
+        if not self.disk_dir or len(entry["compressed"]) > self.disk_max_bytes:
+            return
+        # Escritura atómica: otro worker puede estar leyendo la misma clave
+        fd, tmp = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(DISK_HEADER.pack(DISK_MAGIC, entry["compress_ms"], entry["original_size"]))
+                f.write(entry["compressed"])
+            os.replace(tmp, self._path(key))
+        except OSError:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            return
+        self._trim_disk()
+
+    def _trim_disk(self):
+        """Borra los archivos menos usados hasta quedar bajo disk_max_bytes."""
+        files = []
+        for name in os.listdir(self.disk_dir):
+            if name.endswith(".bin"):
+                try:
+                    st = os.stat(os.path.join(self.disk_dir, name))
+                except OSError:
+                    continue
+                files.append((st.st_mtime, st.st_size, name))
+        total = sum(size for _, size, _ in files)
+        for _, size, name in sorted(files):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.unlink(os.path.join(self.disk_dir, name))
+            except OSError:
+                pass
+            total -= size
+
+    def stats(self):
+        return {"entries": len(self._entries), "bytes": self.bytes, "max_bytes": self.max_bytes,
+                "hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                "saved_ms": self.saved_ms, "saved_bytes": self.saved_bytes}
+
+
+def _nbytes(values):
+    return memoryview(values).nbytes
@@ -0,0 +1,389 @@
+"""
+Capa de compresión y fragmentación del transmisor.
+
+Usa el módulo compilado cpp_core si está disponible y funciona; si no, un respaldo en Python
+puro con la misma API (zlib/lzma por bloques comprimidos en hilos, que sueltan el GIL, y
+fragmentación con memoryview). Todos los formatos llevan una etiqueta (magic de 4 bytes),
+así decompress_payload reconoce la salida de cualquiera de los dos backends.
+
+    SLZ1  LZ4 bloque           SCK1  LZ4 por bloques     \\x04\\x22\\x4d\\x18  LZ4 frame
+    STS1  telemetría columnar  SDM1  LZ4 con diccionario
+    SPZ1  zlib por bloques     SPX1  lzma por bloques
+"""
+import hashlib
+import os
+import struct
+import zlib
+import lzma
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import cpp_core
+    CPP_AVAILABLE = True
+except ImportError:
+    cpp_core = None
+    CPP_AVAILABLE = False
+
+# El paquete `lz4` (en requirements.txt) decodifica los formatos LZ4 sin cpp_core: así el
+# respaldo verifica la salida por defecto del backend nativo. Sin él solo quedan zlib/lzma.
+try:
+    import lz4.block
+    import lz4.frame
+    LZ4_PY_AVAILABLE = True
+except ImportError:
+    LZ4_PY_AVAILABLE = False
+
+# A partir de este tamaño se comprime en bloques independientes en paralelo (sin GIL)
+CHUNKED_THRESHOLD = 4 * 1024 * 1024
+CHUNK_BLOCK_SIZE = 1024 * 1024
+# Trozo del frame LZ4 que iter_decompress entrega al descompresor incremental por llamada
+FRAME_FEED_BYTES = 16 * 1024  # LZ4 expande a lo sumo ~255x: trozos de salida de ~4 MiB
+
+# Códecs soportados por compress_payload ("auto" elige según backend y tamaño)
+# "telemetry" es el códec columnar para CSV numérico; si la entrada no es CSV numérico usa lz4.
+# "lz4-dict" comprime con un diccionario entrenado (mejor ratio en mensajes cortos).
+# "zlib" y "lzma" funcionan con cualquier backend; los demás necesitan cpp_core.
+CODECS = ("auto", "lz4", "lz4-chunked", "lz4-frame", "telemetry", "lz4-dict", "zlib", "lzma")
+PYTHON_CODECS = ("zlib", "lzma")
+
+# Nivel por defecto de cada códec Python (zlib 0-9, preset de lzma 0-9)
+DEFAULT_LEVELS = {"zlib": 6, "lzma": 1}
+
+# Diccionarios versionados: <nombre>.dict generados con benchmarks/dictionary.py --save
+DICTIONARY_DIR = os.path.join(os.path.dirname(__file__), "pybindBuild", "data", "dictionaries")
+DEFAULT_DICTIONARY = "telemetry-v1"
+_dictionaries = {}  # nombre -> cpp_core.Dictionary ya cargado
+_dictionary_digests = {}  # nombre -> sha256 del archivo cargado
+
+MAGICS = {
+    b"SLZ1": "lz4",
+    b"SCK1": "lz4-chunked",
+    b"\x04\x22\x4d\x18": "lz4-frame",
+    b"STS1": "telemetry",
+    b"SDM1": "lz4-dict",
+    b"SPZ1": "zlib",
+    b"SPX1": "lzma",
+}
+LZ4_BLOCK_HEADER = struct.Struct("<4sQ")           # magic, tamaño original
+BLOCKS_HEADER = struct.Struct("<4sIQI")            # magic, tamaño de bloque, tamaño original, nº de bloques
+
+_executor = None
+_default_threads = 0  # hilos cuando se pide threads=0 (0 = todos los núcleos); ver set_threads
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="compresion")
+    return _executor
+
+
+def _map_blocks(fn, blocks, threads):
+    """Aplica fn a cada bloque; en paralelo si hay varios bloques y más de un hilo."""
+    threads = threads or _default_threads
+    if len(blocks) <= 1 or threads == 1:
+        return [fn(b) for b in blocks]
+    return list(_pool().map(fn, blocks))
+
+
+def pack_blocks(magic, data, block_size, compress_block, threads=0):
+    """Comprime data en bloques independientes con el mismo layout que SCK1."""
+    view = memoryview(data).cast("B")
+    blocks = [view[i : i + block_size] for i in range(0, view.nbytes, block_size)]
+    packed = _map_blocks(compress_block, blocks, threads)
+    header = BLOCKS_HEADER.pack(magic, block_size, view.nbytes, len(packed))
+    sizes = array("I", (len(p) for p in packed))
+    return b"".join([header, sizes.tobytes(), *packed])
+
+
+def _block_table(view):
+    """(bloques comprimidos como vistas con su tamaño original, tamaño total) de un layout SCK1."""
+    magic, block_size, original_size, n_blocks = BLOCKS_HEADER.unpack_from(view)
+    if not block_size or n_blocks != -(-original_size // block_size):
+        raise ValueError("cabecera de bloques inconsistente")
+    offset = BLOCKS_HEADER.size + 4 * n_blocks
+    sizes = array("I")
+    sizes.frombytes(view[BLOCKS_HEADER.size : offset])
+    blocks = []
+    for i, size in enumerate(sizes):
+        expected = min(block_size, original_size - i * block_size)
+        blocks.append((view[offset : offset + size], expected))
+        offset += size
+    if offset != view.nbytes:
+        raise ValueError("datos por bloques truncados")
+    return blocks, original_size
+
+
+def unpack_blocks(data, decompress_block, threads=0):
+    blocks, original_size = _block_table(memoryview(data).cast("B"))
+    out = b"".join(_map_blocks(lambda b: decompress_block(*b), blocks, threads))
+    if len(out) != original_size:
+        raise ValueError("datos por bloques corruptos")
+    return out
+
+
+def _zlib_block(level):
+    return lambda block: zlib.compress(block, level)
+
+
+def _lzma_block(level):
+    return lambda block: lzma.compress(block, preset=level)
+
+
+def _zlib_unblock(block, expected):
+    return zlib.decompress(block, bufsize=max(expected, 1))
+
+
+def _lzma_unblock(block, expected):
+    return lzma.decompress(block)
+
+
+def _lz4_unblock(block, expected):
+    if CPP_AVAILABLE:
+        return cpp_core.decompress(block, expected)
+    return lz4.block.decompress(block, uncompressed_size=expected)
+
+
+class PythonCore:
+    """
+    Respaldo en Python puro con la API de cpp_core que usa el transmisor.
+    compress / compress_chunked producen zlib por bloques (SPZ1); los checksums son CRC-32.
+    """
+
+    checksum = "crc32"
+
+    def compress(self, data, level=DEFAULT_LEVELS["zlib"]):
+        return pack_blocks(b"SPZ1", data, CHUNK_BLOCK_SIZE, _zlib_block(level))
+
+    def compress_chunked(self, data, block_size=CHUNK_BLOCK_SIZE, threads=0, level=DEFAULT_LEVELS["zlib"]):
+        return pack_blocks(b"SPZ1", data, block_size, _zlib_block(level), threads)
+
+    def decompress_chunked(self, data, threads=0):
+        return unpack_blocks(data, _zlib_unblock, threads)
+
+    def fragment(self, data, size):
+        if size <= 0:
+            raise ValueError("el tamano de fragmento debe ser > 0")
+        view = memoryview(data).cast("B")
+        return [view[i : i + size] for i in range(0, view.nbytes, size)]
+
+    def fragment_index(self, data, size):
+        if size <= 0:
+            raise ValueError("el tamano de fragmento debe ser > 0")
+        view = memoryview(data).cast("B")
+        offsets = array("Q", range(0, view.nbytes, size))
+        lengths = array("Q", (min(size, view.nbytes - o) for o in offsets))
+        return view, offsets, lengths, self.crc32c_fragments(view, offsets, lengths)
+
+    def crc32c_fragments(self, data, offsets, lengths):
+        view = memoryview(data).cast("B")
+        return array("I", (zlib.crc32(view[o : o + l]) for o, l in zip(offsets, lengths)))
+
+
+def probe():
+    """
+    Comprueba al arrancar qué backend funciona de verdad (un cpp_core mal compilado puede
+    importarse y fallar al usarse) y qué códecs quedan disponibles.
+    """
+    global cpp_core, CPP_AVAILABLE
+    sample = b"time,altitude,velocity\n" + b"".join(b"%d,%d,7777.%02d\n" % (i, 800000 + 78 * i, i % 100) for i in range(64))
+    if CPP_AVAILABLE:
+        try:
+            ok = cpp_core.decompress(cpp_core.compress(sample), len(sample)) == sample
+        except Exception:
+            ok = False
+        if not ok:
+            print("[!] cpp_core no supera la prueba de compresión: se usa el respaldo en Python.")
+            CPP_AVAILABLE = False
+    if not CPP_AVAILABLE:
+        if cpp_core is None:
+            print("[!] No se encontró el módulo 'cpp_core': se usa el respaldo en Python (zlib/lzma).")
+        cpp_core = PythonCore()
+
+    codecs = [c for c in CODECS if CPP_AVAILABLE or c in PYTHON_CODECS or c == "auto"]
+    return {
+        "backend": "cpp_core" if CPP_AVAILABLE else "python",
+        "codecs": codecs,
+        "decodes": sorted(set(MAGICS.values()) - set(_undecodable())),
+        "checksum": getattr(cpp_core, "checksum", "crc32c"),
+        "threads": os.cpu_count() or 1,
+    }
+
+
+def _undecodable():
+    if CPP_AVAILABLE:
+        return []
+    missing = ["telemetry", "lz4-dict"]
+    if not LZ4_PY_AVAILABLE:
+        missing += ["lz4", "lz4-chunked", "lz4-frame"]
+    return missing
+
+
+CAPABILITIES = probe()
+BACKEND = CAPABILITIES["backend"]
+CHECKSUM = CAPABILITIES["checksum"]
+
+
+def set_threads(threads):
+    """
+    Hilos por llamada de compresión/descompresión cuando no se indican (0 = todos los núcleos),
+    en cpp_core y en el respaldo en Python. Los workers del pool de simulación usan 1.
+    """
+    global _default_threads
+    _default_threads = threads
+    if CPP_AVAILABLE and hasattr(cpp_core, "set_threads"):
+        cpp_core.set_threads(threads)
+
+
+def load_dictionary(name):
+    """Carga (una sola vez por proceso) el diccionario DICTIONARY_DIR/<name>.dict."""
+    if not CPP_AVAILABLE:
+        raise ValueError("Los diccionarios LZ4 requieren cpp_core")
+    if name not in _dictionaries:
+        path = os.path.join(DICTIONARY_DIR, f"{os.path.basename(name)}.dict")
+        if not os.path.exists(path):
+            raise ValueError(f"Diccionario desconocido '{name}'")
+        with open(path, "rb") as f:
+            content = f.read()
+        _dictionaries[name] = cpp_core.Dictionary(content)
+        _dictionary_digests[name] = hashlib.sha256(content).hexdigest()
+    return _dictionaries[name]
+
+
+def dictionary_digest(name):
+    """sha256 del diccionario <name> cargado: cambia si se reentrena con el mismo nombre."""
+    load_dictionary(name)
+    return _dictionary_digests[name]
+
+
+def _dictionary_by_id(dict_id):
+    for entry in sorted(os.listdir(DICTIONARY_DIR)) if os.path.isdir(DICTIONARY_DIR) else []:
+        if entry.endswith(".dict"):
+            dictionary = load_dictionary(entry[: -len(".dict")])
+            if dictionary.id == dict_id:
+                return dictionary
+    raise ValueError(f"No hay diccionario con id {dict_id} en {DICTIONARY_DIR}")
+
+
+def compress_payload(raw_bytes, codec="auto", dictionary=None, level=None):
+    """
+    Comprime un objeto bytes-like con el códec pedido. Devuelve (comprimido, códec usado).
+    "lz4-frame" comprime en streaming bloque a bloque y embebe tamaño y checksums,
+    así el receptor no necesita conocer el tamaño original.
+    "lz4-dict" usa el diccionario `dictionary` (DEFAULT_DICTIONARY si es None); el mensaje
+    lleva el id del diccionario para que el receptor sepa cuál cargar.
+    level solo aplica a zlib/lzma. Sin cpp_core los códecs LZ4 pasan a zlib.
+    """
+    if codec not in CODECS:
+        raise ValueError(f"Códec desconocido '{codec}'")
+
+    view = memoryview(raw_bytes)
+    if codec == "auto":
+        if not CPP_AVAILABLE:
+            codec = "zlib"
+        else:
+            codec = "lz4-chunked" if view.nbytes >= CHUNKED_THRESHOLD else "lz4"
+    elif codec not in PYTHON_CODECS and not CPP_AVAILABLE:
+        print(f"[!] Códec {codec} no disponible sin cpp_core; se usa zlib.")
+        codec = "zlib"
+
+    if codec == "zlib":
+        level = DEFAULT_LEVELS["zlib"] if level is None else level
+        return pack_blocks(b"SPZ1", view, CHUNK_BLOCK_SIZE, _zlib_block(level)), codec
+    if codec == "lzma":
+        level = DEFAULT_LEVELS["lzma"] if level is None else level
+        return pack_blocks(b"SPX1", view, CHUNK_BLOCK_SIZE, _lzma_block(level)), codec
+    if codec == "telemetry":
+        try:
+            return cpp_core.compress_telemetry(view), codec
+        except ValueError as e:
+            print(f"[!] Códec telemetry no aplicable ({e}); se usa lz4.")
+            codec = "lz4"
+    if codec == "lz4-dict":
+        return load_dictionary(dictionary or DEFAULT_DICTIONARY).compress(view), codec
+    if codec == "lz4-chunked":
+        return cpp_core.compress_chunked(view, CHUNK_BLOCK_SIZE), codec
+    if codec == "lz4-frame":
+        compressor = cpp_core.FrameCompressor(block_size=CHUNK_BLOCK_SIZE, content_size=view.nbytes)
+        out = bytearray()
+        for i in range(0, view.nbytes, CHUNK_BLOCK_SIZE):
+            out += compressor.update(view[i : i + CHUNK_BLOCK_SIZE])
+        out += compressor.flush()
+        return out, codec
+    # El bloque LZ4 no guarda su tamaño original: se etiqueta con él
+    return b"".join([LZ4_BLOCK_HEADER.pack(b"SLZ1", view.nbytes), cpp_core.compress(view)]), codec
+
+
+def iter_decompress(data):
+    """
+    Como decompress_payload, pero entrega la salida por trozos y en orden, sin juntarla: con
+    los formatos por bloques (lz4-chunked, zlib, lzma) un bloque cada vez y con el frame LZ4
+    lo que rinda cada trozo de FRAME_FEED_BYTES. Así la memoria no crece con el tamaño del
+    original. lz4, telemetry y lz4-dict son un único bloque y salen de una vez.
+    """
+    fmt = payload_format(data)
+    view = memoryview(data).cast("B")
+    if fmt in _undecodable():
+        yield decompress_payload(view)  # lanza el error con el motivo
+        return
+    unblock = {"zlib": _zlib_unblock, "lzma": _lzma_unblock, "lz4-chunked": _lz4_unblock}.get(fmt)
+    if unblock is not None:
+        blocks, _ = _block_table(view)
+        for block, expected in blocks:
+            out = unblock(block, expected)
+            if len(out) != expected:
+                raise ValueError("datos por bloques corruptos")
+            yield out
+        return
+    if fmt == "lz4-frame":
+        decompressor = cpp_core.FrameDecompressor() if CPP_AVAILABLE else lz4.frame.LZ4FrameDecompressor()
+        feed = decompressor.update if CPP_AVAILABLE else decompressor.decompress
+        for i in range(0, view.nbytes, FRAME_FEED_BYTES):
+            yield feed(view[i : i + FRAME_FEED_BYTES])
+        if not (decompressor.finished if CPP_AVAILABLE else decompressor.eof):
+            raise ValueError("frame LZ4 incompleto")
+        return
+    yield decompress_payload(view)
+
+
+def payload_format(data):
+    """Códec de un payload según su etiqueta (ValueError si no tiene una conocida)."""
+    magic = bytes(memoryview(data)[:4])
+    if magic not in MAGICS:
+        raise ValueError("payload sin etiqueta de formato conocida")
+    return MAGICS[magic]
+
+
+def decompress_payload(data, threads=0):
+    """Descomprime cualquier salida de compress_payload, venga del backend que venga."""
+    fmt = payload_format(data)
+    view = memoryview(data).cast("B")
+    if fmt == "zlib":
+        return unpack_blocks(view, _zlib_unblock, threads)
+    if fmt == "lzma":
+        return unpack_blocks(view, _lzma_unblock, threads)
+    if fmt in _undecodable():
+        raise RuntimeError(f"Decodificar '{fmt}' requiere cpp_core" + ("" if fmt in ("telemetry", "lz4-dict") else " o el paquete lz4"))
+
+    if fmt == "lz4":
+        _, original_size = LZ4_BLOCK_HEADER.unpack_from(view)
+        block = view[LZ4_BLOCK_HEADER.size :]
+        if CPP_AVAILABLE:
+            return cpp_core.decompress(block, original_size)
+        return lz4.block.decompress(block, uncompressed_size=original_size)
+    if fmt == "lz4-chunked":
+        if CPP_AVAILABLE:
+            return cpp_core.decompress_chunked(view, threads)
+        return unpack_blocks(view, lambda block, expected: lz4.block.decompress(block, uncompressed_size=expected), threads)
+    if fmt == "lz4-frame":
+        if CPP_AVAILABLE:
+            decompressor = cpp_core.FrameDecompressor()
+            out = decompressor.update(view)
+            if not decompressor.finished:
+                raise ValueError("frame LZ4 incompleto")
+            return out
+        return lz4.frame.decompress(view)
+    if fmt == "telemetry":
+        return cpp_core.decompress_telemetry(view)
+    return _dictionary_by_id(cpp_core.dictionary_id(view)).decompress(view)
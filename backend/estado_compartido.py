@@ -0,0 +1,220 @@
+"""
+Estado de la constelación compartido entre procesos (varios workers de uvicorn y sus pools).
+
+Un único proceso dueño avanza una constelación SimPy "en vivo" y publica, en un segmento de
+multiprocessing.shared_memory, la carga de fondo y si cada satélite está activo (el ancho de
+banda disponible se deriva de la carga al aplicarlo). Los lectores copian el estado sin bloqueos (seqlock: el dueño deja el
+contador de versión impar mientras escribe; el lector reintenta si la versión cambió o es
+impar) y lo aplican a su propia constelación antes de simular.
+
+Uso como dueño independiente:  python estado_compartido.py --name stars_constellation
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), "DRL-router"))
+
+import argparse
+import random
+import time
+from multiprocessing import shared_memory, resource_tracker
+
+import numpy as np
+import simpy
+
+from satelites import ConstellationManager, NUMBER_OF_PLANES, NUMBER_OF_SATS
+
+DEFAULT_NAME = "stars_constellation"
+# Cabecera: versión (u64), nº de satélites (u64), tiempo sim, tiempo de pared, tick (f64)
+HEADER_BYTES = 40
+SNAPSHOT_RETRIES = 100
+# Un estado más viejo que STALE_TICKS ticks se considera abandonado (dueño caído)
+STALE_TICKS = 10
+# Espera máxima (s) a que el dueño escriba la cabecera de un segmento recién creado
+ATTACH_TIMEOUT = 5.0
+
+
+def _segment_size(count):
+    return HEADER_BYTES + count * (8 + 1)
+
+
+class SharedConstellationState:
+    """Vistas numpy sobre el segmento compartido. Crear con create() (dueño) o attach()."""
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        buf = shm.buf
+        self._seq = np.ndarray((1,), dtype=np.uint64, buffer=buf, offset=0)
+        self._count = np.ndarray((1,), dtype=np.uint64, buffer=buf, offset=8)
+        self._times = np.ndarray((3,), dtype=np.float64, buffer=buf, offset=16)  # sim, pared, tick
+        n = int(self._count[0]) if not owner else NUMBER_OF_PLANES * NUMBER_OF_SATS
+        self.count = n
+        self.load = np.ndarray((n,), dtype=np.float64, buffer=buf, offset=HEADER_BYTES)
+        self.active = np.ndarray((n,), dtype=np.uint8, buffer=buf, offset=HEADER_BYTES + 8 * n)
+
+    @classmethod
+    def create(cls, name=DEFAULT_NAME, tick=1.0):
+        """Crea el segmento (FileExistsError si ya existe: otro proceso es el dueño)."""
+        count = NUMBER_OF_PLANES * NUMBER_OF_SATS
+        shm = shared_memory.SharedMemory(name=name, create=True, size=_segment_size(count))
+        state = cls(shm, owner=True)
+        state._count[0] = count
+        state._times[:] = (0.0, 0.0, tick)
+        return state
+
+    @classmethod
+    def attach(cls, name=DEFAULT_NAME):
+        """
+        Se adjunta a un segmento existente (FileNotFoundError si no hay dueño). create()
+        escribe la cabecera después de crear el segmento: si el nº de satélites aún es 0 se
+        espera hasta ATTACH_TIMEOUT; si no es el de esta constelación, ValueError.
+        """
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            shm = shared_memory.SharedMemory(name=name)
+            # Antes de 3.13 el resource_tracker borraría el segmento al salir el lector
+            resource_tracker.unregister(shm._name, "shared_memory")
+
+        expected = NUMBER_OF_PLANES * NUMBER_OF_SATS
+        header = np.ndarray((1,), dtype=np.uint64, buffer=shm.buf, offset=8)
+        give_up = time.time() + ATTACH_TIMEOUT
+        while int(header[0]) == 0 and time.time() < give_up:
+            time.sleep(0.01)
+        count = int(header[0])
+        del header  # la vista retiene el buffer y no dejaría cerrar el segmento
+        if count != expected or shm.size < _segment_size(count):
+            shm.close()
+            raise ValueError(f"Estado compartido '{name}': {count} satélites en el segmento, se esperaban {expected}")
+        return cls(shm, owner=False)
+
+    # --- Dueño ---
+    def publish(self, constellation):
+        """Copia el estado de la constelación al segmento (solo el dueño escribe)."""
+        sats = _ordered(constellation)
+        self._seq[0] += 1  # impar: escritura en curso
+        self.load[:] = [s.background_load for s in sats]
+        self.active[:] = [s.is_active for s in sats]
+        self._times[0] = constellation.env.now
+        self._times[1] = time.time()
+        self._seq[0] += 1  # par: estado consistente
+
+    # --- Lectores ---
+    @property
+    def version(self):
+        return int(self._seq[0])
+
+    def info(self):
+        """Versión y antigüedad, sin copiar los arreglos (barato: para /health)."""
+        sim_time, wall, tick = (float(x) for x in self._times)
+        age = time.time() - wall if wall else None
+        return {
+            "version": self.version,
+            "sim_time": sim_time,
+            "age_s": age,
+            "stale": age is None or age > STALE_TICKS * tick,
+        }
+
+    def snapshot(self):
+        """Copia consistente (load, active, info) o None si el dueño no deja leer."""
+        for _ in range(SNAPSHOT_RETRIES):
+            before = int(self._seq[0])
+            if before & 1:
+                time.sleep(0)
+                continue
+            load, active = self.load.copy(), self.active.copy()
+            info = self.info()
+            if int(self._seq[0]) == before:
+                return load, active, info
+        return None
+
+    def apply(self, constellation):
+        """
+        Vuelca el estado compartido en una constelación local (recién creada, env.now == 0).
+        Devuelve el informe (versión, antigüedad) o None si no se aplicó. Una constelación de
+        otro tamaño no se toca (applied False): los índices no corresponderían.
+        """
+        sats = _ordered(constellation)
+        if len(sats) != self.count:
+            return {**self.info(), "applied": False}
+        snap = self.snapshot()
+        if snap is None:
+            return None
+        load, active, info = snap
+        if info["stale"]:
+            return {**info, "applied": False}
+        for sat, bg, up in zip(sats, load.tolist(), active.tolist()):
+            sat.background_load = bg
+            sat.is_active = bool(up)
+            sat._refresh_load()
+        return {**info, "applied": True}
+
+    def close(self):
+        self.load = self.active = None
+        self._seq = self._count = self._times = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _ordered(constellation):
+    """Satélites en orden (plano, satélite): el índice en los arreglos es p * N_S + s."""
+    order = getattr(constellation, "_shared_order", None)
+    if order is None:
+        order = [constellation.satellites[f"S{p}_{s}"]
+                 for p in range(constellation.planes) for s in range(constellation.sats_per_plane)]
+        constellation._shared_order = order
+    return order
+
+
+def _failures(env, constellation, rate, duration):
+    """Cada segundo de simulación, con probabilidad `rate`, cae un satélite durante `duration` s."""
+    def recover(sat):
+        yield env.timeout(duration)
+        sat.is_active = True
+        sat._refresh_load()
+
+    while True:
+        yield env.timeout(1)
+        if random.random() < rate:
+            p = random.randint(0, constellation.planes - 1)
+            s = random.randint(0, constellation.sats_per_plane - 1)
+            constellation.fail_satellite(p, s)
+            env.process(recover(constellation.get_satellite(p, s)))
+
+
+def run_owner(name=DEFAULT_NAME, tick=1.0, fail_rate=0.0, fail_duration=30.0, create=True):
+    """
+    Bucle del dueño: avanza la constelación `tick` segundos de simulación por cada `tick`
+    segundos reales y publica el estado. Con create=False escribe en un segmento que creó
+    otro proceso (el servidor que ganó la elección), que es quien lo borra al terminar.
+    """
+    state = SharedConstellationState.create(name, tick) if create else SharedConstellationState.attach(name)
+
+    env = simpy.Environment()
+    constellation = ConstellationManager(env)
+    if fail_rate > 0:
+        env.process(_failures(env, constellation, fail_rate, fail_duration))
+    state.publish(constellation)
+    print(f"[*] Estado compartido '{name}': {state.count} satélites, tick {tick} s")
+
+    try:
+        while True:
+            started = time.time()
+            env.run(until=env.now + tick)
+            state.publish(constellation)
+            time.sleep(max(0.0, tick - (time.time() - started)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        state.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dueño del estado compartido de la constelación")
+    parser.add_argument("--name", default=DEFAULT_NAME)
+    parser.add_argument("--tick", type=float, default=1.0, help="Segundos (reales y de simulación) por paso")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Probabilidad de fallo por segundo")
+    parser.add_argument("--fail-duration", type=float, default=30.0, help="Segundos que dura cada fallo")
+    args = parser.parse_args()
+    run_owner(args.name, args.tick, args.fail_rate, args.fail_duration)
@@ -0,0 +1,171 @@
+"""
+Métricas del servidor en el formato de texto de Prometheus, sin dependencias externas.
+
+Contadores, gauges e histogramas con etiquetas. Registrar una observación cuesta una
+búsqueda binaria en los buckets y un par de sumas; el texto se genera solo al leer /metrics.
+Cada proceso (worker de uvicorn) tiene su propio registro.
+"""
+import bisect
+import math
+import time
+
+# Buckets por defecto en segundos: de 0.5 ms a 2 min
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.children = {}
+
+    def _key(self, labels):
+        return tuple(labels.get(n, "") for n in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(self.children.items()):
+            lines.extend(self._render_child(key, value))
+        return lines
+
+    def _render_child(self, key, value):
+        return [f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        self.children[key] = self.children.get(key, 0) + amount
+
+    def set_total(self, value, **labels):
+        """Para contadores que ya se llevan en otra estructura (se copian al leer /metrics)."""
+        self.children[self._key(labels)] = value
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        self.children[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        child = self.children.get(key)
+        if child is None:
+            # [conteo por bucket (no acumulado) ..., +Inf], suma, total
+            child = self.children[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        child[0][bisect.bisect_left(self.buckets, value)] += 1
+        child[1] += value
+        child[2] += 1
+
+    def _render_child(self, key, child):
+        counts, total, n = child
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + (math.inf,), counts):
+            cumulative += count
+            le = _labels(self.labelnames, key, [("le", _number(bound))])
+            lines.append(f"{self.name}_bucket{le} {cumulative}")
+        lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+        lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {n}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def _add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._add(Counter(name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._add(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI (sin envolver la respuesta en Python como BaseHTTPMiddleware): cuenta
+    peticiones por ruta y código, su duración y los bytes de entrada y salida.
+    Solo mide las rutas que empiezan por `prefix`; las que no están en `endpoints` se agrupan
+    como "other" para no crear una serie por cada URL inventada.
+    """
+
+    def __init__(self, app, requests, latency, bytes_in, bytes_out, endpoints=(), prefix="/api/"):
+        self.app = app
+        self.endpoints = set(endpoints)
+        self.requests = requests
+        self.latency = latency
+        self.bytes_in = bytes_in
+        self.bytes_out = bytes_out
+        self.prefix = prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefix):
+            return await self.app(scope, receive, send)
+
+        path = scope["path"] if scope["path"] in self.endpoints else "other"
+        status = [500]
+        t0 = time.perf_counter()
+
+        async def counted_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                self.bytes_in.inc(len(message.get("body", b"")), endpoint=path)
+            return message
+
+        async def counted_send(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            elif message["type"] == "http.response.body":
+                self.bytes_out.inc(len(message.get("body", b"")), endpoint=path)
+            await send(message)
+
+        try:
+            await self.app(scope, counted_receive, counted_send)
+        finally:
+            self.requests.inc(endpoint=path, status=status[0])
+            self.latency.observe(time.perf_counter() - t0, endpoint=path)
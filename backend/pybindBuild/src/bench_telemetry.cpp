@@ -0,0 +1,47 @@
+// Benchmark del códec columnar de telemetría frente al camino actual (LZ4 sobre el texto).
+// Compilar desde backend/pybindBuild:
+//   g++ -std=c++17 -O3 -pthread src/bench_telemetry.cpp src/compression/telemetry_codec.cpp \
+//       src/compression/lz4_wrapper.cpp src/file_io/reader.cpp -Isrc -llz4 -o build/bench_telemetry
+#include <iostream>
+#include "file_io/reader.h"
+#include "compression/lz4_wrapper.h"
+#include "compression/telemetry_codec.h"
+#include <vector>
+#include <chrono>
+
+const int ROUNDS = 20;      //repetitions so the timers are not dominated by noise
+
+template <typename Fn>
+double averageUs(Fn fn) {
+    auto start = std::chrono::high_resolution_clock::now();
+    for (int i = 0; i < ROUNDS; ++i) fn();
+    auto end = std::chrono::high_resolution_clock::now();
+    return std::chrono::duration_cast<std::chrono::microseconds>(end - start).count() / double(ROUNDS);
+}
+
+void report(const char* name, size_t original, size_t compressed, double compressUs, double decompressUs, bool exact) {
+    std::cout << name << "\n";
+    std::cout << "  Compressed size: " << compressed << " bytes\n";
+    std::cout << "  Compression ratio: " << static_cast<double>(compressed) / original * 100.0 << "%\n";
+    std::cout << "  Compression time: " << compressUs << " us (" << original / compressUs << " MB/s)\n";
+    std::cout << "  Decompression time: " << decompressUs << " us (" << original / decompressUs << " MB/s)\n";
+    std::cout << "  Exact reconstruction: " << (exact ? "yes" : "NO") << "\n";
+}
+
+int main() {
+    auto data = readFile("data/input/telemetry.csv");
+    std::cout << "Original size: " << data.size() << " bytes\n";
+
+    // Camino actual: LZ4 sobre el CSV en texto
+    std::vector<char> lz4, lz4Out;
+    double lz4Compress = averageUs([&] { lz4 = compressBlock(data); });
+    double lz4Decompress = averageUs([&] { lz4Out = decompressBlock(lz4, static_cast<int>(data.size())); });
+    report("LZ4 (text)", data.size(), lz4.size(), lz4Compress, lz4Decompress, lz4Out == data);
+
+    // Códec columnar: delta / delta-of-delta y Gorilla por columna + LZ4
+    std::vector<char> columnar, columnarOut(data.size());
+    double colCompress = averageUs([&] { columnar = compressTelemetry(data.data(), data.size()); });
+    double colDecompress = averageUs([&] { decompressTelemetry(columnar.data(), columnar.size(), columnarOut.data()); });
+    report("Columnar telemetry", data.size(), columnar.size(), colCompress, colDecompress, columnarOut == data);
+    return 0;
+}
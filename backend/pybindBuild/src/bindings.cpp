@@ -4,49 +4,497 @@
 #include "compression/lz4_wrapper.h"
 #include "fragmentation/fragmenter.h"
 #include "fragmentation/xor_coder.h"
+#include "compression/chunked.h"
+#include "compression/lz4_stream.h"
+#include "compression/telemetry_codec.h"
+#include "compression/lz4_dict.h"
+#include "fragmentation/erasure.h"
+#include "utils/crc32c.h"
+#include "utils/parallel.h"
+#include <lz4.h>
+#include <algorithm>
+#include <cstring>
+#include <stdexcept>
 
 namespace py = pybind11;
 
-// Adaptadores para convertir bytes de Python a vectores de C++
-pybind11::bytes py_compress(const std::string &input) {
-    std::vector<char> vec(input.begin(), input.end());
-    auto out = compressBlock(vec);
-    return py::bytes(std::string(out.begin(), out.end()));
+// Vista contigua de solo lectura sobre cualquier objeto con buffer protocol (bytes, bytearray, memoryview...)
+static py::buffer_info readBuffer(const py::buffer &input) {
+    py::buffer_info info = input.request();
+    if (info.ndim > 1 || (info.ndim == 1 && info.strides[0] != info.itemsize)) {
+        throw std::invalid_argument("se requiere un buffer contiguo de 1 dimension");
+    }
+    return info;
 }
 
-std::vector<uint8_t> py_xor(const std::string &a, const std::string &b) {
-    std::vector<uint8_t> va(a.begin(), a.end());
-    std::vector<uint8_t> vb(b.begin(), b.end());
-    return xorBlocks(va, vb);
+// Todas las funciones reciben cualquier objeto con buffer protocol y sueltan el GIL mientras
+// trabajan: el Py_buffer solicitado mantiene vivo (y sin redimensionar) el buffer de entrada.
+
+// La API de bloque de LZ4 trabaja con int: por encima de LZ4_MAX_INPUT_SIZE el cast desborda
+static int blockSize(const py::buffer_info &info) {
+    size_t size = info.size * info.itemsize;
+    if (size > static_cast<size_t>(LZ4_MAX_INPUT_SIZE)) {
+        throw std::length_error("entrada mayor que LZ4_MAX_INPUT_SIZE: use compress_chunked");
+    }
+    return static_cast<int>(size);
 }
 
-// Fragmentador que devuelve lista de bytes objects a Python
-std::vector<py::bytes> py_fragment(const std::string &input, size_t size) {
-    std::vector<uint8_t> data(input.begin(), input.end());
-    auto fragments = fragmentData(data, size);
-    
-    std::vector<py::bytes> py_frags;
-    for(const auto& frag : fragments) {
-        py_frags.push_back(py::bytes(std::string(frag.begin(), frag.end())));
+// Comprime directamente desde el buffer de entrada hacia un objeto bytes de Python (sin copias intermedias)
+py::bytes py_compress(const py::buffer &input) {
+    py::buffer_info info = readBuffer(input);
+    int inputSize = blockSize(info);
+    int maxSize = compressBound(inputSize);
+
+    PyObject *out = PyBytes_FromStringAndSize(nullptr, maxSize);
+    if (!out) throw py::error_already_set();
+    char *dst = PyBytes_AS_STRING(out);
+    int compressedSize;
+    {
+        py::gil_scoped_release release;
+        compressedSize = compressRaw(static_cast<const char *>(info.ptr), inputSize, dst, maxSize);
+    }
+    if (compressedSize <= 0) {
+        Py_DECREF(out);
+        throw std::runtime_error("LZ4_compress_default fallo");
+    }
+    if (_PyBytes_Resize(&out, compressedSize) < 0) throw py::error_already_set();
+    return py::reinterpret_steal<py::bytes>(out);
+}
+
+py::bytes py_decompress(const py::buffer &input, int originalSize) {
+    py::buffer_info info = readBuffer(input);
+    int inputSize = blockSize(info);
+    if (originalSize < 0) throw std::invalid_argument("originalSize debe ser >= 0");
+    PyObject *out = PyBytes_FromStringAndSize(nullptr, originalSize);
+    if (!out) throw py::error_already_set();
+    char *dst = PyBytes_AS_STRING(out);
+    int written;
+    {
+        py::gil_scoped_release release;
+        written = decompressRaw(
+            static_cast<const char *>(info.ptr), inputSize, dst, originalSize
+        );
+    }
+    if (written < 0) {
+        Py_DECREF(out);
+        throw std::runtime_error("datos LZ4 corruptos");
+    }
+    if (written != originalSize && _PyBytes_Resize(&out, written) < 0) throw py::error_already_set();
+    return py::reinterpret_steal<py::bytes>(out);
+}
+
+// Modo por bloques: compresión paralela en `threads` hilos (0 = los de set_threads)
+py::bytes py_compress_chunked(const py::buffer &input, size_t blockSize, unsigned threads) {
+    py::buffer_info info = readBuffer(input);
+    std::vector<char> out;
+    {
+        py::gil_scoped_release release;
+        out = compressChunked(static_cast<const char *>(info.ptr), info.size * info.itemsize, blockSize, threads);
+    }
+    return py::bytes(out.data(), out.size());
+}
+
+py::bytes py_decompress_chunked(const py::buffer &input, unsigned threads) {
+    py::buffer_info info = readBuffer(input);
+    const char *src = static_cast<const char *>(info.ptr);
+    size_t size = info.size * info.itemsize;
+
+    PyObject *out = PyBytes_FromStringAndSize(nullptr, static_cast<py::ssize_t>(chunkedOriginalSize(src, size)));
+    if (!out) throw py::error_already_set();
+    auto result = py::reinterpret_steal<py::bytes>(out);
+    char *dst = PyBytes_AS_STRING(out);
+    {
+        py::gil_scoped_release release;
+        decompressChunked(src, size, dst, threads);
+    }
+    return result;
+}
+
+py::bytes py_compress_telemetry(const py::buffer &input) {
+    py::buffer_info info = readBuffer(input);
+    std::vector<char> out;
+    {
+        py::gil_scoped_release release;
+        out = compressTelemetry(static_cast<const char *>(info.ptr), info.size * info.itemsize);
+    }
+    return py::bytes(out.data(), out.size());
+}
+
+py::bytes py_decompress_telemetry(const py::buffer &input) {
+    py::buffer_info info = readBuffer(input);
+    const char *src = static_cast<const char *>(info.ptr);
+    size_t size = info.size * info.itemsize;
+
+    PyObject *out = PyBytes_FromStringAndSize(nullptr, static_cast<py::ssize_t>(telemetryOriginalSize(src, size)));
+    if (!out) throw py::error_already_set();
+    auto result = py::reinterpret_steal<py::bytes>(out);
+    char *dst = PyBytes_AS_STRING(out);
+    {
+        py::gil_scoped_release release;
+        decompressTelemetry(src, size, dst);
+    }
+    return result;
+}
+
+Lz4Dictionary py_train_dictionary(const py::list &samples, size_t size, uint32_t dictId, size_t segmentSize) {
+    std::vector<py::buffer_info> infos;
+    std::vector<std::string_view> views;
+    for (auto item : samples) {
+        infos.push_back(readBuffer(item.cast<py::buffer>()));
+        views.emplace_back(static_cast<const char *>(infos.back().ptr), infos.back().size * infos.back().itemsize);
+    }
+    std::vector<char> content;
+    {
+        py::gil_scoped_release release;
+        content = trainDictionary(views, size, segmentSize);
+    }
+    return Lz4Dictionary(std::move(content), dictId);
+}
+
+py::bytes py_dict_compress(const Lz4Dictionary &dict, const py::buffer &input) {
+    py::buffer_info info = readBuffer(input);
+    size_t size = info.size * info.itemsize;
+    size_t bound = dict.compressBound(size);
+
+    PyObject *out = PyBytes_FromStringAndSize(nullptr, static_cast<py::ssize_t>(bound));
+    if (!out) throw py::error_already_set();
+    size_t written;
+    {
+        py::gil_scoped_release release;
+        written = dict.compress(static_cast<const char *>(info.ptr), size, PyBytes_AS_STRING(out), bound);
+    }
+    if (_PyBytes_Resize(&out, static_cast<py::ssize_t>(written)) < 0) throw py::error_already_set();
+    return py::reinterpret_steal<py::bytes>(out);
+}
+
+py::bytes py_dict_decompress(const Lz4Dictionary &dict, const py::buffer &input) {
+    py::buffer_info info = readBuffer(input);
+    const char *src = static_cast<const char *>(info.ptr);
+    size_t size = info.size * info.itemsize;
+
+    PyObject *out = PyBytes_FromStringAndSize(nullptr, static_cast<py::ssize_t>(dictMessageOriginalSize(src, size)));
+    if (!out) throw py::error_already_set();
+    auto result = py::reinterpret_steal<py::bytes>(out);
+    char *dst = PyBytes_AS_STRING(out);
+    {
+        py::gil_scoped_release release;
+        dict.decompress(src, size, dst);
+    }
+    return result;
+}
+
+py::bytes py_xor(const py::buffer &a, const py::buffer &b) {
+    py::buffer_info ia = readBuffer(a), ib = readBuffer(b);
+    size_t size = std::min(ia.size * ia.itemsize, ib.size * ib.itemsize);
+    PyObject *out = PyBytes_FromStringAndSize(nullptr, static_cast<py::ssize_t>(size));
+    if (!out) throw py::error_already_set();
+    auto *dst = reinterpret_cast<uint8_t *>(PyBytes_AS_STRING(out));
+    {
+        py::gil_scoped_release release;
+        xorInto(static_cast<const uint8_t *>(ia.ptr), static_cast<const uint8_t *>(ib.ptr), dst, size);
+    }
+    return py::reinterpret_steal<py::bytes>(out);
+}
+
+// Fragmentador: devuelve slices memoryview sobre el mismo buffer de entrada (sin copiar datos)
+py::list py_fragment(const py::buffer &input, size_t size) {
+    if (size == 0) throw std::invalid_argument("el tamano de fragmento debe ser > 0");
+    py::buffer_info info = readBuffer(input);
+    size_t total = info.size * info.itemsize;
+    auto view = py::reinterpret_steal<py::object>(PyMemoryView_FromObject(input.ptr()));
+    if (!view) throw py::error_already_set();
+    if (info.itemsize != 1) view = view.attr("cast")("B");
+
+    py::list py_frags;
+    for (size_t i = 0; i < total; i += size) {
+        size_t end = std::min(i + size, total);
+        py_frags.append(view[py::slice(static_cast<py::ssize_t>(i), static_cast<py::ssize_t>(end), 1)]);
     }
     return py_frags;
 }
 
+// Bytes nuevos de `count` elementos vistos como memoryview tipado ("Q", "I"...):
+// compatible con numpy.frombuffer / numpy.asarray sin depender de numpy
+static std::pair<py::object, char *> newArray(size_t count, size_t itemsize, const char *format) {
+    PyObject *raw = PyBytes_FromStringAndSize(nullptr, static_cast<py::ssize_t>(count * itemsize));
+    if (!raw) throw py::error_already_set();
+    char *ptr = PyBytes_AS_STRING(raw);
+    auto view = py::reinterpret_steal<py::object>(PyMemoryView_FromObject(raw));
+    Py_DECREF(raw);     // el memoryview conserva la referencia
+    if (!view) throw py::error_already_set();
+    return {view.attr("cast")(format), ptr};
+}
+
+// Arreglo de enteros de 64 bits (offsets/longitudes) recibido por buffer protocol
+static py::buffer_info readIndex(const py::buffer &input, const char *name) {
+    py::buffer_info info = readBuffer(input);
+    char kind = info.format.empty() ? 'B' : info.format.back();
+    if (info.itemsize != 8 || kind == 'd') {
+        throw std::invalid_argument(std::string(name) + " debe ser un arreglo de enteros de 64 bits");
+    }
+    return info;
+}
+
+uint32_t py_crc32c(const py::buffer &input, uint32_t value) {
+    py::buffer_info info = readBuffer(input);
+    py::gil_scoped_release release;
+    return crc32c(static_cast<const uint8_t *>(info.ptr), info.size * info.itemsize, value);
+}
+
+// Fragmentación sin un objeto por fragmento: devuelve (vista del buffer, offsets "Q", longitudes "Q",
+// crc32c por fragmento "I"). El llamante corta buffer[offsets[i]:offsets[i] + lengths[i]] cuando lo necesite.
+py::tuple py_fragment_index(const py::buffer &input, size_t size) {
+    if (size == 0) throw std::invalid_argument("el tamano de fragmento debe ser > 0");
+    py::buffer_info info = readBuffer(input);
+    size_t total = info.size * info.itemsize;
+    size_t count = (total + size - 1) / size;
+
+    auto view = py::reinterpret_steal<py::object>(PyMemoryView_FromObject(input.ptr()));
+    if (!view) throw py::error_already_set();
+    if (info.itemsize != 1) view = view.attr("cast")("B");
+
+    auto offsets = newArray(count, sizeof(uint64_t), "Q");
+    auto lengths = newArray(count, sizeof(uint64_t), "Q");
+    auto checksums = newArray(count, sizeof(uint32_t), "I");
+    {
+        py::gil_scoped_release release;
+        auto *off = reinterpret_cast<uint64_t *>(offsets.second);
+        auto *len = reinterpret_cast<uint64_t *>(lengths.second);
+        for (size_t i = 0; i < count; ++i) {
+            off[i] = i * size;
+            len[i] = std::min(size, total - i * size);
+        }
+        crc32cFragments(static_cast<const uint8_t *>(info.ptr), off, len, count,
+                        reinterpret_cast<uint32_t *>(checksums.second));
+    }
+    return py::make_tuple(view, offsets.first, lengths.first, checksums.first);
+}
+
+// Recalcula el crc32c de cada fragmento de un buffer contiguo (verificación en bloque en el receptor)
+py::object py_crc32c_fragments(const py::buffer &input, const py::buffer &offsets, const py::buffer &lengths) {
+    py::buffer_info info = readBuffer(input);
+    py::buffer_info off = readIndex(offsets, "offsets");
+    py::buffer_info len = readIndex(lengths, "lengths");
+    if (off.size != len.size) throw std::invalid_argument("offsets y lengths deben tener la misma longitud");
+
+    size_t total = info.size * info.itemsize;
+    size_t count = off.size;
+    const auto *o = static_cast<const uint64_t *>(off.ptr);
+    const auto *l = static_cast<const uint64_t *>(len.ptr);
+    for (size_t i = 0; i < count; ++i) {
+        if (o[i] > total || l[i] > total - o[i]) throw std::out_of_range("fragmento fuera del buffer");
+    }
+
+    auto checksums = newArray(count, sizeof(uint32_t), "I");
+    {
+        py::gil_scoped_release release;
+        crc32cFragments(static_cast<const uint8_t *>(info.ptr), o, l, count,
+                        reinterpret_cast<uint32_t *>(checksums.second));
+    }
+    return checksums.first;
+}
+
+// Shards de un grupo FEC con tamaño común: los más cortos se rellenan con ceros en una copia
+struct ShardSet {
+    std::vector<py::buffer_info> infos;
+    std::vector<std::vector<uint8_t>> padded;
+    std::vector<const uint8_t *> ptrs;
+    size_t shardSize = 0;
+
+    explicit ShardSet(const py::list &shards) {
+        for (auto item : shards) {
+            if (item.is_none()) {
+                infos.emplace_back();
+                continue;
+            }
+            infos.push_back(readBuffer(item.cast<py::buffer>()));
+            shardSize = std::max(shardSize, size_t(infos.back().size * infos.back().itemsize));
+        }
+        padded.reserve(infos.size());
+        for (auto &info : infos) {
+            size_t len = info.size * info.itemsize;
+            if (!info.ptr) {
+                ptrs.push_back(nullptr);
+            } else if (len == shardSize) {
+                ptrs.push_back(static_cast<const uint8_t *>(info.ptr));
+            } else {
+                padded.emplace_back(shardSize, 0);
+                std::memcpy(padded.back().data(), info.ptr, len);
+                ptrs.push_back(padded.back().data());
+            }
+        }
+    }
+};
+
+static std::vector<py::bytes> newShards(int n, size_t size, std::vector<uint8_t *> &ptrs) {
+    std::vector<py::bytes> out;
+    for (int i = 0; i < n; ++i) {
+        PyObject *obj = PyBytes_FromStringAndSize(nullptr, static_cast<py::ssize_t>(size));
+        if (!obj) throw py::error_already_set();
+        out.push_back(py::reinterpret_steal<py::bytes>(obj));
+        ptrs.push_back(reinterpret_cast<uint8_t *>(PyBytes_AS_STRING(obj)));
+    }
+    return out;
+}
+
+// Antes de reservar nada: newShards(m, ...) y el tamaño de la matriz no admiten k o m <= 0
+static void checkFecShape(int k, int m) {
+    if (k <= 0) throw std::invalid_argument("k debe ser > 0");
+    if (m <= 0) throw std::invalid_argument("m debe ser > 0");
+}
+
+// Devuelve m shards de paridad (del tamaño del shard más largo) para los k shards de datos
+py::list py_fec_encode(const py::list &data, int m, const std::string &code) {
+    checkFecShape(static_cast<int>(data.size()), m);
+    ErasureCoder coder(static_cast<int>(data.size()), m, code);
+    ShardSet set(data);
+    for (auto *p : set.ptrs)
+        if (!p) throw std::invalid_argument("fec_encode no admite shards None");
+
+    std::vector<uint8_t *> parityPtrs;
+    auto parity = newShards(m, set.shardSize, parityPtrs);
+    {
+        py::gil_scoped_release release;
+        coder.encode(set.ptrs.data(), parityPtrs.data(), set.shardSize);
+    }
+    return py::cast(parity);
+}
+
+// shards: k + m elementos (None = perdido). Devuelve los k shards de datos, todos rellenos con
+// ceros al tamaño común (el del shard más largo), se hayan recibido o reconstruido
+py::list py_fec_decode(const py::list &shards, int k, int m, const std::string &code) {
+    checkFecShape(k, m);
+    if (static_cast<int>(shards.size()) != k + m) throw std::invalid_argument("se esperaban k + m shards");
+    ErasureCoder coder(k, m, code);
+    ShardSet set(shards);
+
+    std::vector<uint8_t *> outPtrs(k, nullptr);
+    py::list result;
+    std::vector<py::bytes> rebuilt;
+    for (int j = 0; j < k; ++j) {
+        if (set.ptrs[j]) continue;
+        std::vector<uint8_t *> one;
+        rebuilt.push_back(newShards(1, set.shardSize, one)[0]);
+        outPtrs[j] = one[0];
+    }
+    {
+        py::gil_scoped_release release;
+        coder.decode(set.ptrs.data(), outPtrs.data(), set.shardSize);
+    }
+
+    size_t next = 0;
+    for (int j = 0; j < k; ++j) {
+        const py::buffer_info &info = set.infos[j];
+        if (!set.ptrs[j]) result.append(rebuilt[next++]);
+        else if (size_t(info.size * info.itemsize) == set.shardSize) result.append(shards[j]);
+        else result.append(py::bytes(reinterpret_cast<const char *>(set.ptrs[j]), set.shardSize));  // copia rellena
+    }
+    return result;
+}
+
+// Copia un vector ya construido a bytes de Python (la salida de cada paso está acotada por el bloque)
+static py::bytes toBytes(const std::vector<char> &out) {
+    return py::bytes(out.data(), out.size());
+}
+
 PYBIND11_MODULE(cpp_core, m) {
     m.doc() = "Modulo de alto rendimiento para transmision satelital";
     
     m.def("compress", &py_compress, "Comprime datos usando LZ4");
     
-    m.def("decompress", [](const std::string &input, int originalSize) {
-        std::vector<char> vec(input.begin(), input.end());
-        auto res = decompressBlock(vec, originalSize);
-        return py::bytes(std::string(res.begin(), res.end()));
-    }, "Descomprime datos LZ4");
+    m.def("decompress", &py_decompress, "Descomprime datos LZ4");
+
+    m.def("set_threads", [](unsigned threads) { defaultThreads() = threads; },
+          "Hilos por llamada cuando se pide threads = 0 (0 = todos los nucleos)", py::arg("threads"));
+
+    m.def("get_threads", []() { return defaultThreads().load(); },
+          "Hilos por defecto fijados con set_threads (0 = todos los nucleos)");
+
+    m.def("compress_chunked", &py_compress_chunked, "Comprime en bloques LZ4 independientes en paralelo",
+          py::arg("data"), py::arg("block_size") = 1 << 20, py::arg("threads") = 0);
+
+    m.def("decompress_chunked", &py_decompress_chunked, "Descomprime un buffer de compress_chunked en paralelo",
+          py::arg("data"), py::arg("threads") = 0);
+
+    m.def("compress_telemetry", &py_compress_telemetry,
+          "Comprime CSV numerico por columnas (delta-of-delta / Gorilla) + LZ4; ValueError si no es CSV numerico");
+
+    m.def("decompress_telemetry", &py_decompress_telemetry, "Reconstruye exactamente el CSV de compress_telemetry");
+
+    py::class_<Lz4Dictionary>(m, "Dictionary", "Diccionario LZ4 versionado para mensajes cortos")
+        .def(py::init([](const py::buffer &data) {
+            py::buffer_info info = readBuffer(data);
+            return Lz4Dictionary::deserialize(static_cast<const char *>(info.ptr), info.size * info.itemsize);
+        }), py::arg("data"), "Carga un diccionario serializado con to_bytes()")
+        .def_property_readonly("id", &Lz4Dictionary::id)
+        .def_property_readonly("size", &Lz4Dictionary::size)
+        .def("to_bytes", [](const Lz4Dictionary &self) { return toBytes(self.serialize()); })
+        .def("compress", &py_dict_compress, "Comprime un mensaje usando el diccionario como historia")
+        .def("decompress", &py_dict_decompress, "Descomprime un mensaje de compress (ValueError si es de otro diccionario)");
+
+    m.def("train_dictionary", &py_train_dictionary,
+          "Entrena un diccionario con los k-gramas mas frecuentes entre muestras (id = 0: derivado del contenido)",
+          py::arg("samples"), py::arg("size") = 64 * 1024, py::arg("dict_id") = 0, py::arg("segment_size") = 64);
+
+    m.def("dictionary_id", [](const py::buffer &data) {
+        py::buffer_info info = readBuffer(data);
+        return dictMessageId(static_cast<const char *>(info.ptr), info.size * info.itemsize);
+    }, "Id del diccionario que necesita un mensaje comprimido con Dictionary.compress");
+
+    py::class_<FrameCompressor>(m, "FrameCompressor", "Compresor LZ4 frame incremental (update/flush)")
+        .def(py::init<size_t, uint64_t>(), py::arg("block_size") = 64 * 1024, py::arg("content_size") = 0)
+        .def("update", [](FrameCompressor &self, const py::buffer &data) {
+            py::buffer_info info = readBuffer(data);
+            std::vector<char> out;
+            {
+                py::gil_scoped_release release;
+                out = self.update(static_cast<const char *>(info.ptr), info.size * info.itemsize);
+            }
+            return toBytes(out);
+        }, "Comprime un trozo; devuelve los bytes del frame producidos hasta ahora")
+        .def("flush", [](FrameCompressor &self) {
+            std::vector<char> out;
+            {
+                py::gil_scoped_release release;
+                out = self.flush();
+            }
+            return toBytes(out);
+        }, "Cierra el frame (marca de fin y checksum de contenido)");
+
+    py::class_<FrameDecompressor>(m, "FrameDecompressor", "Descompresor LZ4 frame incremental")
+        .def(py::init<>())
+        .def("update", [](FrameDecompressor &self, const py::buffer &data) {
+            py::buffer_info info = readBuffer(data);
+            std::vector<char> out;
+            {
+                py::gil_scoped_release release;
+                out = self.update(static_cast<const char *>(info.ptr), info.size * info.itemsize);
+            }
+            return toBytes(out);
+        }, "Descomprime un trozo del frame; verifica checksums de bloque y contenido")
+        .def_property_readonly("finished", &FrameDecompressor::finished)
+        .def_property_readonly("content_size", [](const FrameDecompressor &self) -> py::object {
+            if (self.contentSize() < 0) return py::none();
+            return py::int_(self.contentSize());
+        });
+
+    m.def("fec_encode", &py_fec_encode, "Genera m shards de paridad (codigo xor o cauchy) para k shards de datos",
+          py::arg("data"), py::arg("m"), py::arg("code") = "cauchy");
+
+    m.def("fec_decode", &py_fec_decode, "Recupera los k shards de datos a partir de k + m shards (None = perdido)",
+          py::arg("shards"), py::arg("k"), py::arg("m"), py::arg("code") = "cauchy");
 
     m.def("fragment", &py_fragment, "Fragmenta datos en bloques");
+
+    m.def("fragment_index", &py_fragment_index,
+          "Fragmenta sin copiar: (buffer, offsets, lengths, crc32c) con arreglos contiguos",
+          py::arg("data"), py::arg("size"));
+
+    m.def("crc32c", &py_crc32c, "CRC32C (Castagnoli) de un buffer; value permite encadenar",
+          py::arg("data"), py::arg("value") = 0);
+
+    m.def("crc32c_fragments", &py_crc32c_fragments, "CRC32C de cada fragmento buffer[offset:offset + length]",
+          py::arg("data"), py::arg("offsets"), py::arg("lengths"));
     
-    m.def("xor_blocks", [](const std::string &a, const std::string &b){
-         auto res = py_xor(a, b);
-         return py::bytes(std::string(res.begin(), res.end()));
-    }, "Aplica XOR network coding");
+    m.def("xor_blocks", &py_xor, "Aplica XOR network coding");
 }
\ No newline at end of file
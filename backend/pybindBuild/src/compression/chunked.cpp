@@ -0,0 +1,105 @@
+#include "chunked.h"
+#include "lz4_wrapper.h"
+#include "../utils/parallel.h"
+#include <cstring>
+#include <limits>
+#include <stdexcept>
+
+namespace {
+
+const char MAGIC[4] = {'S', 'C', 'K', '1'};
+
+template <typename T>
+void put(char* dst, T value) { std::memcpy(dst, &value, sizeof(T)); }
+
+template <typename T>
+T get(const char* src) {
+    T value;
+    std::memcpy(&value, src, sizeof(T));
+    return value;
+}
+
+struct Header {
+    uint32_t blockSize;
+    uint64_t originalSize;
+    uint32_t nBlocks;
+};
+
+Header readHeader(const char* data, size_t size) {
+    if (size < CHUNKED_HEADER_SIZE || std::memcmp(data, MAGIC, 4) != 0) {
+        throw std::invalid_argument("no es un buffer LZ4 chunked");
+    }
+    Header h{get<uint32_t>(data + 4), get<uint64_t>(data + 8), get<uint32_t>(data + 16)};
+    if (h.blockSize == 0 || h.nBlocks != (h.originalSize + h.blockSize - 1) / h.blockSize) {
+        throw std::invalid_argument("cabecera chunked inconsistente");
+    }
+    if (size < CHUNKED_HEADER_SIZE + size_t(h.nBlocks) * 4) {
+        throw std::invalid_argument("cabecera chunked truncada");
+    }
+    return h;
+}
+
+}
+
+std::vector<char> compressChunked(const char* input, size_t size, size_t blockSize, unsigned threads) {
+    if (blockSize == 0 || blockSize > size_t(std::numeric_limits<int>::max() / 2)) {
+        throw std::invalid_argument("block_size fuera de rango");
+    }
+    size_t nBlocks = (size + blockSize - 1) / blockSize;
+    size_t slot = compressBound(static_cast<int>(blockSize));
+
+    // Cada hilo escribe en su propia ranura; después se compactan en orden
+    std::vector<char> scratch(nBlocks * slot);
+    std::vector<uint32_t> sizes(nBlocks);
+    std::atomic<bool> failed{false};        //no se puede lanzar desde los hilos trabajadores
+    parallelFor(nBlocks, threads, [&](size_t i) {
+        size_t begin = i * blockSize;
+        int len = static_cast<int>(std::min(blockSize, size - begin));
+        int written = compressRaw(input + begin, len, scratch.data() + i * slot, static_cast<int>(slot));
+        if (written <= 0) failed = true;
+        sizes[i] = static_cast<uint32_t>(written);
+    });
+    if (failed) throw std::runtime_error("fallo de compresion LZ4");
+
+    size_t total = CHUNKED_HEADER_SIZE + nBlocks * 4;
+    for (uint32_t s : sizes) total += s;
+
+    std::vector<char> out(total);
+    std::memcpy(out.data(), MAGIC, 4);
+    put<uint32_t>(out.data() + 4, static_cast<uint32_t>(blockSize));
+    put<uint64_t>(out.data() + 8, static_cast<uint64_t>(size));
+    put<uint32_t>(out.data() + 16, static_cast<uint32_t>(nBlocks));
+    char* cursor = out.data() + CHUNKED_HEADER_SIZE;
+    for (uint32_t s : sizes) { put<uint32_t>(cursor, s); cursor += 4; }
+    for (size_t i = 0; i < nBlocks; ++i) {
+        std::memcpy(cursor, scratch.data() + i * slot, sizes[i]);
+        cursor += sizes[i];
+    }
+    return out;
+}
+
+uint64_t chunkedOriginalSize(const char* compressed, size_t size) {
+    return readHeader(compressed, size).originalSize;
+}
+
+void decompressChunked(const char* compressed, size_t size, char* output, unsigned threads) {
+    Header h = readHeader(compressed, size);
+
+    // Offsets de cada bloque a partir de la tabla de tamaños
+    std::vector<size_t> offsets(h.nBlocks + 1);
+    offsets[0] = CHUNKED_HEADER_SIZE + size_t(h.nBlocks) * 4;
+    for (uint32_t i = 0; i < h.nBlocks; ++i) {
+        offsets[i + 1] = offsets[i] + get<uint32_t>(compressed + CHUNKED_HEADER_SIZE + i * 4);
+    }
+    if (offsets[h.nBlocks] > size) throw std::invalid_argument("buffer chunked truncado");
+
+    std::atomic<bool> corrupt{false};
+    parallelFor(h.nBlocks, threads, [&](size_t i) {
+        size_t begin = i * size_t(h.blockSize);
+        int expected = static_cast<int>(std::min<uint64_t>(h.blockSize, h.originalSize - begin));
+        int written = decompressRaw(compressed + offsets[i], static_cast<int>(offsets[i + 1] - offsets[i]),
+                                    output + begin, expected);
+        if (written != expected) corrupt = true;
+    });
+    if (corrupt) throw std::runtime_error("datos LZ4 corruptos");
+}
@@ -0,0 +1,17 @@
+#pragma once
+#include <cstddef>
+#include <cstdint>
+#include <vector>
+
+// Formato por bloques independientes (little-endian):
+//   "SCK1" | uint32 blockSize | uint64 originalSize | uint32 nBlocks | uint32 compressedSize[nBlocks] | bloques...
+// Cada bloque se comprime con LZ4 por separado, así compresión y descompresión son paralelas.
+constexpr size_t CHUNKED_HEADER_SIZE = 4 + 4 + 8 + 4;
+
+std::vector<char> compressChunked(const char* input, size_t size, size_t blockSize, unsigned threads);
+
+// Tamaño original guardado en la cabecera (lanza std::invalid_argument si no es formato chunked)
+uint64_t chunkedOriginalSize(const char* compressed, size_t size);
+
+// Descomprime en `output` (de chunkedOriginalSize bytes)
+void decompressChunked(const char* compressed, size_t size, char* output, unsigned threads);
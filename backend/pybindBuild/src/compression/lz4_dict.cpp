@@ -0,0 +1,198 @@
+#include "lz4_dict.h"
+#include "../utils/crc32c.h"
+#include <algorithm>
+#include <cstring>
+#include <limits>
+#include <queue>
+#include <stdexcept>
+
+namespace {
+
+const char DICT_MAGIC[4] = {'S', 'D', 'I', '1'};
+const char MESSAGE_MAGIC[4] = {'S', 'D', 'M', '1'};
+
+constexpr int HASH_BITS = 20;
+constexpr size_t KMER = 6;
+
+template <typename T>
+void put(char* dst, T value) { std::memcpy(dst, &value, sizeof(T)); }
+
+template <typename T>
+T get(const char* src) {
+    T value;
+    std::memcpy(&value, src, sizeof(T));
+    return value;
+}
+
+uint32_t kmerHash(const char* p) {
+    uint64_t v = 0;
+    std::memcpy(&v, p, KMER);
+    return static_cast<uint32_t>((v * 0x9E3779B97F4A7C15ull) >> (64 - HASH_BITS));
+}
+
+struct Segment {
+    size_t sample;
+    size_t offset;
+    size_t length;
+};
+
+}
+
+std::vector<char> trainDictionary(const std::vector<std::string_view>& samples, size_t dictSize, size_t segmentSize) {
+    if (dictSize == 0 || dictSize > DICT_MAX_SIZE) throw std::invalid_argument("el diccionario debe medir entre 1 y 65536 bytes");
+    if (segmentSize < KMER) throw std::invalid_argument("segment_size demasiado pequeno");
+
+    size_t total = 0;
+    for (auto s : samples) total += s.size();
+    if (total == 0) throw std::invalid_argument("no hay muestras para entrenar");
+
+    // Pocas muestras: caben enteras
+    if (total <= dictSize) {
+        std::vector<char> dict;
+        for (auto s : samples) dict.insert(dict.end(), s.begin(), s.end());
+        return dict;
+    }
+
+    // Frecuencia de cada k-grama = número de muestras que lo contienen
+    std::vector<uint32_t> freq(size_t(1) << HASH_BITS, 0), stamp(size_t(1) << HASH_BITS, 0);
+    for (size_t i = 0; i < samples.size(); ++i) {
+        auto s = samples[i];
+        for (size_t p = 0; p + KMER <= s.size(); ++p) {
+            uint32_t h = kmerHash(s.data() + p);
+            if (stamp[h] != i + 1) {
+                stamp[h] = static_cast<uint32_t>(i + 1);
+                ++freq[h];
+            }
+        }
+    }
+
+    std::vector<Segment> segments;
+    for (size_t i = 0; i < samples.size(); ++i) {
+        for (size_t off = 0; off < samples[i].size(); off += segmentSize) {
+            segments.push_back({i, off, std::min(segmentSize, samples[i].size() - off)});
+        }
+    }
+
+    // Puntuación: suma de frecuencias de los k-gramas distintos aún no cubiertos
+    std::fill(stamp.begin(), stamp.end(), 0);
+    uint32_t epoch = 0;
+    auto score = [&](const Segment& seg) {
+        ++epoch;
+        uint64_t sum = 0;
+        const char* base = samples[seg.sample].data() + seg.offset;
+        for (size_t p = 0; p + KMER <= seg.length; ++p) {
+            uint32_t h = kmerHash(base + p);
+            if (stamp[h] != epoch) {
+                stamp[h] = epoch;
+                sum += freq[h];
+            }
+        }
+        return sum;
+    };
+
+    std::priority_queue<std::pair<uint64_t, size_t>> heap;
+    for (size_t i = 0; i < segments.size(); ++i) heap.push({score(segments[i]), i});
+
+    // Voraz perezoso: una puntuación solo puede bajar, se recalcula al salir del heap
+    std::vector<size_t> chosen;
+    size_t used = 0;
+    while (!heap.empty() && used < dictSize) {
+        size_t idx = heap.top().second;
+        heap.pop();
+        uint64_t current = score(segments[idx]);
+        if (current == 0) continue;
+        if (!heap.empty() && current < heap.top().first) {
+            heap.push({current, idx});
+            continue;
+        }
+        const Segment& seg = segments[idx];
+        const char* base = samples[seg.sample].data() + seg.offset;
+        for (size_t p = 0; p + KMER <= seg.length; ++p) freq[kmerHash(base + p)] = 0;
+        chosen.push_back(idx);
+        used += seg.length;
+    }
+
+    // Los segmentos más valiosos al final: quedan más cerca del mensaje
+    std::vector<char> dict;
+    dict.reserve(std::min(used, dictSize));
+    for (auto it = chosen.rbegin(); it != chosen.rend(); ++it) {
+        const Segment& seg = segments[*it];
+        const char* base = samples[seg.sample].data() + seg.offset;
+        dict.insert(dict.end(), base, base + seg.length);
+    }
+    if (dict.size() > dictSize) dict.erase(dict.begin(), dict.begin() + (dict.size() - dictSize));
+    return dict;
+}
+
+Lz4Dictionary::Lz4Dictionary(std::vector<char> content, uint32_t id) : content_(std::move(content)), id_(id) {
+    if (content_.empty() || content_.size() > DICT_MAX_SIZE) {
+        throw std::invalid_argument("el diccionario debe medir entre 1 y 65536 bytes");
+    }
+    if (id_ == 0) {
+        id_ = crc32c(reinterpret_cast<const uint8_t*>(content_.data()), content_.size());
+        if (id_ == 0) id_ = 1;
+    }
+    LZ4_initStream(&prepared_, sizeof(prepared_));
+    LZ4_loadDict(&prepared_, content_.data(), static_cast<int>(content_.size()));
+}
+
+Lz4Dictionary Lz4Dictionary::deserialize(const char* data, size_t size) {
+    if (size < DICT_HEADER_SIZE || std::memcmp(data, DICT_MAGIC, 4) != 0) {
+        throw std::invalid_argument("no es un diccionario SDI1");
+    }
+    uint32_t id = get<uint32_t>(data + 4);
+    uint32_t length = get<uint32_t>(data + 8);
+    if (id == 0 || length != size - DICT_HEADER_SIZE) throw std::invalid_argument("cabecera de diccionario inconsistente");
+    return Lz4Dictionary(std::vector<char>(data + DICT_HEADER_SIZE, data + size), id);
+}
+
+std::vector<char> Lz4Dictionary::serialize() const {
+    std::vector<char> out(DICT_HEADER_SIZE + content_.size());
+    std::memcpy(out.data(), DICT_MAGIC, 4);
+    put<uint32_t>(out.data() + 4, id_);
+    put<uint32_t>(out.data() + 8, static_cast<uint32_t>(content_.size()));
+    std::memcpy(out.data() + DICT_HEADER_SIZE, content_.data(), content_.size());
+    return out;
+}
+
+size_t Lz4Dictionary::compressBound(size_t size) const {
+    if (size > size_t(LZ4_MAX_INPUT_SIZE)) throw std::invalid_argument("mensaje demasiado grande para un bloque LZ4");
+    return DICT_MESSAGE_HEADER_SIZE + LZ4_compressBound(static_cast<int>(size));
+}
+
+size_t Lz4Dictionary::compress(const char* src, size_t size, char* dst, size_t capacity) const {
+    if (capacity < compressBound(size)) throw std::invalid_argument("buffer de salida insuficiente");
+    // Copiar el stream ya indexado es más barato que volver a cargar el diccionario
+    LZ4_stream_t working;
+    std::memcpy(&working, &prepared_, sizeof(working));
+    int written = LZ4_compress_fast_continue(&working, src, dst + DICT_MESSAGE_HEADER_SIZE, static_cast<int>(size),
+                                             static_cast<int>(capacity - DICT_MESSAGE_HEADER_SIZE), 1);
+    if (written <= 0 && size > 0) throw std::runtime_error("fallo al comprimir con diccionario");
+    std::memcpy(dst, MESSAGE_MAGIC, 4);
+    put<uint32_t>(dst + 4, id_);
+    put<uint32_t>(dst + 8, static_cast<uint32_t>(size));
+    return DICT_MESSAGE_HEADER_SIZE + written;
+}
+
+void Lz4Dictionary::decompress(const char* src, size_t size, char* dst) const {
+    if (dictMessageId(src, size) != id_) throw std::invalid_argument("el mensaje usa otro diccionario");
+    int originalSize = static_cast<int>(dictMessageOriginalSize(src, size));
+    int got = LZ4_decompress_safe_usingDict(src + DICT_MESSAGE_HEADER_SIZE, dst,
+                                            static_cast<int>(size - DICT_MESSAGE_HEADER_SIZE), originalSize,
+                                            content_.data(), static_cast<int>(content_.size()));
+    if (got != originalSize) throw std::runtime_error("mensaje con diccionario corrupto");
+}
+
+uint32_t dictMessageId(const char* data, size_t size) {
+    if (size < DICT_MESSAGE_HEADER_SIZE || std::memcmp(data, MESSAGE_MAGIC, 4) != 0) {
+        throw std::invalid_argument("no es un mensaje SDM1");
+    }
+    return get<uint32_t>(data + 4);
+}
+
+uint32_t dictMessageOriginalSize(const char* data, size_t size) {
+    dictMessageId(data, size);
+    uint32_t original = get<uint32_t>(data + 8);
+    if (original > uint32_t(LZ4_MAX_INPUT_SIZE)) throw std::invalid_argument("cabecera SDM1 inconsistente");
+    return original;
+}
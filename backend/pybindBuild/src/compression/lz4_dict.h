@@ -0,0 +1,48 @@
+#pragma once
+#include <cstddef>
+#include <cstdint>
+#include <string_view>
+#include <vector>
+#include <lz4.h>
+
+// Diccionarios LZ4 para mensajes cortos: el bloque empieza con el diccionario como historia,
+// así las primeras líneas de un mensaje ya encuentran coincidencias.
+//   Diccionario serializado: "SDI1" | uint32 id | uint32 size | contenido (<= 64 KiB)
+//   Mensaje comprimido:      "SDM1" | uint32 id del diccionario | uint32 originalSize | bloque LZ4
+constexpr size_t DICT_HEADER_SIZE = 4 + 4 + 4;
+constexpr size_t DICT_MESSAGE_HEADER_SIZE = 4 + 4 + 4;
+constexpr size_t DICT_MAX_SIZE = 64 * 1024;     // LZ4 solo referencia los últimos 64 KiB
+
+// Elige los segmentos de `segmentSize` bytes cuyos k-gramas aparecen en más muestras
+// (selección voraz, estilo COVER) hasta llenar `dictSize` bytes.
+std::vector<char> trainDictionary(const std::vector<std::string_view>& samples, size_t dictSize, size_t segmentSize);
+
+class Lz4Dictionary {
+public:
+    // id = 0 deriva la versión del contenido (crc32c), así dos diccionarios distintos no se confunden
+    Lz4Dictionary(std::vector<char> content, uint32_t id);
+    // prepared_ apunta al contenido: se puede mover (el buffer no cambia de sitio) pero no copiar
+    Lz4Dictionary(const Lz4Dictionary&) = delete;
+    Lz4Dictionary& operator=(const Lz4Dictionary&) = delete;
+    Lz4Dictionary(Lz4Dictionary&&) = default;
+
+    static Lz4Dictionary deserialize(const char* data, size_t size);
+    std::vector<char> serialize() const;
+
+    uint32_t id() const { return id_; }
+    size_t size() const { return content_.size(); }
+
+    size_t compressBound(size_t size) const;
+    // Escribe cabecera + bloque en dst; devuelve los bytes escritos
+    size_t compress(const char* src, size_t size, char* dst, size_t capacity) const;
+    void decompress(const char* src, size_t size, char* dst) const;
+
+private:
+    std::vector<char> content_;
+    uint32_t id_;
+    LZ4_stream_t prepared_;     // diccionario ya indexado; se copia a un stream de trabajo por mensaje
+};
+
+// Cabecera de un mensaje comprimido con diccionario (std::invalid_argument si no es SDM1)
+uint32_t dictMessageId(const char* data, size_t size);
+uint32_t dictMessageOriginalSize(const char* data, size_t size);
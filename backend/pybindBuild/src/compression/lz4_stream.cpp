@@ -0,0 +1,130 @@
+#include "lz4_stream.h"
+#include <cstring>
+#include <stdexcept>
+#include <string>
+
+namespace {
+
+void check(size_t code) {
+    if (LZ4F_isError(code)) throw std::runtime_error(std::string("LZ4F: ") + LZ4F_getErrorName(code));
+}
+
+LZ4F_blockSizeID_t blockSizeId(size_t blockSize) {
+    switch (blockSize) {
+        case 64 * 1024: return LZ4F_max64KB;
+        case 256 * 1024: return LZ4F_max256KB;
+        case 1024 * 1024: return LZ4F_max1MB;
+        case 4 * 1024 * 1024: return LZ4F_max4MB;
+    }
+    throw std::invalid_argument("block_size debe ser 64 KiB, 256 KiB, 1 MiB o 4 MiB");
+}
+
+size_t blockSizeBytes(LZ4F_blockSizeID_t id) {
+    switch (id) {
+        case LZ4F_max256KB: return 256 * 1024;
+        case LZ4F_max1MB: return 1024 * 1024;
+        case LZ4F_max4MB: return 4 * 1024 * 1024;
+        default: return 64 * 1024;
+    }
+}
+
+}
+
+FrameCompressor::FrameCompressor(size_t blockSize, uint64_t contentSize) : blockSize_(blockSize) {
+    std::memset(&prefs_, 0, sizeof(prefs_));
+    prefs_.frameInfo.blockSizeID = blockSizeId(blockSize);
+    prefs_.frameInfo.blockMode = LZ4F_blockLinked;
+    prefs_.frameInfo.contentChecksumFlag = LZ4F_contentChecksumEnabled;
+    prefs_.frameInfo.blockChecksumFlag = LZ4F_blockChecksumEnabled;
+    prefs_.frameInfo.contentSize = contentSize;
+    check(LZ4F_createCompressionContext(&ctx_, LZ4F_VERSION));
+}
+
+FrameCompressor::~FrameCompressor() {
+    LZ4F_freeCompressionContext(ctx_);
+}
+
+void FrameCompressor::begin(std::vector<char>& out) {
+    out.resize(LZ4F_HEADER_SIZE_MAX);
+    size_t written = LZ4F_compressBegin(ctx_, out.data(), out.size(), &prefs_);
+    check(written);
+    out.resize(written);
+    started_ = true;
+}
+
+std::vector<char> FrameCompressor::update(const char* data, size_t size) {
+    if (finished_) throw std::logic_error("el frame ya fue cerrado con flush()");
+    std::vector<char> out;
+    if (!started_) begin(out);
+
+    // Se procesa de bloque en bloque para acotar el buffer de salida de cada paso
+    for (size_t pos = 0; pos < size; pos += blockSize_) {
+        size_t len = std::min(blockSize_, size - pos);
+        size_t offset = out.size();
+        out.resize(offset + LZ4F_compressBound(len, &prefs_));
+        size_t written = LZ4F_compressUpdate(ctx_, out.data() + offset, out.size() - offset, data + pos, len, nullptr);
+        check(written);
+        out.resize(offset + written);
+    }
+    return out;
+}
+
+std::vector<char> FrameCompressor::flush() {
+    if (finished_) return {};
+    std::vector<char> out;
+    if (!started_) begin(out);
+
+    size_t offset = out.size();
+    out.resize(offset + LZ4F_compressBound(0, &prefs_));
+    size_t written = LZ4F_compressEnd(ctx_, out.data() + offset, out.size() - offset, nullptr);
+    check(written);
+    out.resize(offset + written);
+    finished_ = true;
+    return out;
+}
+
+FrameDecompressor::FrameDecompressor() {
+    check(LZ4F_createDecompressionContext(&ctx_, LZ4F_VERSION));
+}
+
+FrameDecompressor::~FrameDecompressor() {
+    LZ4F_freeDecompressionContext(ctx_);
+}
+
+std::vector<char> FrameDecompressor::update(const char* data, size_t size) {
+    if (headerRead_) return decode(data, size);
+
+    // Acumular hasta tener la cabecera completa para conocer tamaño de bloque y de contenido
+    header_.insert(header_.end(), data, data + size);
+    LZ4F_frameInfo_t info;
+    size_t consumed = header_.size();
+    size_t code = LZ4F_getFrameInfo(ctx_, &info, header_.data(), &consumed);
+    if (LZ4F_isError(code)) {
+        if (header_.size() < LZ4F_HEADER_SIZE_MAX) return {};  // cabecera aún incompleta
+        check(code);
+    }
+
+    headerRead_ = true;
+    contentSize_ = info.contentSize ? static_cast<int64_t>(info.contentSize) : -1;
+    scratch_.resize(blockSizeBytes(info.blockSizeID));
+    std::vector<char> rest(header_.begin() + consumed, header_.end());
+    header_.clear();
+    header_.shrink_to_fit();
+    return decode(rest.data(), rest.size());
+}
+
+std::vector<char> FrameDecompressor::decode(const char* data, size_t size) {
+    std::vector<char> out;
+    size_t pos = 0;
+    while (!finished_) {
+        size_t dstSize = scratch_.size();
+        size_t srcSize = size - pos;
+        size_t hint = LZ4F_decompress(ctx_, scratch_.data(), &dstSize, data + pos, &srcSize, nullptr);
+        check(hint);
+        out.insert(out.end(), scratch_.data(), scratch_.data() + dstSize);
+        pos += srcSize;
+        if (hint == 0) finished_ = true;                        // frame completo y checksum verificado
+        else if (pos == size && dstSize < scratch_.size()) break;  // necesita más entrada
+    }
+    return out;
+}
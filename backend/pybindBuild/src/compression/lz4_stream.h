@@ -0,0 +1,51 @@
+#pragma once
+#include <cstddef>
+#include <cstdint>
+#include <vector>
+#include <lz4frame.h>
+
+// Compresor incremental en formato LZ4 frame (con checksums de bloque y de contenido).
+// La memoria usada depende del tamaño de bloque, no del total de datos.
+class FrameCompressor {
+public:
+    // blockSize: 64 KiB, 256 KiB, 1 MiB o 4 MiB. contentSize: 0 = desconocido (no se embebe)
+    FrameCompressor(size_t blockSize, uint64_t contentSize);
+    ~FrameCompressor();
+    FrameCompressor(const FrameCompressor&) = delete;
+    FrameCompressor& operator=(const FrameCompressor&) = delete;
+
+    std::vector<char> update(const char* data, size_t size);  // la primera llamada incluye la cabecera
+    std::vector<char> flush();                               // cierra el frame (fin + checksum)
+
+private:
+    void begin(std::vector<char>& out);
+
+    LZ4F_cctx* ctx_ = nullptr;
+    LZ4F_preferences_t prefs_;
+    size_t blockSize_;
+    bool started_ = false;
+    bool finished_ = false;
+};
+
+// Descompresor incremental: acepta el frame troceado de cualquier forma.
+class FrameDecompressor {
+public:
+    FrameDecompressor();
+    ~FrameDecompressor();
+    FrameDecompressor(const FrameDecompressor&) = delete;
+    FrameDecompressor& operator=(const FrameDecompressor&) = delete;
+
+    std::vector<char> update(const char* data, size_t size);
+    bool finished() const { return finished_; }
+    int64_t contentSize() const { return contentSize_; }  // -1 si el frame no lo incluye o aún no se leyó
+
+private:
+    std::vector<char> decode(const char* data, size_t size);
+
+    LZ4F_dctx* ctx_ = nullptr;
+    std::vector<char> header_;      // cabecera parcial hasta poder leer el FrameInfo
+    std::vector<char> scratch_;
+    bool headerRead_ = false;
+    bool finished_ = false;
+    int64_t contentSize_ = -1;
+};
@@ -1,13 +1,25 @@
 #include "lz4_wrapper.h"
 #include <lz4.h>
 
+int compressBound(int inputSize) {
+    return LZ4_compressBound(inputSize);
+}
+
+int compressRaw(const char* input, int inputSize, char* output, int outputCapacity) {      //returns compressed size, 0 on error
+    return LZ4_compress_default(input, output, inputSize, outputCapacity);
+}
+
+int decompressRaw(const char* compressed, int compressedSize, char* output, int originalSize) {     //returns bytes written, <0 on corrupt data
+    return LZ4_decompress_safe(compressed, output, compressedSize, originalSize);
+}
+
 std::vector<char>compressBlock(const std::vector<char>& input) {        //compression
-    int maxSize = LZ4_compressBound(input.size());
+    int maxSize = compressBound(input.size());
     std::vector<char> compressed(maxSize);
-    int compressedSize = LZ4_compress_default(
+    int compressedSize = compressRaw(
         input.data(),
-        compressed.data(),
         input.size(),
+        compressed.data(),
         maxSize
     );
     compressed.resize(compressedSize);
@@ -16,10 +28,10 @@ std::vector<char>compressBlock(const std::vector<char>& input) {        //compre
 
 std::vector<char>decompressBlock(const std::vector<char>& compressed, int originalSize) {       //decompression
     std::vector<char> output(originalSize);
-    LZ4_decompress_safe(
+    decompressRaw(
         compressed.data(),
-        output.data(),
         compressed.size(),
+        output.data(),
         originalSize
     );
     return output;
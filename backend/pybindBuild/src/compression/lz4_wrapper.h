@@ -6,3 +6,8 @@ std::vector<char> decompressBlock(
     const std::vector<char>& compressed,
     int originalSize
 );
+
+// Variantes sobre punteros crudos para trabajar directamente sobre buffers ajenos (p.ej. de Python)
+int compressBound(int inputSize);
+int compressRaw(const char* input, int inputSize, char* output, int outputCapacity);
+int decompressRaw(const char* compressed, int compressedSize, char* output, int originalSize);
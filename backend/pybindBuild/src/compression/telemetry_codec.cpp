@@ -0,0 +1,474 @@
+#include "telemetry_codec.h"
+#include "lz4_wrapper.h"
+#include <algorithm>
+#include <charconv>
+#include <cstdint>
+#include <cstring>
+#include <limits>
+#include <stdexcept>
+#include <string>
+#include <string_view>
+
+namespace {
+
+const char MAGIC[4] = {'S', 'T', 'S', '1'};
+
+enum ColumnKind : uint8_t { DECIMAL = 0, GORILLA = 1, RAW = 2 };
+
+// Un byte de formato por valor en columnas Gorilla: < 64 fijo con N decimales, >= 64 científico
+constexpr uint8_t SCIENTIFIC = 64;
+
+constexpr int64_t POW10[19] = {
+    1, 10, 100, 1000, 10000, 100000, 1000000, 10000000, 100000000, 1000000000,
+    10000000000, 100000000000, 1000000000000, 10000000000000, 100000000000000,
+    1000000000000000, 10000000000000000, 100000000000000000, 1000000000000000000,
+};
+
+template <typename T>
+void put(char* dst, T value) { std::memcpy(dst, &value, sizeof(T)); }
+
+template <typename T>
+T get(const char* src) {
+    T value;
+    std::memcpy(&value, src, sizeof(T));
+    return value;
+}
+
+uint64_t zigzag(int64_t v) { return (static_cast<uint64_t>(v) << 1) ^ static_cast<uint64_t>(v >> 63); }
+int64_t unzigzag(uint64_t v) { return static_cast<int64_t>(v >> 1) ^ -static_cast<int64_t>(v & 1); }
+
+struct Writer {
+    std::string out;
+
+    void byte(uint8_t b) { out.push_back(static_cast<char>(b)); }
+    void varint(uint64_t v) {
+        while (v >= 0x80) {
+            byte(static_cast<uint8_t>(v) | 0x80);
+            v >>= 7;
+        }
+        byte(static_cast<uint8_t>(v));
+    }
+    void bytes(const std::string& s) {
+        varint(s.size());
+        out += s;
+    }
+};
+
+struct Reader {
+    const char* p;
+    const char* end;
+
+    uint8_t byte() {
+        if (p >= end) throw std::runtime_error("cuerpo de telemetria truncado");
+        return static_cast<uint8_t>(*p++);
+    }
+    uint64_t varint() {
+        uint64_t v = 0;
+        for (int shift = 0; shift < 64; shift += 7) {
+            uint8_t b = byte();
+            v |= uint64_t(b & 0x7f) << shift;
+            if (!(b & 0x80)) return v;
+        }
+        throw std::runtime_error("varint invalido");
+    }
+    std::string_view bytes() {
+        uint64_t n = varint();
+        if (n > size_t(end - p)) throw std::runtime_error("cuerpo de telemetria truncado");
+        std::string_view s(p, n);
+        p += n;
+        return s;
+    }
+};
+
+// Bits MSB primero (flujo Gorilla)
+struct BitWriter {
+    std::string out;
+    int used = 8;
+
+    void bits(uint64_t v, int n) {
+        while (n > 0) {
+            if (used == 8) {
+                out.push_back(0);
+                used = 0;
+            }
+            int take = std::min(n, 8 - used);
+            uint8_t chunk = static_cast<uint8_t>((v >> (n - take)) & ((1u << take) - 1));
+            out.back() = static_cast<char>(static_cast<uint8_t>(out.back()) | (chunk << (8 - used - take)));
+            used += take;
+            n -= take;
+        }
+    }
+};
+
+struct BitReader {
+    std::string_view in;
+    size_t pos = 0;     // en bits
+
+    uint64_t bits(int n) {
+        if (pos + n > in.size() * 8) throw std::runtime_error("flujo Gorilla truncado");
+        uint64_t v = 0;
+        while (n > 0) {
+            uint8_t cur = static_cast<uint8_t>(in[pos / 8]);
+            int offset = pos % 8;
+            int take = std::min(n, 8 - offset);
+            v = (v << take) | ((cur >> (8 - offset - take)) & ((1u << take) - 1));
+            pos += take;
+            n -= take;
+        }
+        return v;
+    }
+};
+
+// Texto de un decimal de escala fija: scaled / 10^scale
+void formatDecimal(int64_t scaled, int scale, std::string& out) {
+    char digits[24];
+    uint64_t mag = scaled < 0 ? 0 - static_cast<uint64_t>(scaled) : static_cast<uint64_t>(scaled);
+    auto r = std::to_chars(digits, digits + sizeof(digits), mag);
+    std::string_view d(digits, r.ptr - digits);
+    if (scaled < 0) out.push_back('-');
+    if (scale == 0) {
+        out += d;
+        return;
+    }
+    if (d.size() <= size_t(scale)) {
+        out += "0.";
+        out.append(scale - d.size(), '0');
+        out += d;
+    } else {
+        out += d.substr(0, d.size() - scale);
+        out.push_back('.');
+        out += d.substr(d.size() - scale);
+    }
+}
+
+void formatDouble(double value, uint8_t format, std::string& out) {
+    char buf[400];
+    auto r = format >= SCIENTIFIC
+        ? std::to_chars(buf, buf + sizeof(buf), value, std::chars_format::scientific, format - SCIENTIFIC)
+        : std::to_chars(buf, buf + sizeof(buf), value, std::chars_format::fixed, format);
+    out.append(buf, r.ptr - buf);
+}
+
+// -?[0-9]+(.[0-9]+)? como (mantisa, decimales); false si no encaja o no reproduce el texto
+bool parseDecimal(std::string_view text, int64_t& mantissa, int& scale, std::string& scratch) {
+    if (text.size() > 20) return false;
+    size_t dot = text.find('.');
+    scale = dot == std::string_view::npos ? 0 : int(text.size() - dot - 1);
+    uint64_t mag = 0;
+    size_t digits = 0;
+    for (size_t i = (!text.empty() && text[0] == '-') ? 1 : 0; i < text.size(); ++i) {
+        if (i == dot) continue;
+        if (text[i] < '0' || text[i] > '9' || ++digits > 18) return false;
+        mag = mag * 10 + (text[i] - '0');
+    }
+    if (digits == 0) return false;
+    mantissa = text[0] == '-' ? -static_cast<int64_t>(mag) : static_cast<int64_t>(mag);
+    scratch.clear();
+    formatDecimal(mantissa, scale, scratch);
+    return scratch == text;
+}
+
+bool parseDouble(std::string_view text, double& value, uint8_t& format, std::string& scratch) {
+    auto r = std::from_chars(text.data(), text.data() + text.size(), value);
+    if (r.ec != std::errc() || r.ptr != text.data() + text.size()) return false;
+    size_t e = text.find_first_of("eE");
+    std::string_view mantissa = text.substr(0, e);
+    size_t dot = mantissa.find('.');
+    size_t precision = dot == std::string_view::npos ? 0 : mantissa.size() - dot - 1;
+    if (precision >= SCIENTIFIC) return false;
+    format = static_cast<uint8_t>(e == std::string_view::npos ? precision : SCIENTIFIC + precision);
+    scratch.clear();
+    formatDouble(value, format, scratch);
+    return scratch == text;
+}
+
+// Diferencias de orden `order` (1 = delta, 2 = delta-of-delta) en zigzag + varint.
+// Aritmética sin signo: los desbordes dan la vuelta y se deshacen igual al decodificar.
+std::string deltaStream(const std::vector<int64_t>& values, int order) {
+    Writer w;
+    uint64_t prev = 0, prevDelta = 0;
+    for (int64_t v : values) {
+        uint64_t delta = static_cast<uint64_t>(v) - prev;
+        w.varint(zigzag(static_cast<int64_t>(order == 2 ? delta - prevDelta : delta)));
+        prev = static_cast<uint64_t>(v);
+        prevDelta = delta;
+    }
+    return w.out;
+}
+
+// Todos los valores se llevan a la escala común (máximo de decimales de la columna);
+// los decimales de cada valor van aparte para reproducir el texto exacto.
+bool encodeDecimal(const std::vector<std::string_view>& values, Writer& w) {
+    std::vector<int64_t> mantissas(values.size());
+    std::string scales(values.size(), '\0'), scratch;
+    int common = 0;
+    for (size_t i = 0; i < values.size(); ++i) {
+        int scale;
+        if (!parseDecimal(values[i], mantissas[i], scale, scratch)) return false;
+        scales[i] = static_cast<char>(scale);
+        common = std::max(common, scale);
+    }
+    std::vector<int64_t> scaled(values.size());
+    for (size_t i = 0; i < values.size(); ++i) {
+        int64_t v = mantissas[i];
+        for (int s = scales[i]; s < common; ++s) {
+            if (v > INT64_MAX / 10 || v < INT64_MIN / 10) return false;
+            v *= 10;
+        }
+        scaled[i] = v;
+    }
+
+    // Delta para series ruidosas, delta-of-delta para series de pendiente casi constante
+    std::string first = deltaStream(scaled, 1), second = deltaStream(scaled, 2);
+    bool useSecond = second.size() < first.size();
+    w.byte(DECIMAL);
+    w.byte(static_cast<uint8_t>(common));
+    w.byte(useSecond ? 2 : 1);
+    w.bytes(scales);
+    w.bytes(useSecond ? second : first);
+    return true;
+}
+
+bool encodeGorilla(const std::vector<std::string_view>& values, Writer& w) {
+    std::string formats, scratch;
+    formats.reserve(values.size());
+    BitWriter bits;
+    uint64_t prev = 0;
+    int prevLead = -1, prevTrail = 0;
+    for (size_t i = 0; i < values.size(); ++i) {
+        double d;
+        uint8_t format;
+        if (!parseDouble(values[i], d, format, scratch)) return false;
+        formats.push_back(static_cast<char>(format));
+        uint64_t cur;
+        std::memcpy(&cur, &d, 8);
+        uint64_t x = cur ^ prev;
+        prev = cur;
+        if (i == 0) {
+            bits.bits(cur, 64);
+            continue;
+        }
+        if (x == 0) {
+            bits.bits(0, 1);
+            continue;
+        }
+        int lead = std::min(__builtin_clzll(x), 31);
+        int trail = __builtin_ctzll(x);
+        if (prevLead >= 0 && lead >= prevLead && trail >= prevTrail) {
+            // Cabe en la ventana significativa anterior
+            bits.bits(0b10, 2);
+            bits.bits(x >> prevTrail, 64 - prevLead - prevTrail);
+        } else {
+            int len = 64 - lead - trail;
+            bits.bits(0b11, 2);
+            bits.bits(lead, 5);
+            bits.bits(len & 63, 6);     // 64 se guarda como 0
+            bits.bits(x >> trail, len);
+            prevLead = lead;
+            prevTrail = trail;
+        }
+    }
+    w.byte(GORILLA);
+    w.bytes(formats);
+    w.bytes(bits.out);
+    return true;
+}
+
+void encodeRaw(const std::vector<std::string_view>& values, Writer& w) {
+    std::string text;
+    for (auto v : values) {
+        text += v;
+        text.push_back('\n');
+    }
+    w.byte(RAW);
+    w.bytes(text);
+}
+
+// Texto de cada valor de una columna, concatenado; ends[i] marca el final del valor i
+struct ColumnText {
+    std::string text;
+    std::vector<size_t> ends;
+};
+
+void decodeDecimal(Reader& r, size_t rows, ColumnText& col) {
+    int common = r.byte();
+    int order = r.byte();
+    std::string_view scales = r.bytes();
+    std::string_view stream = r.bytes();
+    if (scales.size() != rows || common > 18 || (order != 1 && order != 2)) {
+        throw std::runtime_error("columna decimal inconsistente");
+    }
+    Reader body{stream.data(), stream.data() + stream.size()};
+    uint64_t prev = 0, prevDelta = 0;
+    for (size_t i = 0; i < rows; ++i) {
+        uint64_t d = static_cast<uint64_t>(unzigzag(body.varint()));
+        uint64_t delta = order == 2 ? prevDelta + d : d;
+        prev += delta;
+        prevDelta = delta;
+        int scale = static_cast<uint8_t>(scales[i]);
+        if (scale > common) throw std::runtime_error("columna decimal inconsistente");
+        formatDecimal(static_cast<int64_t>(prev) / POW10[common - scale], scale, col.text);
+        col.ends.push_back(col.text.size());
+    }
+}
+
+void decodeGorilla(Reader& r, size_t rows, ColumnText& col) {
+    std::string_view formats = r.bytes();
+    BitReader bits{r.bytes()};
+    if (formats.size() != rows) throw std::runtime_error("formatos de columna inconsistentes");
+    uint64_t prev = 0;
+    int lead = 0, len = 0;
+    for (size_t i = 0; i < rows; ++i) {
+        if (i == 0) {
+            prev = bits.bits(64);
+        } else if (bits.bits(1)) {
+            if (bits.bits(1)) {
+                lead = static_cast<int>(bits.bits(5));
+                len = static_cast<int>(bits.bits(6));
+                if (len == 0) len = 64;
+                if (lead + len > 64) throw std::runtime_error("flujo Gorilla invalido");
+            } else if (len == 0) {
+                throw std::runtime_error("flujo Gorilla invalido");
+            }
+            prev ^= bits.bits(len) << (64 - lead - len);
+        }
+        double d;
+        std::memcpy(&d, &prev, 8);
+        formatDouble(d, static_cast<uint8_t>(formats[i]), col.text);
+        col.ends.push_back(col.text.size());
+    }
+}
+
+void decodeRaw(Reader& r, size_t rows, ColumnText& col) {
+    std::string_view text = r.bytes();
+    size_t start = 0;
+    for (size_t i = 0; i < rows; ++i) {
+        size_t nl = text.find('\n', start);
+        if (nl == std::string_view::npos) throw std::runtime_error("columna de texto truncada");
+        col.text += text.substr(start, nl - start);
+        col.ends.push_back(col.text.size());
+        start = nl + 1;
+    }
+}
+
+}
+
+std::vector<char> compressTelemetry(const char* csv, size_t size) {
+    std::string_view text(csv, size);
+    size_t headerEnd = text.find('\n');
+    if (headerEnd == std::string_view::npos) throw std::invalid_argument("CSV sin cabecera");
+    std::string_view header = text.substr(0, headerEnd);
+    size_t cols = 1;
+    for (char c : header) cols += c == ',';
+
+    std::vector<std::vector<std::string_view>> columns(cols);
+    bool trailingNewline = text.back() == '\n';
+    size_t rows = 0;
+    size_t pos = headerEnd + 1;
+    while (pos < size) {
+        size_t nl = text.find('\n', pos);
+        std::string_view line = text.substr(pos, nl == std::string_view::npos ? size - pos : nl - pos);
+        size_t start = 0;
+        for (size_t c = 0; c < cols; ++c) {
+            size_t comma = c + 1 < cols ? line.find(',', start) : line.size();
+            if (comma == std::string_view::npos || (c + 1 == cols && line.find(',', start) != std::string_view::npos)) {
+                throw std::invalid_argument("fila " + std::to_string(rows + 1) + " con numero de columnas distinto");
+            }
+            columns[c].push_back(line.substr(start, comma - start));
+            start = comma + 1;
+        }
+        ++rows;
+        pos = nl == std::string_view::npos ? size : nl + 1;
+    }
+
+    Writer w;
+    w.bytes(std::string(header));
+    w.varint(rows);
+    w.varint(cols);
+    w.byte(trailingNewline);
+    size_t numeric = 0;
+    for (auto& values : columns) {
+        size_t mark = w.out.size();
+        if (encodeDecimal(values, w)) { ++numeric; continue; }
+        w.out.resize(mark);
+        if (encodeGorilla(values, w)) { ++numeric; continue; }
+        w.out.resize(mark);
+        encodeRaw(values, w);
+    }
+    if (rows > 0 && numeric == 0) throw std::invalid_argument("el CSV no tiene columnas numericas");
+
+    const std::string& body = w.out;
+    if (body.size() > size_t(std::numeric_limits<int>::max() / 2)) {
+        throw std::invalid_argument("CSV demasiado grande para un solo bloque");
+    }
+    int bound = compressBound(static_cast<int>(body.size()));
+    std::vector<char> out(TELEMETRY_HEADER_SIZE + bound);
+    int written = compressRaw(body.data(), static_cast<int>(body.size()), out.data() + TELEMETRY_HEADER_SIZE, bound);
+    if (written <= 0) throw std::runtime_error("fallo al comprimir el cuerpo de telemetria");
+
+    std::memcpy(out.data(), MAGIC, 4);
+    put<uint64_t>(out.data() + 4, size);
+    put<uint32_t>(out.data() + 12, static_cast<uint32_t>(body.size()));
+    put<uint32_t>(out.data() + 16, static_cast<uint32_t>(written));
+    out.resize(TELEMETRY_HEADER_SIZE + written);
+    return out;
+}
+
+uint64_t telemetryOriginalSize(const char* compressed, size_t size) {
+    if (size < TELEMETRY_HEADER_SIZE || std::memcmp(compressed, MAGIC, 4) != 0) {
+        throw std::invalid_argument("no es un buffer de telemetria STS1");
+    }
+    return get<uint64_t>(compressed + 4);
+}
+
+void decompressTelemetry(const char* compressed, size_t size, char* output) {
+    uint64_t originalSize = telemetryOriginalSize(compressed, size);
+    uint32_t bodySize = get<uint32_t>(compressed + 12);
+    uint32_t packedSize = get<uint32_t>(compressed + 16);
+    if (packedSize != size - TELEMETRY_HEADER_SIZE || bodySize > uint32_t(std::numeric_limits<int>::max())) {
+        throw std::runtime_error("cabecera de telemetria inconsistente");
+    }
+
+    std::string body(bodySize, '\0');
+    int got = decompressRaw(compressed + TELEMETRY_HEADER_SIZE, static_cast<int>(packedSize), body.data(), static_cast<int>(bodySize));
+    if (got != static_cast<int>(bodySize)) throw std::runtime_error("cuerpo de telemetria corrupto");
+
+    Reader r{body.data(), body.data() + body.size()};
+    std::string_view header = r.bytes();
+    uint64_t rows = r.varint();
+    uint64_t cols = r.varint();
+    bool trailingNewline = r.byte() != 0;
+    if (cols == 0 || rows > originalSize || cols > originalSize + 1) throw std::runtime_error("dimensiones de telemetria invalidas");
+
+    std::vector<ColumnText> columns(cols);
+    for (auto& col : columns) {
+        col.ends.reserve(rows);
+        switch (r.byte()) {
+            case DECIMAL: decodeDecimal(r, rows, col); break;
+            case GORILLA: decodeGorilla(r, rows, col); break;
+            case RAW: decodeRaw(r, rows, col); break;
+            default: throw std::runtime_error("tipo de columna desconocido");
+        }
+    }
+
+    // Intercalar columnas fila a fila directamente en el buffer de salida
+    char* dst = output;
+    char* end = output + originalSize;
+    auto emit = [&](const char* src, size_t n) {
+        if (n > size_t(end - dst)) throw std::runtime_error("el CSV reconstruido excede el tamano original");
+        std::memcpy(dst, src, n);
+        dst += n;
+    };
+    emit(header.data(), header.size());
+    emit("\n", 1);
+    for (size_t i = 0; i < rows; ++i) {
+        for (size_t c = 0; c < cols; ++c) {
+            const ColumnText& col = columns[c];
+            size_t start = i == 0 ? 0 : col.ends[i - 1];
+            emit(col.text.data() + start, col.ends[i] - start);
+            if (c + 1 < cols) emit(",", 1);
+        }
+        if (i + 1 < rows || trailingNewline) emit("\n", 1);
+    }
+    if (dst != end) throw std::runtime_error("el CSV reconstruido no coincide con el tamano original");
+}
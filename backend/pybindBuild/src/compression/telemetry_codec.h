@@ -0,0 +1,23 @@
+#pragma once
+#include <cstddef>
+#include <cstdint>
+#include <vector>
+
+// Códec columnar para CSV numérico de telemetría (cabecera + filas de números separados por comas).
+//   "STS1" | uint64 originalSize | uint32 bodySize | uint32 compressedSize | LZ4(body)
+// El cuerpo guarda cada columna por separado:
+//   - decimales (enteros incluidos): enteros a escala común con delta o delta-of-delta + zigzag + varint,
+//     más los decimales de cada valor
+//   - resto de números: XOR de doubles al estilo Gorilla + un byte de formato por valor
+//   - columnas que no reproducen el texto exacto: texto crudo
+// La decodificación reproduce el CSV original byte a byte.
+constexpr size_t TELEMETRY_HEADER_SIZE = 4 + 8 + 4 + 4;
+
+// Lanza std::invalid_argument si la entrada no es un CSV numérico rectangular
+std::vector<char> compressTelemetry(const char* csv, size_t size);
+
+// Tamaño del CSV original guardado en la cabecera (lanza std::invalid_argument si no es formato STS1)
+uint64_t telemetryOriginalSize(const char* compressed, size_t size);
+
+// Reconstruye el CSV en `output` (de telemetryOriginalSize bytes); lanza std::runtime_error si está corrupto
+void decompressTelemetry(const char* compressed, size_t size, char* output);
@@ -0,0 +1,87 @@
+#include "erasure.h"
+#include "gf256.h"
+#include <cstring>
+#include <stdexcept>
+
+ErasureCoder::ErasureCoder(int k, int m, const std::string& code) : k_(k), m_(m) {
+    if (k <= 0 || m <= 0) throw std::invalid_argument("k y m deben ser > 0");
+    parity_.assign(size_t(k) * m, 0);  // tras validar: con m < 0 el tamaño desbordaría
+    if (code == "xor") {
+        if (m != 1) throw std::invalid_argument("el codigo xor solo admite m = 1");
+        std::fill(parity_.begin(), parity_.end(), 1);
+    } else if (code == "cauchy") {
+        if (k + m > 256) throw std::invalid_argument("cauchy requiere k + m <= 256");
+        // P[i][j] = 1 / (x_i + y_j) con x_i = i, y_j = m + j (todos distintos): [I; P] es MDS
+        for (int i = 0; i < m; ++i)
+            for (int j = 0; j < k; ++j)
+                parity_[size_t(i) * k + j] = gfInv(static_cast<uint8_t>(i ^ (m + j)));
+    } else {
+        throw std::invalid_argument("codigo desconocido: " + code);
+    }
+}
+
+uint8_t ErasureCoder::coefficient(int row, int col) const {
+    if (row < k_) return row == col ? 1 : 0;
+    return parity_[size_t(row - k_) * k_ + col];
+}
+
+void ErasureCoder::encode(const uint8_t* const* data, uint8_t* const* parity, size_t shardSize) const {
+    for (int i = 0; i < m_; ++i) {
+        std::memset(parity[i], 0, shardSize);
+        for (int j = 0; j < k_; ++j) {
+            gfMulAdd(parity[i], data[j], parity_[size_t(i) * k_ + j], shardSize);
+        }
+    }
+}
+
+void ErasureCoder::decode(const uint8_t* const* shards, uint8_t* const* out, size_t shardSize) const {
+    std::vector<int> missing;
+    for (int j = 0; j < k_; ++j)
+        if (!shards[j]) missing.push_back(j);
+    if (missing.empty()) return;
+
+    // Primeras k filas disponibles de la matriz generadora
+    std::vector<int> rows;
+    for (int r = 0; r < k_ + m_ && int(rows.size()) < k_; ++r)
+        if (shards[r]) rows.push_back(r);
+    if (int(rows.size()) < k_) throw std::runtime_error("demasiados borrados para recuperar");
+
+    // Invertir la submatriz k x k por Gauss-Jordan en GF(256)
+    std::vector<uint8_t> a(size_t(k_) * k_), inv(size_t(k_) * k_, 0);
+    for (int r = 0; r < k_; ++r) {
+        for (int c = 0; c < k_; ++c) a[size_t(r) * k_ + c] = coefficient(rows[r], c);
+        inv[size_t(r) * k_ + r] = 1;
+    }
+    for (int col = 0; col < k_; ++col) {
+        int pivot = col;
+        while (pivot < k_ && a[size_t(pivot) * k_ + col] == 0) ++pivot;
+        if (pivot == k_) throw std::runtime_error("matriz singular");
+        if (pivot != col) {
+            for (int c = 0; c < k_; ++c) {
+                std::swap(a[size_t(pivot) * k_ + c], a[size_t(col) * k_ + c]);
+                std::swap(inv[size_t(pivot) * k_ + c], inv[size_t(col) * k_ + c]);
+            }
+        }
+        uint8_t scale = gfInv(a[size_t(col) * k_ + col]);
+        for (int c = 0; c < k_; ++c) {
+            a[size_t(col) * k_ + c] = gfMul(a[size_t(col) * k_ + c], scale);
+            inv[size_t(col) * k_ + c] = gfMul(inv[size_t(col) * k_ + c], scale);
+        }
+        for (int r = 0; r < k_; ++r) {
+            uint8_t factor = a[size_t(r) * k_ + col];
+            if (r == col || factor == 0) continue;
+            for (int c = 0; c < k_; ++c) {
+                a[size_t(r) * k_ + c] ^= gfMul(factor, a[size_t(col) * k_ + c]);
+                inv[size_t(r) * k_ + c] ^= gfMul(factor, inv[size_t(col) * k_ + c]);
+            }
+        }
+    }
+
+    // dato_j = sum_r inv[j][r] * shard(rows[r]); solo para los que faltan
+    for (int j : missing) {
+        std::memset(out[j], 0, shardSize);
+        for (int r = 0; r < k_; ++r) {
+            gfMulAdd(out[j], shards[rows[r]], inv[size_t(j) * k_ + r], shardSize);
+        }
+    }
+}
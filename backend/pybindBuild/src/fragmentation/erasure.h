@@ -0,0 +1,29 @@
+#pragma once
+#include <cstddef>
+#include <cstdint>
+#include <string>
+#include <vector>
+
+// Código de borrado sistemático (k datos + m paridad) sobre GF(256):
+//   "xor"    -> m = 1, paridad = XOR de los k shards (recupera 1 borrado)
+//   "cauchy" -> Reed-Solomon con matriz de Cauchy (recupera hasta m borrados, k + m <= 256)
+class ErasureCoder {
+public:
+    ErasureCoder(int k, int m, const std::string& code);
+
+    // data: k shards de shardSize bytes; parity: m buffers de salida de shardSize bytes
+    void encode(const uint8_t* const* data, uint8_t* const* parity, size_t shardSize) const;
+
+    // shards: k + m punteros, nullptr = borrado. Reconstruye en out[j] cada dato j perdido
+    // (out tiene k punteros; solo se escriben los que faltan). Lanza si hay más de m borrados.
+    void decode(const uint8_t* const* shards, uint8_t* const* out, size_t shardSize) const;
+
+    int k() const { return k_; }
+    int m() const { return m_; }
+
+private:
+    uint8_t coefficient(int row, int col) const;  // fila de la matriz generadora [I; P]
+
+    int k_, m_;
+    std::vector<uint8_t> parity_;  // m x k
+};
@@ -0,0 +1,121 @@
+#include "gf256.h"
+#include "xor_coder.h"
+#include <array>
+
+#if defined(__x86_64__) && (defined(__GNUC__) || defined(__clang__))
+#include <immintrin.h>
+#define GF_X86_SIMD 1
+#endif
+
+namespace {
+
+struct Tables {
+    std::array<uint8_t, 512> exp{};
+    std::array<uint8_t, 256> log{};
+    // Tablas de nibbles por coeficiente: c*n y c*(n<<4) para n en [0, 16), base del PSHUFB
+    std::array<std::array<uint8_t, 16>, 256> low{};
+    std::array<std::array<uint8_t, 16>, 256> high{};
+
+    Tables() {
+        unsigned x = 1;
+        for (int i = 0; i < 255; ++i) {
+            exp[i] = static_cast<uint8_t>(x);
+            log[x] = static_cast<uint8_t>(i);
+            x <<= 1;
+            if (x & 0x100) x ^= 0x11d;
+        }
+        for (int i = 255; i < 512; ++i) exp[i] = exp[i - 255];
+        for (int c = 0; c < 256; ++c) {
+            for (int n = 0; n < 16; ++n) {
+                low[c][n] = mul(static_cast<uint8_t>(c), static_cast<uint8_t>(n));
+                high[c][n] = mul(static_cast<uint8_t>(c), static_cast<uint8_t>(n << 4));
+            }
+        }
+    }
+
+    uint8_t mul(uint8_t a, uint8_t b) const {
+        if (a == 0 || b == 0) return 0;
+        return exp[log[a] + log[b]];
+    }
+};
+
+const Tables& tables() {
+    static const Tables t;
+    return t;
+}
+
+void mulAddScalar(uint8_t* dst, const uint8_t* src, uint8_t coef, size_t len) {
+    const auto& lo = tables().low[coef];
+    const auto& hi = tables().high[coef];
+    for (size_t i = 0; i < len; ++i) {
+        dst[i] ^= lo[src[i] & 0x0f] ^ hi[src[i] >> 4];
+    }
+}
+
+#ifdef GF_X86_SIMD
+__attribute__((target("ssse3")))
+void mulAddSsse3(uint8_t* dst, const uint8_t* src, uint8_t coef, size_t len) {
+    const __m128i tlo = _mm_loadu_si128(reinterpret_cast<const __m128i*>(tables().low[coef].data()));
+    const __m128i thi = _mm_loadu_si128(reinterpret_cast<const __m128i*>(tables().high[coef].data()));
+    const __m128i mask = _mm_set1_epi8(0x0f);
+    size_t i = 0;
+    for (; i + 16 <= len; i += 16) {
+        __m128i x = _mm_loadu_si128(reinterpret_cast<const __m128i*>(src + i));
+        __m128i l = _mm_and_si128(x, mask);
+        __m128i h = _mm_and_si128(_mm_srli_epi64(x, 4), mask);
+        __m128i p = _mm_xor_si128(_mm_shuffle_epi8(tlo, l), _mm_shuffle_epi8(thi, h));
+        __m128i d = _mm_loadu_si128(reinterpret_cast<const __m128i*>(dst + i));
+        _mm_storeu_si128(reinterpret_cast<__m128i*>(dst + i), _mm_xor_si128(d, p));
+    }
+    mulAddScalar(dst + i, src + i, coef, len - i);
+}
+
+__attribute__((target("avx2")))
+void mulAddAvx2(uint8_t* dst, const uint8_t* src, uint8_t coef, size_t len) {
+    const __m256i tlo = _mm256_broadcastsi128_si256(
+        _mm_loadu_si128(reinterpret_cast<const __m128i*>(tables().low[coef].data())));
+    const __m256i thi = _mm256_broadcastsi128_si256(
+        _mm_loadu_si128(reinterpret_cast<const __m128i*>(tables().high[coef].data())));
+    const __m256i mask = _mm256_set1_epi8(0x0f);
+    size_t i = 0;
+    for (; i + 32 <= len; i += 32) {
+        __m256i x = _mm256_loadu_si256(reinterpret_cast<const __m256i*>(src + i));
+        __m256i l = _mm256_and_si256(x, mask);
+        __m256i h = _mm256_and_si256(_mm256_srli_epi64(x, 4), mask);
+        __m256i p = _mm256_xor_si256(_mm256_shuffle_epi8(tlo, l), _mm256_shuffle_epi8(thi, h));
+        __m256i d = _mm256_loadu_si256(reinterpret_cast<const __m256i*>(dst + i));
+        _mm256_storeu_si256(reinterpret_cast<__m256i*>(dst + i), _mm256_xor_si256(d, p));
+    }
+    mulAddScalar(dst + i, src + i, coef, len - i);
+}
+#endif
+
+using MulAddFn = void (*)(uint8_t*, const uint8_t*, uint8_t, size_t);
+
+MulAddFn selectMulAdd() {       //se elige una vez según la CPU en tiempo de ejecución
+#ifdef GF_X86_SIMD
+    if (__builtin_cpu_supports("avx2")) return mulAddAvx2;
+    if (__builtin_cpu_supports("ssse3")) return mulAddSsse3;
+#endif
+    return mulAddScalar;
+}
+
+}
+
+uint8_t gfMul(uint8_t a, uint8_t b) {
+    return tables().mul(a, b);
+}
+
+uint8_t gfInv(uint8_t a) {
+    return a == 0 ? 0 : tables().exp[255 - tables().log[a]];
+}
+
+void gfMulAdd(uint8_t* dst, const uint8_t* src, uint8_t coef, size_t len) {
+    if (coef == 0) return;
+    if (coef == 1) {
+        xorInto(dst, src, dst, len);
+        return;
+    }
+    static const MulAddFn impl = selectMulAdd();
+    impl(dst, src, coef, len);
+}
@@ -0,0 +1,10 @@
+#pragma once
+#include <cstddef>
+#include <cstdint>
+
+// Aritmética en GF(2^8) con polinomio 0x11d (el habitual en Reed-Solomon)
+uint8_t gfMul(uint8_t a, uint8_t b);
+uint8_t gfInv(uint8_t a);
+
+// dst ^= coef * src (byte a byte en GF(256)). Usa AVX2/SSSE3 si la CPU lo soporta.
+void gfMulAdd(uint8_t* dst, const uint8_t* src, uint8_t coef, size_t len);
@@ -2,12 +2,48 @@
 #include "xor_coder.h"
 #include <algorithm> 
 
+#if defined(__x86_64__) && (defined(__GNUC__) || defined(__clang__))
+#include <immintrin.h>
+#define XOR_X86_SIMD 1
+#endif
+
 std::vector<uint8_t>xorBlocks(const std::vector<uint8_t>& a, const std::vector<uint8_t>& b) {      //used to recover corrupted or lost fragments using xor as a "key"
     size_t size = std::min(a.size(), b.size());     //both fragments have to be the same size, size_t used as standard
     std::vector<uint8_t> result(size);      //stores xor blocks
+    xorInto(a.data(), b.data(), result.data(), size);
+    return result;
+}
+
+namespace {
+
+void xorScalar(const uint8_t* a, const uint8_t* b, uint8_t* out, size_t size) {
     for (size_t i = 0; i < size; ++i) {     //xor
-        result[i] = a[i] ^ b[i];
+        out[i] = a[i] ^ b[i];
     }
-    return result;
 }
 
+#ifdef XOR_X86_SIMD
+__attribute__((target("avx2")))
+void xorAvx2(const uint8_t* a, const uint8_t* b, uint8_t* out, size_t size) {       //32 bytes per instruction
+    size_t i = 0;
+    for (; i + 32 <= size; i += 32) {
+        __m256i va = _mm256_loadu_si256(reinterpret_cast<const __m256i*>(a + i));
+        __m256i vb = _mm256_loadu_si256(reinterpret_cast<const __m256i*>(b + i));
+        _mm256_storeu_si256(reinterpret_cast<__m256i*>(out + i), _mm256_xor_si256(va, vb));
+    }
+    xorScalar(a + i, b + i, out + i, size - i);
+}
+#endif
+
+}
+
+void xorInto(const uint8_t* a, const uint8_t* b, uint8_t* out, size_t size) {
+#ifdef XOR_X86_SIMD
+    static const bool avx2 = __builtin_cpu_supports("avx2");       //checked once at runtime
+    if (avx2) {
+        xorAvx2(a, b, out, size);
+        return;
+    }
+#endif
+    xorScalar(a, b, out, size);
+}
@@ -1,5 +1,9 @@
 #pragma once
 #include <vector>
 #include <cstdint>
+#include <cstddef>
 
 std::vector<uint8_t> xorBlocks(const std::vector<uint8_t>& a, const std::vector<uint8_t>& b);
+
+// XOR sobre punteros crudos (out puede coincidir con a o b)
+void xorInto(const uint8_t* a, const uint8_t* b, uint8_t* out, size_t size);
@@ -8,8 +8,15 @@ MODULE_NAME = "cpp_core"
 sources = [
     "bindings.cpp",
     "compression/lz4_wrapper.cpp",
+    "compression/chunked.cpp",
+    "compression/lz4_stream.cpp",
+    "compression/telemetry_codec.cpp",
+    "compression/lz4_dict.cpp",
     "fragmentation/fragmenter.cpp",
     "fragmentation/xor_coder.cpp",
+    "fragmentation/gf256.cpp",
+    "fragmentation/erasure.cpp",
+    "utils/crc32c.cpp",
 ]
 
 # Configuración de la extensión (usa Pybind11Extension para añadir los includes automáticamente)
@@ -17,10 +24,11 @@ ext_modules = [
     Pybind11Extension(
         MODULE_NAME,
         sources,
-        include_dirs=["compression", "fragmentation"],
+        include_dirs=["compression", "fragmentation", "utils"],
         libraries=["lz4"],  # Requiere liblz4 en el sistema (liblz4-dev)
         language="c++",
-        extra_compile_args=["-std=c++17", "-O3"],
+        extra_compile_args=["-std=c++17", "-O3", "-pthread"],
+        extra_link_args=["-pthread"],
     ),
 ]
 
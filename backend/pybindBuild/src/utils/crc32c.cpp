@@ -0,0 +1,93 @@
+#include "crc32c.h"
+#include "parallel.h"
+#include <array>
+#include <cstring>
+
+#if defined(__x86_64__) && (defined(__GNUC__) || defined(__clang__))
+#include <immintrin.h>
+#define CRC_X86_SIMD 1
+#endif
+
+namespace {
+
+// A partir de estos bytes totales compensa lanzar hilos
+constexpr size_t PARALLEL_THRESHOLD = 4 * 1024 * 1024;
+
+struct Tables {
+    std::array<std::array<uint32_t, 256>, 8> t{};
+
+    Tables() {
+        for (uint32_t i = 0; i < 256; ++i) {
+            uint32_t c = i;
+            for (int k = 0; k < 8; ++k) c = (c >> 1) ^ (0x82F63B78u & (0u - (c & 1u)));     // polinomio reflejado
+            t[0][i] = c;
+        }
+        for (uint32_t i = 0; i < 256; ++i) {
+            for (int s = 1; s < 8; ++s) t[s][i] = (t[s - 1][i] >> 8) ^ t[0][t[s - 1][i] & 0xff];
+        }
+    }
+};
+
+const Tables& tables() {
+    static const Tables t;
+    return t;
+}
+
+uint32_t crcSoftware(const uint8_t* p, size_t len, uint32_t crc) {
+    const auto& t = tables().t;
+    while (len >= 8) {
+        uint64_t v;
+        std::memcpy(&v, p, 8);
+        v ^= crc;       // little-endian: los 4 bytes bajos se mezclan con el crc actual
+        crc = t[7][v & 0xff] ^ t[6][(v >> 8) & 0xff] ^ t[5][(v >> 16) & 0xff] ^ t[4][(v >> 24) & 0xff]
+            ^ t[3][(v >> 32) & 0xff] ^ t[2][(v >> 40) & 0xff] ^ t[1][(v >> 48) & 0xff] ^ t[0][v >> 56];
+        p += 8;
+        len -= 8;
+    }
+    while (len--) crc = (crc >> 8) ^ t[0][(crc ^ *p++) & 0xff];
+    return crc;
+}
+
+#ifdef CRC_X86_SIMD
+__attribute__((target("sse4.2")))
+uint32_t crcSse42(const uint8_t* p, size_t len, uint32_t crc) {
+    uint64_t c = crc;
+    while (len >= 8) {
+        uint64_t v;
+        std::memcpy(&v, p, 8);
+        c = _mm_crc32_u64(c, v);
+        p += 8;
+        len -= 8;
+    }
+    uint32_t c32 = static_cast<uint32_t>(c);
+    while (len--) c32 = _mm_crc32_u8(c32, *p++);
+    return c32;
+}
+#endif
+
+using CrcFn = uint32_t (*)(const uint8_t*, size_t, uint32_t);
+
+CrcFn pickImpl() {
+#ifdef CRC_X86_SIMD
+    if (__builtin_cpu_supports("sse4.2")) return crcSse42;
+#endif
+    return crcSoftware;
+}
+
+const CrcFn impl = pickImpl();
+
+} // namespace
+
+uint32_t crc32c(const uint8_t* data, size_t len, uint32_t crc) {
+    return ~impl(data, len, ~crc);
+}
+
+void crc32cFragments(const uint8_t* data, const uint64_t* offsets, const uint64_t* lengths,
+                     size_t count, uint32_t* out) {
+    size_t total = 0;
+    for (size_t i = 0; i < count; ++i) total += lengths[i];
+    unsigned threads = total >= PARALLEL_THRESHOLD ? 0 : 1;
+    parallelFor(count, threads, [&](size_t i) {
+        out[i] = crc32c(data + offsets[i], lengths[i]);
+    });
+}
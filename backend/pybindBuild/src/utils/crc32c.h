@@ -0,0 +1,12 @@
+#pragma once
+#include <cstddef>
+#include <cstdint>
+
+// CRC32C (Castagnoli, polinomio 0x1EDC6F41), el mismo que usan iSCSI, ext4 y SCTP.
+// Usa la instrucción crc32 de SSE4.2 si la CPU la soporta; si no, slicing-by-8 en software.
+uint32_t crc32c(const uint8_t* data, size_t len, uint32_t crc = 0);
+
+// Checksum de cada fragmento [offsets[i], offsets[i] + lengths[i]) de data en out[i].
+// Los fragmentos son independientes: con muchos bytes se reparten entre hilos.
+void crc32cFragments(const uint8_t* data, const uint64_t* offsets, const uint64_t* lengths,
+                     size_t count, uint32_t* out);
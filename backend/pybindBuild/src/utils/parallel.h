@@ -0,0 +1,36 @@
+#pragma once
+#include <algorithm>
+#include <atomic>
+#include <cstddef>
+#include <thread>
+#include <vector>
+
+// Hilos que usa parallelFor cuando se pide threads = 0 (0 = todos los núcleos). Los workers del
+// pool de simulación lo fijan a 1: la concurrencia ya la dan los procesos (uno por núcleo).
+inline std::atomic<unsigned> &defaultThreads() {
+    static std::atomic<unsigned> value{0};
+    return value;
+}
+
+// Ejecuta fn(i) para i en [0, n) repartido entre hasta `threads` hilos (0 = defaultThreads()).
+// Los índices se toman de un contador atómico para balancear bloques de coste desigual.
+template <typename Fn>
+void parallelFor(size_t n, unsigned threads, Fn fn) {
+    if (threads == 0) threads = defaultThreads().load();
+    if (threads == 0) threads = std::max(1u, std::thread::hardware_concurrency());
+    threads = static_cast<unsigned>(std::min<size_t>(threads, n));
+    if (threads <= 1) {
+        for (size_t i = 0; i < n; ++i) fn(i);
+        return;
+    }
+
+    std::atomic<size_t> next{0};
+    auto worker = [&]() {
+        for (size_t i = next++; i < n; i = next++) fn(i);
+    };
+    std::vector<std::thread> pool;
+    pool.reserve(threads - 1);
+    for (unsigned t = 1; t < threads; ++t) pool.emplace_back(worker);
+    worker();       // el hilo llamante también trabaja
+    for (auto &th : pool) th.join();
+}
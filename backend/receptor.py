@@ -0,0 +1,251 @@
+"""
+Reensamblado en el satélite destino: recibe los fragmentos en cualquier orden (llegan por
+varias rutas), los copia en un buffer preasignado, verifica sus checksums por lotes (una
+llamada a crc32c_fragments por lote), recupera los perdidos con la paridad FEC cuando se
+puede y, al final, descomprime por bloques y compara cada uno con el original.
+"""
+import time
+from array import array
+
+from compresion import cpp_core, iter_decompress
+
+# Fragmentos de datos recibidos que se acumulan antes de verificar sus checksums de una vez
+VERIFY_BATCH = 64
+
+
+class Reassembler:
+    """
+    offsets, lengths: arreglos indexados por id (datos y luego paridad); los offsets de datos
+    son del buffer comprimido y los de paridad, del buffer de paridad.
+    n_data: número de fragmentos de datos (los ids >= n_data son paridad).
+    checksums: arreglo con el checksum esperado por id (None = no se verifica).
+    fec_info: info de _add_parity (grupos de ids de datos y de paridad) o None.
+    """
+
+    def __init__(self, total_size, offsets, lengths, n_data, checksums=None, fec_info=None):
+        self.buffer = bytearray(total_size)  # preasignado: cada fragmento se copia a su offset
+        self.offsets = offsets
+        self.lengths = lengths
+        self.n_data = n_data
+        self.checksums = checksums
+        self.received = bytearray((n_data + 7) // 8)  # bitmap de fragmentos de datos
+        self.received_count = 0
+
+        # Lote pendiente de verificar: ids de datos, sus offsets y longitudes en el buffer y
+        # los checksums esperados (arreglos contiguos, sin un objeto por fragmento)
+        self._unverified = array("Q")
+        self._unverified_offsets = array("Q")
+        self._unverified_lengths = array("Q")
+        self._unverified_checksums = array("I")
+
+        # FEC: paridades recibidas (en su propio buffer) y grupo de cada id
+        self.fec_info = fec_info
+        self.parity_buffer = bytearray(fec_info["parity_bytes"]) if fec_info else None
+        self.parity = set()
+        self.group_of = {}
+        if fec_info:
+            for g, (data_ids, parity_ids) in enumerate(fec_info["groups"]):
+                for pkt_id in data_ids + parity_ids:
+                    self.group_of[pkt_id] = g
+        self.done_groups = set()
+        self.recovered = {}  # id -> instante (relativo) en que se reconstruyó
+
+        # Orden de llegada y memoria retenida
+        self.next_expected = 0  # primer id de datos aún no recibido (prefijo contiguo)
+        self.out_of_order = 0
+        self.reorder_depth = 0
+        self.held_bytes = 0  # bytes recibidos más allá del prefijo contiguo (+ paridad pendiente)
+        self.high_water = 0
+        self.corrupt = 0
+        self.duplicates = 0
+        self.complete_at = None
+
+    def _has(self, pkt_id):
+        return self.received[pkt_id >> 3] & (1 << (pkt_id & 7))
+
+    def _mark(self, pkt_id):
+        self.received[pkt_id >> 3] |= 1 << (pkt_id & 7)
+        self.received_count += 1
+
+    def receive(self, pkt_id, data, now):
+        """Procesa la llegada de un fragmento (datos o paridad) en el instante `now`."""
+        if pkt_id >= self.n_data:
+            if self.group_of[pkt_id] in self.done_groups:
+                return  # el grupo ya no necesita paridad
+            if pkt_id in self.parity:
+                self.duplicates += 1
+                return
+            offset, length = self.offsets[pkt_id], self.lengths[pkt_id]
+            self.parity_buffer[offset : offset + length] = data
+            self.parity.add(pkt_id)
+            self.held_bytes += length
+        else:
+            if self._has(pkt_id):
+                self.duplicates += 1
+                return
+            self._store(pkt_id, data)
+            if len(self._unverified) >= VERIFY_BATCH:
+                self._verify()
+
+        self.high_water = max(self.high_water, self.held_bytes)
+        if self.fec_info:
+            self._try_recover(self.group_of[pkt_id], now)
+        if self.complete_at is None and self.received_count == self.n_data:
+            self._verify()  # completo solo si el último lote también es correcto
+            if self.received_count == self.n_data:
+                self.complete_at = now
+
+    def _store(self, pkt_id, data):
+        offset, length = self.offsets[pkt_id], self.lengths[pkt_id]
+        self.buffer[offset : offset + length] = data
+        self._mark(pkt_id)
+        if self.checksums is not None:
+            self._unverified.append(pkt_id)
+            self._unverified_offsets.append(offset)
+            self._unverified_lengths.append(length)
+            self._unverified_checksums.append(self.checksums[pkt_id])
+
+        if pkt_id > self.next_expected:
+            self.out_of_order += 1
+            self.reorder_depth = max(self.reorder_depth, pkt_id - self.next_expected)
+            self.held_bytes += length
+            return
+        # Avanza el prefijo contiguo y libera lo que estaba retenido detrás del hueco
+        self.next_expected += 1
+        while self.next_expected < self.n_data and self._has(self.next_expected):
+            self.held_bytes -= self.lengths[self.next_expected]
+            self.next_expected += 1
+
+    def _verify(self):
+        """Verifica el lote pendiente con una sola llamada; descarta los fragmentos corruptos."""
+        if not self._unverified:
+            return
+        actual = cpp_core.crc32c_fragments(self.buffer, self._unverified_offsets, self._unverified_lengths)
+        expected = self._unverified_checksums
+        if memoryview(actual) != memoryview(expected):
+            for pkt_id, got, want in zip(self._unverified, actual, expected):
+                if got != want:
+                    self._discard(pkt_id)
+        for pending in (self._unverified, self._unverified_offsets, self._unverified_lengths, expected):
+            del pending[:]
+
+    def _discard(self, pkt_id):
+        """Un fragmento de datos corrupto vuelve a contar como no recibido."""
+        self.corrupt += 1
+        self.received[pkt_id >> 3] &= ~(1 << (pkt_id & 7))
+        self.received_count -= 1
+        self.recovered.pop(pkt_id, None)
+        if pkt_id >= self.next_expected:
+            self.held_bytes -= self.lengths[pkt_id]
+            return
+        # El hueco vuelve a pkt_id: lo recibido detrás queda retenido otra vez
+        for i in range(pkt_id + 1, self.next_expected):
+            if self._has(i):
+                self.held_bytes += self.lengths[i]
+        self.next_expected = pkt_id
+
+    def _try_recover(self, group, now):
+        """Con al menos k fragmentos de un grupo se reconstruyen los datos que falten."""
+        if group in self.done_groups:
+            return
+        data_ids, parity_ids = self.fec_info["groups"][group]
+        missing = [i for i in data_ids if not self._has(i)]
+        if not missing:
+            self._release_group(group)
+            return
+        if len(data_ids) - len(missing) + sum(i in self.parity for i in parity_ids) < len(data_ids):
+            return
+
+        # Las entradas del decodificador deben estar verificadas: datos del lote pendiente y
+        # paridad del grupo (una llamada cada uno)
+        if self.checksums is not None:
+            self._verify()
+            self._verify_parity(parity_ids)
+            missing = [i for i in data_ids if not self._has(i)]
+            if len(data_ids) - len(missing) + sum(i in self.parity for i in parity_ids) < len(data_ids):
+                return
+
+        lost = set(missing)
+        shards = [None if i in lost else self._view(i) for i in data_ids]
+        shards += [self._parity_view(i) if i in self.parity else None for i in parity_ids]
+        restored = cpp_core.fec_decode(shards, len(data_ids), self.fec_info["m"], self.fec_info["code"])
+        for pkt_id, shard in zip(data_ids, restored):
+            if pkt_id in lost:
+                self._store(pkt_id, memoryview(shard)[: self.lengths[pkt_id]])
+                self.recovered[pkt_id] = now
+        self._verify()  # los reconstruidos, de una vez
+        self._release_group(group)
+
+    def _verify_parity(self, parity_ids):
+        present = [i for i in parity_ids if i in self.parity]
+        if not present:
+            return
+        offsets = array("Q", (self.offsets[i] for i in present))
+        lengths = array("Q", (self.lengths[i] for i in present))
+        actual = cpp_core.crc32c_fragments(self.parity_buffer, offsets, lengths)
+        for pkt_id, got in zip(present, actual):
+            if got != self.checksums[pkt_id]:
+                self.corrupt += 1
+                self.parity.discard(pkt_id)
+                self.held_bytes -= self.lengths[pkt_id]
+
+    def _release_group(self, group):
+        self.done_groups.add(group)
+        for pkt_id in self.fec_info["groups"][group][1]:
+            if pkt_id in self.parity:
+                self.parity.discard(pkt_id)
+                self.held_bytes -= self.lengths[pkt_id]
+
+    def _view(self, pkt_id):
+        offset = self.offsets[pkt_id]
+        return memoryview(self.buffer)[offset : offset + self.lengths[pkt_id]]
+
+    def _parity_view(self, pkt_id):
+        offset = self.offsets[pkt_id]
+        return memoryview(self.parity_buffer)[offset : offset + self.lengths[pkt_id]]
+
+    @property
+    def complete(self):
+        return self.received_count == self.n_data
+
+    def finish(self, original):
+        """
+        Descomprime el buffer reensamblado por bloques (iter_decompress) y compara cada uno
+        con su tramo de `original`: la salida completa nunca está en memoria. Devuelve el
+        informe del receptor (sin goodput, que depende del tiempo de simulación);
+        decompress_time_ms incluye la comparación.
+        """
+        self._verify()
+        report = {
+            "complete": self.complete,
+            "verified": False,
+            "missing_fragments": self.n_data - self.received_count,
+            "fec_decoded_fragments": len(self.recovered),  # reconstruidos antes de que llegara el original (o sin él)
+            "corrupt_fragments": self.corrupt,
+            "duplicate_fragments": self.duplicates,
+            "out_of_order_fragments": self.out_of_order,
+            "reorder_depth": self.reorder_depth,
+            "buffer_high_water_bytes": self.high_water,
+            "decompress_time_ms": None,
+            "error": None,
+        }
+        if not self.complete:
+            return report
+
+        # memoryview: `original` puede ser cualquier buffer (bytes, mmap de una subida en disco)
+        expected = memoryview(original).cast("B")
+        t0 = time.time()
+        position, matches = 0, True
+        try:
+            for piece in iter_decompress(self.buffer):
+                end = position + len(piece)
+                if end > expected.nbytes or memoryview(piece) != expected[position:end]:
+                    matches = False
+                    break
+                position = end
+        except Exception as e:
+            report["error"] = f"{type(e).__name__}: {e}"
+            return report
+        report["decompress_time_ms"] = (time.time() - t0) * 1000
+        report["verified"] = matches and position == expected.nbytes
+        return report
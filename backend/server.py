@@ -4,15 +4,72 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), "DRL-router"))
 
 import uvicorn
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-import simpy
-import shutil
-import random
+from fastapi.responses import StreamingResponse, Response, PlainTextResponse
+from pydantic import BaseModel
+import asyncio
+import base64
+import binascii
+import json
+import multiprocessing
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
-from transmisor import TransmissionSimulator
-from satelites import ConstellationManager
-from router import IntelligentRouter
+from compresion import CAPABILITIES, CODECS
+import simulacion
+import estado_compartido
+from consideraciones import TRAFFIC_CLASSES, SPLIT_POLICIES
+import metricas
+
+# Pool de simulación (configurable por variables de entorno)
+# STARS_WORKERS: procesos que simulan en paralelo (por defecto, uno por núcleo)
+# STARS_QUEUE_DEPTH: peticiones que pueden esperar turno antes de rechazar con 429
+# STARS_REQUEST_TIMEOUT: segundos máximos por petición (cola + simulación)
+MAX_WORKERS = max(1, int(os.environ.get("STARS_WORKERS", os.cpu_count() or 1)))
+QUEUE_DEPTH = max(0, int(os.environ.get("STARS_QUEUE_DEPTH", 2 * MAX_WORKERS)))
+REQUEST_TIMEOUT = float(os.environ.get("STARS_REQUEST_TIMEOUT", 120))
+# STARS_WARM_ENVIRONMENTS: constelaciones preconstruidas que mantiene cada worker
+WARM_ENVIRONMENTS = max(0, int(os.environ.get("STARS_WARM_ENVIRONMENTS", 2)))
+# STARS_LAZY_MODEL=1: el servidor no espera a que los workers carguen torch y el modelo;
+# cada worker se lanza y lo carga con su primera simulación (arranque en frío más rápido)
+LAZY_MODEL = os.environ.get("STARS_LAZY_MODEL", "0") == "1"
+# STARS_PAYLOAD_CACHE_MB: caché en memoria (por worker) de payloads ya comprimidos (0 = sin caché)
+# STARS_PAYLOAD_CACHE_DIR: directorio del nivel en disco, compartido por los workers (vacío = sin disco)
+# STARS_PAYLOAD_CACHE_DISK_MB: tope del nivel en disco
+PAYLOAD_CACHE_MB = max(0, int(os.environ.get("STARS_PAYLOAD_CACHE_MB", 64)))
+PAYLOAD_CACHE_DIR = os.environ.get("STARS_PAYLOAD_CACHE_DIR", "")
+PAYLOAD_CACHE_DISK_MB = max(0, int(os.environ.get("STARS_PAYLOAD_CACHE_DISK_MB", 1024)))
+# STARS_SHARED_STATE: nombre del segmento de estado compartido (vacío = cada simulación usa
+# su propia constelación aleatoria). STARS_STATE_TICK: segundos por paso del dueño.
+SHARED_STATE = os.environ.get("STARS_SHARED_STATE", "")
+STATE_TICK = float(os.environ.get("STARS_STATE_TICK", 1.0))
+# STARS_MAX_UPLOAD_BYTES: tamaño máximo de subida (413 si se supera)
+MAX_UPLOAD_BYTES = int(os.environ.get("STARS_MAX_UPLOAD_BYTES", 256 * 1024 * 1024))
+# STARS_MAX_BATCH_FLOWS: flujos máximos por petición de /api/transmit/batch
+MAX_BATCH_FLOWS = int(os.environ.get("STARS_MAX_BATCH_FLOWS", 1000))
+
+# Métricas (/metrics, formato Prometheus)
+METRICS = metricas.Registry()
+REQUESTS = METRICS.counter("stars_requests_total", "Peticiones por endpoint y código HTTP", ("endpoint", "status"))
+REQUEST_SECONDS = METRICS.histogram("stars_request_seconds", "Duración de las peticiones", ("endpoint",))
+STAGE_SECONDS = METRICS.histogram("stars_stage_seconds", "Duración de cada etapa de una transmisión", ("stage",))
+BYTES_IN = METRICS.counter("stars_bytes_in_total", "Bytes recibidos en el cuerpo de las peticiones", ("endpoint",))
+BYTES_OUT = METRICS.counter("stars_bytes_out_total", "Bytes enviados en las respuestas", ("endpoint",))
+IN_FLIGHT = METRICS.gauge("stars_in_flight_requests", "Peticiones de simulación en curso o en cola")
+POOL_WORKERS = METRICS.gauge("stars_pool_workers", "Procesos del pool de simulación")
+POOL_OCCUPANCY = METRICS.gauge("stars_pool_occupancy_ratio", "Fracción de workers ocupados")
+POOL_QUEUED = METRICS.gauge("stars_pool_queued_requests", "Peticiones esperando un worker libre")
+POOL_EVENTS = METRICS.counter("stars_pool_events_total", "Resultados del pool", ("event",))
+CACHE_REQUESTS = METRICS.counter("stars_cache_requests_total", "Aciertos y fallos de las cachés", ("cache", "result"))
+CACHE_SAVED_SECONDS = METRICS.counter("stars_cache_saved_seconds_total", "Tiempo ahorrado por las cachés", ("cache",))
+CACHE_SAVED_BYTES = METRICS.counter("stars_cache_saved_bytes_total", "Bytes que no hubo que volver a procesar", ("cache",))
+CACHE_BYTES = METRICS.gauge("stars_cache_bytes", "Bytes en memoria de cada caché (suma de los workers)", ("cache",))
+TRANSMIT_ENDPOINTS = ("/api/transmit", "/api/transmit/stream", "/api/transmit/batch")
 
 app = FastAPI()
 
@@ -31,6 +88,12 @@ ALLOWED_ORIGINS = [
     "https://s.t.a.r.s-web.onrender.com",
 ]
 
+app.add_middleware(
+    metricas.MetricsMiddleware,
+    requests=REQUESTS, latency=REQUEST_SECONDS, bytes_in=BYTES_IN, bytes_out=BYTES_OUT,
+    endpoints=TRANSMIT_ENDPOINTS,
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins = ALLOWED_ORIGINS,
@@ -39,77 +102,489 @@ app.add_middleware(
     allow_headers = ["*"]
 )
 
-global_router = None
-global_constellation_template = None
+pool = None
+pool_lock = threading.Lock()  # serializa los reinicios del pool
+pool_state = {"in_flight": 0, "completed": 0, "rejected": 0, "timeouts": 0, "failures": 0}
+# Constelaciones preconstruidas: aciertos/fallos, ms ahorrados y disponibles por worker (último informe)
+environment_state = {"size": WARM_ENVIRONMENTS, "hits": 0, "misses": 0, "saved_ms_total": 0.0, "setup_ms_total": 0.0, "ready": {}}
+# Caché de payloads comprimidos: totales de todos los workers y bytes en memoria por worker (último informe)
+payload_cache_state = {"enabled": PAYLOAD_CACHE_MB > 0, "hits": 0, "disk_hits": 0, "misses": 0,
+                       "saved_ms_total": 0.0, "saved_bytes_total": 0, "bytes": {}}
+# Estado compartido: lector local (para /health) y, si este proceso ganó la elección, el dueño
+shared_state = None
+shared_owner = None
+# Streaming: cola de eventos de los workers y cola asyncio de cada stream abierto
+pool_events = None
+streams = {}
 
 @app.get("/health")
-def health():
-    return {"status" : "ok"}
+async def health():
+    # Nunca toca el pool: responde aunque todas las simulaciones estén ocupadas
+    return {
+        "status" : "ok",
+        "compression": CAPABILITIES,
+        "pool": {"workers": MAX_WORKERS, "queue_depth": QUEUE_DEPTH, "available": pool is not None,
+                 "lazy_model": LAZY_MODEL, **pool_state},
+        "environments": environment_state,
+        "payload_cache": {**payload_cache_state, "hit_rate": _hit_rate(payload_cache_state)},
+        "network_state": _network_state(),
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    # Los contadores del pool y de las cachés se llevan en pool_state/environment_state
+    in_flight = pool_state["in_flight"]
+    IN_FLIGHT.set(in_flight)
+    POOL_WORKERS.set(MAX_WORKERS)
+    POOL_OCCUPANCY.set(min(in_flight, MAX_WORKERS) / MAX_WORKERS)
+    POOL_QUEUED.set(max(0, in_flight - MAX_WORKERS))
+    for event in ("completed", "rejected", "timeouts", "failures"):
+        POOL_EVENTS.set_total(pool_state[event], event=event)
+    CACHE_REQUESTS.set_total(environment_state["hits"], cache="warm_environment", result="hit")
+    CACHE_REQUESTS.set_total(environment_state["misses"], cache="warm_environment", result="miss")
+    CACHE_SAVED_SECONDS.set_total(environment_state["saved_ms_total"] / 1000, cache="warm_environment")
+    CACHE_REQUESTS.set_total(payload_cache_state["hits"], cache="payload", result="hit")
+    CACHE_REQUESTS.set_total(payload_cache_state["disk_hits"], cache="payload", result="disk_hit")
+    CACHE_REQUESTS.set_total(payload_cache_state["misses"], cache="payload", result="miss")
+    CACHE_SAVED_SECONDS.set_total(payload_cache_state["saved_ms_total"] / 1000, cache="payload")
+    CACHE_SAVED_BYTES.set_total(payload_cache_state["saved_bytes_total"], cache="payload")
+    CACHE_BYTES.set(sum(payload_cache_state["bytes"].values()), cache="payload")
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
+
+def _network_state():
+    if shared_state is None:
+        return {"shared": False}
+    return {"shared": True, "name": SHARED_STATE, "owner": shared_owner is not None, **shared_state.info()}
+
+
+def _create_pool():
+    # spawn: los workers no heredan el estado del event loop ni los hilos de torch del servidor
+    return ProcessPoolExecutor(
+        max_workers=MAX_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=simulacion.init_worker,
+        initargs=(WARM_ENVIRONMENTS, SHARED_STATE or None, pool_events, LAZY_MODEL, _payload_cache_config()),
+    )
+
+
+def _payload_cache_config():
+    if not PAYLOAD_CACHE_MB:
+        return None
+    return {"max_bytes": PAYLOAD_CACHE_MB * 1024 * 1024, "disk_dir": PAYLOAD_CACHE_DIR or None,
+            "disk_max_bytes": PAYLOAD_CACHE_DISK_MB * 1024 * 1024}
 
 
 @app.on_event("startup")
-def load_model():
-    """Carga el modelo DRL y la constelación base al iniciar el servidor"""
-    global global_router, global_constellation_template
-    print("[API] Cargando modelo DRL y sistema...")
-    
-    # Entorno temporal para inicializar el enviroment
-    temp_env = simpy.Environment()
-    manager = ConstellationManager(temp_env)
-    
-    # Router en modo inferencia 
-    global_router = IntelligentRouter(manager, train_mode=False)
+async def load_model():
+    """Arranca el pool de simulación; cada worker carga el modelo DRL una sola vez"""
+    global pool, pool_events
+    if SHARED_STATE:
+        _start_shared_state()
+
+    # Los workers publican los eventos de streaming en esta cola; un hilo los reparte
+    pool_events = multiprocessing.get_context("spawn").Queue()
+    threading.Thread(target=_dispatch_events, args=(asyncio.get_running_loop(),), daemon=True).start()
+
+    pool = _create_pool()
+    if LAZY_MODEL:
+        # Los workers se lanzan con la primera petición y cargan el modelo entonces
+        print(f"[API] Modelo DRL diferido: {MAX_WORKERS} workers bajo demanda "
+              f"(cola máxima: {QUEUE_DEPTH}, timeout: {REQUEST_TIMEOUT:g} s)")
+    else:
+        print(f"[API] Cargando modelo DRL en {MAX_WORKERS} workers...")
+        pids = await asyncio.gather(*(asyncio.wrap_future(f) for f in _warm_up(pool)))
+        print(f"[API] Workers listos: {len(set(pids))} (cola máxima: {QUEUE_DEPTH}, timeout: {REQUEST_TIMEOUT:g} s)")
+    print(f"[API] Backend de compresión: {CAPABILITIES['backend']} (códecs: {', '.join(CAPABILITIES['codecs'])})")
     print("[API] API cargada.")
 
 
+def _start_shared_state():
+    """
+    El primer worker de uvicorn que crea el segmento lanza el proceso dueño; el resto solo
+    se adjunta. Si ya hay un dueño independiente (estado_compartido.py) todos se adjuntan.
+    """
+    global shared_state, shared_owner
+    try:
+        shared_state = estado_compartido.SharedConstellationState.create(SHARED_STATE, STATE_TICK)
+    except FileExistsError:
+        shared_state = estado_compartido.SharedConstellationState.attach(SHARED_STATE)
+        print(f"[API] Estado compartido '{SHARED_STATE}': adjuntado (versión {shared_state.version})")
+        return
+
+    process = multiprocessing.get_context("spawn").Process(
+        target=estado_compartido.run_owner,
+        kwargs={"name": SHARED_STATE, "tick": STATE_TICK, "create": False},
+        daemon=True,
+    )
+    process.start()
+    shared_owner = process
+    print(f"[API] Estado compartido '{SHARED_STATE}': dueño lanzado (pid {process.pid})")
+
+
+@app.on_event("shutdown")
+def stop_pool():
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+    if shared_owner is not None:
+        shared_owner.terminate()
+    if shared_state is not None:
+        shared_state.close()  # borra el segmento si este proceso lo creó
+    if pool_events is not None:
+        pool_events.put(None)  # detiene el hilo repartidor
+
+
+def _dispatch_events(loop):
+    """Hilo: lleva cada (stream_id, tipo, datos) de los workers a la cola de su stream."""
+    while True:
+        item = pool_events.get()
+        if item is None:
+            return
+        queue = streams.get(item[0])
+        if queue is not None:  # el cliente pudo haberse desconectado
+            loop.call_soon_threadsafe(queue.put_nowait, item[1:])
+
+
+def _restart_pool(broken):
+    """
+    Sustituye un pool roto (un worker murió) por uno nuevo y lo calienta. Varias peticiones
+    pueden fallar con el mismo pool roto: solo se reinicia si `broken` sigue siendo el pool
+    actual, así las demás no tiran el pool nuevo (ni las simulaciones que ya corren en él).
+    """
+    global pool
+    with pool_lock:
+        if pool is not broken:
+            return
+        broken.shutdown(wait=False, cancel_futures=True)
+        pool = _create_pool()
+        _warm_up(pool)
+    print("[API] Pool de simulación reiniciado")
+
+
+def _warm_up(executor):
+    """Una tarea vacía por worker: lanza los procesos y carga el modelo antes de la primera petición."""
+    if LAZY_MODEL:
+        return []
+    return [executor.submit(simulacion.ping) for _ in range(MAX_WORKERS)]
+
+
+
+def _record_result(meta, submitted):
+    """Contabiliza una simulación terminada: constelación precalentada y etapas del worker."""
+    _record_environment(meta["environment"])
+    if meta.get("payload_cache"):
+        _record_payload_cache(meta["payload_cache"])
+    stages = meta.get("stage_timings_ms", {})
+    for stage, ms in stages.items():
+        if stage != "worker_total":
+            STAGE_SECONDS.observe(ms / 1000, stage=stage)
+    if "worker_total" in stages:
+        # Lo que no pasó dentro del worker: espera en la cola del pool + envío entre procesos
+        waited = time.perf_counter() - submitted - stages["worker_total"] / 1000
+        STAGE_SECONDS.observe(max(0.0, waited), stage="queue_wait")
+
+
+def _json_response(result):
+    """Serializa midiendo la etapa (mismas opciones que la respuesta JSON por defecto)."""
+    t0 = time.perf_counter()
+    body = json.dumps(result, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    STAGE_SECONDS.observe(time.perf_counter() - t0, stage="serialization")
+    return Response(content=body, media_type="application/json")
+
+
+def _record_environment(report):
+    environment_state["hits" if report["warm"] else "misses"] += 1
+    environment_state["saved_ms_total"] += report["saved_ms"]
+    environment_state["setup_ms_total"] += report["setup_ms"]
+    environment_state["ready"][report["worker"]] = report["ready"]
+
+
+def _record_payload_cache(report):
+    for key in ("hits", "disk_hits", "misses"):
+        payload_cache_state[key] += report[key]
+    payload_cache_state["saved_ms_total"] += report["saved_ms"]
+    payload_cache_state["saved_bytes_total"] += report["saved_bytes"]
+    payload_cache_state["bytes"][report["worker"]] = report["bytes"]
+
+
+def _hit_rate(state):
+    lookups = state["hits"] + state["disk_hits"] + state["misses"]
+    return (state["hits"] + state["disk_hits"]) / lookups if lookups else None
+
+
+def _admit():
+    """Contrapresión: con todos los workers ocupados y la cola llena se rechaza en el acto."""
+    if pool is None:
+        raise HTTPException(status_code=503, detail="Pool de simulación no disponible")
+    if pool_state["in_flight"] >= MAX_WORKERS + QUEUE_DEPTH:
+        pool_state["rejected"] += 1
+        raise HTTPException(status_code=429, detail="Servidor saturado, reintente más tarde",
+                            headers={"Retry-After": "1"})
+
+
+def _check_codec(codec, prefix=""):
+    """Un códec desconocido es un error del cliente: 400 antes de ocupar un worker."""
+    if codec not in CODECS:
+        raise HTTPException(status_code=400, detail=f"{prefix}Códec desconocido '{codec}'")
+
+
+def _check_flow(i, spec):
+    """Parámetros de un flujo del lote: un valor desconocido no debe simularse con el de por defecto."""
+    prefix = f"Flujo {i}: "
+    _check_codec(spec.codec, prefix)
+    if spec.traffic_class not in TRAFFIC_CLASSES:
+        raise HTTPException(status_code=400, detail=f"{prefix}Clase de tráfico desconocida '{spec.traffic_class}'")
+    if spec.split_policy not in SPLIT_POLICIES:
+        raise HTTPException(status_code=400, detail=f"{prefix}Política de reparto desconocida '{spec.split_policy}'")
+
+
+def _failure(e, future, executor=None):
+    """
+    Traduce el error de una simulación a la HTTPException correspondiente.
+    executor: pool al que se envió la simulación (el que se reinicia si está roto).
+    """
+    if isinstance(e, (asyncio.TimeoutError, simulacion.SimulationTimeout)):
+        # Si seguía en cola se cancela; si ya corría, el worker la aborta al pasar el plazo
+        if future is not None:
+            future.cancel()
+        pool_state["timeouts"] += 1
+        return HTTPException(status_code=504, detail=f"La simulación superó {REQUEST_TIMEOUT:g} s")
+    if isinstance(e, BrokenProcessPool):
+        pool_state["failures"] += 1
+        if executor is not None:
+            _restart_pool(executor)
+        return HTTPException(status_code=503, detail="Un worker de simulación falló, reintente")
+    if isinstance(e, ValueError):
+        # Parámetros inválidos (códec o diccionario desconocido)
+        return HTTPException(status_code=400, detail=str(e))
+    pool_state["failures"] += 1
+    print(f"[API Error] {str(e)}")
+    return HTTPException(status_code=500, detail=str(e))
+
 
 @app.post("/api/transmit")
 
-async def passData(file: UploadFile = File(...)):
+async def passData(file: UploadFile = File(...), codec: str = "auto", dictionary: str | None = None):
+    _admit()
+    _check_codec(codec)
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"El archivo supera {MAX_UPLOAD_BYTES} bytes")
+
+    pool_state["in_flight"] += 1
+    executor = future = None
     try:
+        t0 = time.perf_counter()
         content_bytes = await file.read()
+        STAGE_SECONDS.observe(time.perf_counter() - t0, stage="upload_read")
 
-        try:
-            information = content_bytes.decode('utf-8')
-        except UnicodeDecodeError:
-            # Por ahora fuerza una representación string de todo binario puro  (zip/imagen)
-            #TODO modificar transmission.py para aceptar bytes puros
-            information = str(content_bytes)
-        
         print(f"[API] Archivo Procesado: {file.filename} ({len(content_bytes)} bytes)")
 
-        env = simpy.Environment()
-        
-        # IMPORTANTE: ConstellationManager debe recrearse o resetearse para cada simulación
-        # para que el tiempo (env.now) empiece en 0.
-        constellation = ConstellationManager(env)
-        
-        
-        global_router.constellation = constellation
-        
-        # Inicializar simulador
-        simulator = TransmissionSimulator(env, constellation, global_router)
-        
-        
-        src_p, src_s = random.randint(0, constellation.planes -1),random.randint(0, constellation.sats_per_plane -1) 
-        dst_p, dst_s = random.randint(0, constellation.planes -1),random.randint(0, constellation.sats_per_plane -1) 
-        
-        # process_and_send debe ser adaptado ligeramente para devolver el valor al terminar
-        proc = env.process(simulator.process_and_send(information, src_p, src_s, dst_p, dst_s))
-        env.run(until=proc) # Correr hasta que termine el proceso
-       
-    
-        
-        result_json = proc.value
-        
-       
+        # El plazo cuenta desde que llega la petición (incluye la espera en cola)
+        deadline = time.time() + REQUEST_TIMEOUT
+        submitted = time.perf_counter()
+        executor = pool
+        future = executor.submit(simulacion.run_transmission, content_bytes, codec, dictionary, deadline)
+        result_json = await asyncio.wait_for(asyncio.wrap_future(future), timeout=REQUEST_TIMEOUT + 1)
+
         result_json['meta']['filename'] = file.filename
-        
-        return result_json
+        pool_state["completed"] += 1
+        _record_result(result_json['meta'], submitted)
+
+    except Exception as e:
+        raise _failure(e, future, executor)
+    finally:
+        pool_state["in_flight"] -= 1
+    # Fuera del try: un resultado no serializable (NaN) es un error del servidor, no un 400
+    return _json_response(result_json)
+
+
+class FlowSpec(BaseModel):
+    id: str | None = None
+    size: int | None = None  # payload sintético de `size` bytes ...
+    payload: str | None = None  # ... o el contenido real en base64
+    src: tuple[int, int] | None = None  # (plano, satélite); None = aleatorio
+    dst: tuple[int, int] | None = None
+    start: float = 0.0  # segundos de simulación
+    codec: str = "auto"
+    traffic_class: str = "bulk"
+    split_policy: str = "drl"
+
+
+class BatchRequest(BaseModel):
+    flows: list[FlowSpec]
+    seed: int | None = None
+
+
+@app.post("/api/transmit/batch")
+async def batchData(batch: BatchRequest):
+    """
+    Muchos flujos en una sola simulación compartida (mismos enlaces y colas). Devuelve el
+    tiempo de finalización de cada flujo y el goodput agregado.
+    """
+    _admit()
+    if not batch.flows or len(batch.flows) > MAX_BATCH_FLOWS:
+        raise HTTPException(status_code=400, detail=f"Se esperan entre 1 y {MAX_BATCH_FLOWS} flujos")
+
+    flows, total = [], 0
+    for i, spec in enumerate(batch.flows):
+        _check_flow(i, spec)
+        flow = spec.model_dump(exclude_none=True, exclude={"payload"})
+        if spec.payload is not None:
+            try:
+                flow["payload"] = base64.b64decode(spec.payload, validate=True)
+            except binascii.Error:
+                raise HTTPException(status_code=400, detail=f"Flujo {i}: payload no es base64 válido")
+            total += len(flow["payload"])
+        elif spec.size is not None and spec.size >= 0:
+            total += spec.size
+        else:
+            raise HTTPException(status_code=400, detail=f"Flujo {i}: falta size o payload")
+        flows.append(flow)
+    if total > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Los flujos suman más de {MAX_UPLOAD_BYTES} bytes")
+
+    pool_state["in_flight"] += 1
+    executor = future = None
+    try:
+        print(f"[API] Lote: {len(flows)} flujos ({total} bytes)")
+        deadline = time.time() + REQUEST_TIMEOUT
+        submitted = time.perf_counter()
+        executor = pool
+        future = executor.submit(simulacion.run_batch, flows, batch.seed, deadline)
+        result_json = await asyncio.wait_for(asyncio.wrap_future(future), timeout=REQUEST_TIMEOUT + 1)
+        pool_state["completed"] += 1
+        _record_result(result_json['meta'], submitted)
+    except Exception as e:
+        raise _failure(e, future, executor)
+    finally:
+        pool_state["in_flight"] -= 1
+    return _json_response(result_json)
 
+
+@app.post("/api/transmit/stream")
+async def streamData(request: Request, filename: str = "upload.bin", codec: str = "auto", dictionary: str | None = None):
+    """
+    Modo streaming: el cuerpo de la petición es el archivo en crudo (application/octet-stream)
+    y se vuelca a disco por bloques según llega; la respuesta es un stream SSE con el progreso:
+    accepted, compressed, routes, timeline (por lotes), result o error.
+    """
+    _admit()
+    _check_codec(codec)
+    try:
+        declared = int(request.headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Content-Length no es un entero")
+    if declared > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"El archivo supera {MAX_UPLOAD_BYTES} bytes")
+
+    # La subida se lee aquí y no dentro del stream: StreamingResponse consume `receive`
+    # para detectar la desconexión del cliente y se comería el cuerpo.
+    pool_state["in_flight"] += 1
+    try:
+        t0 = time.perf_counter()
+        path, received = await _ingest(request)
+        STAGE_SECONDS.observe(time.perf_counter() - t0, stage="upload_read")
+    finally:
+        pool_state["in_flight"] -= 1
+    print(f"[API] Archivo Procesado (stream): {filename} ({received} bytes)")
+    return _UploadStream(path, _stream_events(path, received, filename, codec, dictionary),
+                         media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+class _UploadStream(StreamingResponse):
+    """
+    Respuesta SSE dueña del archivo temporal de la subida: lo borra al terminar, pase lo que
+    pase. Si el cliente se desconecta antes de que arranque el generador, su finally no corre.
+    """
+
+    def __init__(self, path, content, **kwargs):
+        super().__init__(content, **kwargs)
+        self.path = path
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.body_iterator.aclose()  # cancela la simulación si el stream quedó a medias
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+
+async def _ingest(request):
+    """Copia el cuerpo a un archivo temporal por bloques: la subida nunca está entera en memoria."""
+    fd, path = tempfile.mkstemp(prefix="stars-", suffix=".upload")
+    received = 0
+    try:
+        with os.fdopen(fd, "wb") as f:
+            async for chunk in request.stream():
+                received += len(chunk)
+                if received > MAX_UPLOAD_BYTES:
+                    raise HTTPException(status_code=413, detail=f"El archivo supera {MAX_UPLOAD_BYTES} bytes")
+                f.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path, received
+
+
+def _sse(kind, data):
+    # Los eventos de progreso llegan de los workers ya serializados
+    if not isinstance(data, str):
+        data = json.dumps(data)
+    return f"event: {kind}\ndata: {data}\n\n"
+
+
+async def _stream_events(path, received, filename, codec, dictionary):
+    pool_state["in_flight"] += 1
+    stream_id = uuid.uuid4().hex
+    events = streams[stream_id] = asyncio.Queue()
+    executor = future = None
+    try:
+        yield _sse("accepted", {"stream_id": stream_id, "filename": filename, "received_bytes": received})
+
+        # Simulación en el pool; los eventos llegan por la cola del stream
+        deadline = time.time() + REQUEST_TIMEOUT
+        submitted = time.perf_counter()
+        executor = pool
+        future = executor.submit(simulacion.stream_transmission, stream_id, path, codec, dictionary, deadline)
+        done = asyncio.wrap_future(future)
+        while True:
+            getter = asyncio.ensure_future(events.get())
+            waiting = {getter} if done.done() else {getter, done}
+            finished, _ = await asyncio.wait(waiting, timeout=max(0.0, deadline + 1 - time.time()),
+                                             return_when=asyncio.FIRST_COMPLETED)
+            if getter not in finished:
+                getter.cancel()
+                if not finished:
+                    raise asyncio.TimeoutError()
+                if done.exception() is not None:
+                    raise done.exception()
+                continue  # terminó bien: el evento "result" aún viene por la cola
+
+            kind, data = getter.result()
+            if kind == "result":
+                data["meta"]["filename"] = filename
+                pool_state["completed"] += 1
+                _record_result(data["meta"], submitted)
+            yield _sse(kind, data)
+            if kind == "result":
+                return
+
+    except (asyncio.CancelledError, GeneratorExit):
+        # Cliente desconectado: si la simulación seguía en cola no llega a correr
+        if future is not None:
+            future.cancel()
+        raise
     except Exception as e:
-        print(f"[API Error] {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        error = _failure(e, future, executor)
+        yield _sse("error", {"status": error.status_code, "detail": error.detail})
+    finally:
+        pool_state["in_flight"] -= 1
+        streams.pop(stream_id, None)
+
 
 if __name__ == "__main__":
     
@@ -0,0 +1,446 @@
+"""
+Ejecución de una transmisión completa fuera del event loop del servidor.
+
+Las funciones de este módulo corren dentro de los procesos del pool de server.py:
+init_worker carga el modelo una sola vez por proceso y run_transmission simula una
+subida con su propia constelación (env.now empieza en 0 en cada simulación), tomada de
+un pool de constelaciones ya construidas que se rellena en segundo plano.
+
+torch, el router y el transmisor se importan solo dentro de los workers: el proceso de la
+API importa este módulo para referenciar las tareas y no debe pagar ese arranque.
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), "DRL-router"))
+
+import json
+import mmap
+import random
+import threading
+import time
+from collections import deque
+from itertools import groupby
+
+import simpy
+
+from satelites import ConstellationManager
+from estado_compartido import SharedConstellationState
+from cache_compresion import PayloadCache
+import compresion
+import consideraciones
+
+# Cada cuántos eventos se comprueba el plazo de la petición
+DEADLINE_CHECK_EVERY = 256
+# Intervalo mínimo (s reales) entre lotes de timeline en modo streaming
+TIMELINE_FLUSH_S = 0.05
+
+_model = None
+_environments = None
+_shared = None
+_events = None
+_payloads = None
+
+
+class SimulationTimeout(Exception):
+    """La simulación superó el plazo de la petición y se abortó dentro del worker."""
+
+
+class TransmissionFailed(Exception):
+    """process_and_send terminó sin transmitir (status FAILED); el mensaje es su motivo."""
+
+
+class EnvironmentPool:
+    """
+    Constelaciones listas para simular: entorno nuevo, satélites creados y sus procesos ya
+    arrancados, pero sin avanzar el tiempo (env.now == 0). Cada una se usa una sola vez.
+    El relleno corre en un hilo y se despierta al terminar cada simulación (release), para
+    construir mientras el worker está libre y no competir con la simulación en curso.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._ready = deque()
+        self._wanted = threading.Event()
+        self.build_ms = 0.0  # media móvil del coste de preparar una constelación
+        self.hits = 0
+        self.misses = 0
+        if size > 0:
+            self._wanted.set()
+            threading.Thread(target=self._refill, daemon=True).start()
+
+    def _build(self):
+        t0 = time.perf_counter()
+        env = simpy.Environment()
+        constellation = ConstellationManager(env)
+        # Arranca los procesos de los satélites (eventos en t=0) sin avanzar el reloj
+        while env.peek() == 0:
+            env.step()
+        ms = (time.perf_counter() - t0) * 1000
+        self.build_ms = ms if not self.build_ms else 0.8 * self.build_ms + 0.2 * ms
+        return env, constellation
+
+    def _refill(self):
+        while True:
+            self._wanted.wait()
+            self._wanted.clear()
+            while len(self._ready) < self.size:
+                self._ready.append(self._build())
+
+    def acquire(self):
+        """Devuelve (env, constellation, informe); construye en el momento si el pool está vacío."""
+        try:
+            env, constellation = self._ready.popleft()
+        except IndexError:
+            self.misses += 1
+            t0 = time.perf_counter()
+            env, constellation = self._build()
+            return env, constellation, {"warm": False, "setup_ms": (time.perf_counter() - t0) * 1000, "saved_ms": 0.0}
+        self.hits += 1
+        return env, constellation, {"warm": True, "setup_ms": 0.0, "saved_ms": self.build_ms}
+
+    @property
+    def ready(self):
+        return len(self._ready)
+
+    def release(self):
+        """Pide al hilo de relleno que reponga lo consumido."""
+        if self.size > 0:
+            self._wanted.set()
+
+    def stats(self):
+        return {"ready": self.ready, "size": self.size, "hits": self.hits, "misses": self.misses,
+                "build_ms": self.build_ms}
+
+
+def init_worker(warm_environments=0, shared_state=None, events=None, lazy_model=False, payload_cache=None):
+    """
+    Inicializador del pool: carga el modelo DRL en modo inferencia una vez por proceso y,
+    si se indica, se adjunta al segmento de estado compartido de la constelación.
+    `events` es la cola por la que stream_transmission publica resultados progresivos.
+    Con lazy_model=True el modelo (y torch) se cargan con la primera simulación del worker.
+    payload_cache: argumentos de PayloadCache (None = se comprime siempre).
+    """
+    global _environments, _shared, _events, _payloads
+    # Un hilo de compresión por llamada, como torch: hay un worker por núcleo y varios
+    # comprimiendo a la vez con todos los núcleos cada uno se pisarían (núcleos² hilos)
+    compresion.set_threads(1)
+    _environments = EnvironmentPool(warm_environments)
+    if payload_cache:
+        _payloads = PayloadCache(**payload_cache)
+    if shared_state:
+        _shared = SharedConstellationState.attach(shared_state)
+    _events = events
+    if not lazy_model:
+        _load_model()
+
+
+def _load_model():
+    """El modelo DRL del proceso; lo carga (importando torch) la primera vez que se pide."""
+    global _model
+    if _model is None:
+        import torch
+        from router import RouterModel
+
+        # Un hilo de torch por proceso: la concurrencia la dan los procesos del pool
+        torch.set_num_threads(1)
+        _model = RouterModel()
+    return _model
+
+
+def ping():
+    """Tarea vacía para arrancar (y calentar) los workers al iniciar el servidor."""
+    return os.getpid()
+
+
+def run_transmission(content_bytes, codec="auto", dictionary=None, deadline=None):
+    """
+    Simula el envío de `content_bytes` entre dos satélites aleatorios y devuelve el JSON
+    de TransmissionSimulator. `deadline` es un instante absoluto (time.time()); si se
+    supera, la simulación se aborta con SimulationTimeout.
+    """
+    return _transmit(content_bytes, codec, dictionary, deadline)
+
+
+def stream_transmission(stream_id, path, codec="auto", dictionary=None, deadline=None):
+    """
+    Como run_transmission, pero el payload se lee de `path` con mmap (no pasa por el heap ni
+    por el pipe del pool) y el resultado se publica por partes en la cola de eventos como
+    tuplas (stream_id, tipo, datos): "compressed", "routes", "timeline" (lotes de eventos
+    nuevos de la animación), con los datos ya en JSON, y al final "result" (dict con meta,
+    rutas y enlaces, sin timeline).
+    """
+    if _events is None:
+        raise RuntimeError("El worker no tiene cola de eventos (init_worker sin events)")
+
+    def emit(kind, data):
+        # Serializado aquí: Queue.put envía desde un hilo aparte y la simulación sigue
+        # modificando las rutas y el timeline que contiene el evento
+        _events.put((stream_id, kind, json.dumps(data)))
+
+    sent = 0
+    last_flush = time.time()
+
+    def flush_timeline(simulator, force=False):
+        nonlocal sent, last_flush
+        log = simulator.transmission_log
+        if len(log) > sent and (force or time.time() - last_flush >= TIMELINE_FLUSH_S):
+            emit("timeline", log[sent:])
+            sent = len(log)
+            last_flush = time.time()
+
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        payload = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        try:
+            simulator, result = _transmit(payload, codec, dictionary, deadline, listener=emit,
+                                          on_tick=flush_timeline, with_simulator=True)
+            flush_timeline(simulator, force=True)
+            # El resultado ya no cambia: va sin serializar (el servidor le añade el nombre)
+            _events.put((stream_id, "result", {k: v for k, v in result.items() if k != "timeline"}))
+            del simulator, result
+        finally:
+            if size:
+                try:
+                    payload.close()
+                except BufferError:
+                    pass  # aún hay vistas vivas del mapeo: lo cierra el recolector
+    return True
+
+
+def run_batch(flows, seed=None, deadline=None):
+    """
+    Simula muchos flujos a la vez en una sola constelación: comparten enlaces y colas.
+    flows: lista de dicts con "payload" (bytes) o "size", "src"/"dst" ((plano, sat) o None =
+    aleatorio), "start" (s de simulación), "codec", "traffic_class" y "split_policy".
+    Los flujos que arrancan en el mismo instante se enrutan juntos con una sola pasada del
+    modelo (RouterModel.forward_batch). Devuelve el informe por flujo y el agregado.
+    """
+    from transmisor import TransmissionSimulator
+
+    if _environments is None:
+        init_worker()
+    model = _load_model()
+    t0 = time.time()
+    t_start = time.perf_counter()
+    rng = random.Random(seed)
+
+    cache_before = _payloads.stats() if _payloads is not None else None
+    env, constellation, warm = _environments.acquire()
+    network = _shared.apply(constellation) if _shared is not None else None
+    t_setup = time.perf_counter()
+    router = model.routing(constellation)
+    stage_times = {"compression": 0.0, "fragmentation": 0.0, "candidates": 0.0, "inference": 0.0}
+    N_P, N_S = constellation.planes, constellation.sats_per_plane
+
+    def endpoint(value):
+        if value is None:
+            return rng.randint(0, N_P - 1), rng.randint(0, N_S - 1)
+        p, s = value
+        if not (0 <= p < N_P and 0 <= s < N_S):
+            raise ValueError(f"Satélite fuera de rango: ({p}, {s})")
+        return p, s
+
+    # Payloads sintéticos (aleatorios, reproducibles con seed); uno por tamaño distinto
+    synthetic = {}
+    payloads, ends = [], []
+    for flow in flows:
+        payload = flow.get("payload")
+        if payload is None:
+            size = flow["size"]
+            if size not in synthetic:
+                synthetic[size] = rng.randbytes(size)
+            payload = synthetic[size]
+        payloads.append(payload)
+        ends.append((endpoint(flow.get("src")), endpoint(flow.get("dst"))))
+
+    results = [None] * len(flows)
+    batches = []
+
+    def run_flow(i, routes):
+        flow = flows[i]
+        (src_p, src_s), (dst_p, dst_s) = ends[i]
+        simulator = TransmissionSimulator(env, constellation, router)
+        simulator.payload_cache = _payloads
+        results[i] = yield env.process(simulator.process_and_send(
+            payloads[i], src_p, src_s, dst_p, dst_s,
+            split_policy=flow.get("split_policy", "drl"), traffic_class=flow.get("traffic_class", "bulk"),
+            codec=flow.get("codec", "auto"), routes=routes,
+        ))
+        for stage, ms in simulator.stage_times.items():
+            stage_times[stage] += ms
+
+    def launcher():
+        started = []
+        order = sorted(range(len(flows)), key=lambda i: flows[i].get("start", 0.0))
+        for start, group in groupby(order, key=lambda i: flows[i].get("start", 0.0)):
+            yield env.timeout(max(0.0, start - env.now))
+            group = list(group)
+            # Candidatas de todos los flujos del instante y una única inferencia
+            t = time.perf_counter()
+            queries = [router.find_best_routes(*ends[i][0], *ends[i][1]) for i in group]
+            valid = [q for q in queries if q[0]]
+            stage_times["candidates"] += (time.perf_counter() - t) * 1000
+            t = time.perf_counter()
+            outputs = iter(model.forward_batch([q[1] for q in valid], [q[2] for q in valid]) if valid else [])
+            stage_times["inference"] += (time.perf_counter() - t) * 1000
+            batches.append(len(valid))
+            for i, (candidates, features, adj) in zip(group, queries):
+                routes = (candidates, features, adj, next(outputs)[0]) if candidates else None
+                started.append(env.process(run_flow(i, routes)))
+        yield env.all_of(started)
+
+    proc = env.process(launcher())
+    try:
+        _run_until(env, proc, deadline)
+    finally:
+        _environments.release()
+
+    report = _batch_report(flows, ends, results, constellation, batches, t0,
+                           {**warm, "ready": _environments.ready, "worker": os.getpid()}, network)
+    report["meta"]["stage_timings_ms"] = _stage_timings(stage_times, t_start, t_setup, time.perf_counter())
+    report["meta"]["payload_cache"] = _cache_report(cache_before)
+    return report
+
+
+def _batch_report(flows, ends, results, constellation, batches, t0, environment, network):
+    per_flow = []
+    for i, (flow, ((sp, ss), (dp, ds)), result) in enumerate(zip(flows, ends, results)):
+        start = flow.get("start", 0.0)
+        meta = result.get("meta", {})
+        entry = {"flow": flow.get("id", i), "src": [sp, ss], "dst": [dp, ds], "start": start,
+                 "status": result.get("status", "OK"), "reason": result.get("reason")}
+        if "completion_time" in meta:
+            entry.update({
+                "completion_time": meta["completion_time"],
+                "finish_time": start + meta["completion_time"],
+                "original_size": meta["original_size"],
+                "compressed_size": meta["compressed_size"],
+                "codec": meta["codec"],
+                "goodput_mbps": meta["goodput_mbps"],
+                "delivered_fragments": meta["delivered_fragments"],
+                "lost_fragments": meta["lost_fragments"],
+                "verified": meta["receiver"]["verified"],
+                "routes": len(result["routes"]),
+            })
+        per_flow.append(entry)
+
+    done = [f for f in per_flow if "completion_time" in f]
+    first = min((f["start"] for f in done), default=0.0)
+    makespan = max((f["finish_time"] for f in done), default=0.0) - first
+    completions = [f["completion_time"] for f in done]
+    delivered_bytes = sum(f["original_size"] for f in done if f["verified"])
+    return {
+        "meta": {
+            "flows": len(flows),
+            "completed": len(done),
+            "verified": sum(1 for f in done if f["verified"]),
+            "makespan": makespan,
+            # Bytes originales entregados y verificados / tiempo desde el primer arranque
+            "aggregate_goodput_mbps": (delivered_bytes * 8 / makespan) / 1e6 if makespan > 0 else 0.0,
+            "completion_mean": sum(completions) / len(completions) if completions else 0.0,
+            "completion_p50": consideraciones.Percentile(completions, 50),
+            "completion_p95": consideraciones.Percentile(completions, 95),
+            "completion_p99": consideraciones.Percentile(completions, 99),
+            "inference_batches": len(batches),
+            "inference_batch_sizes": batches,
+            "wall_time_ms": (time.time() - t0) * 1000,
+            "environment": environment,
+            "network_state": network,
+        },
+        "flows": per_flow,
+        "links": constellation.links.stats()[:20],  # los enlaces más cargados
+    }
+
+
+def _transmit(payload, codec, dictionary, deadline, listener=None, on_tick=None, with_simulator=False):
+    from transmisor import TransmissionSimulator
+
+    if _environments is None:
+        init_worker()
+    model = _load_model()
+    t0 = time.perf_counter()
+
+    # IMPORTANTE: cada simulación necesita su propia constelación para que el tiempo
+    # (env.now) empiece en 0; el pool las entrega ya construidas.
+    cache_before = _payloads.stats() if _payloads is not None else None
+    env, constellation, warm = _environments.acquire()
+    # Todas las simulaciones parten de la misma vista de la red (la del proceso dueño)
+    network = _shared.apply(constellation) if _shared is not None else None
+    t_setup = time.perf_counter()
+    # Contexto propio: el modelo se comparte, la constelación no
+    simulator = TransmissionSimulator(env, constellation, model.routing(constellation))
+    simulator.listener = listener
+    simulator.payload_cache = _payloads
+
+    src_p, src_s = random.randint(0, constellation.planes - 1), random.randint(0, constellation.sats_per_plane - 1)
+    dst_p, dst_s = random.randint(0, constellation.planes - 1), random.randint(0, constellation.sats_per_plane - 1)
+
+    # Se pasan los bytes tal cual (texto o binario): sin decodificar ni re-codificar
+    proc = env.process(simulator.process_and_send(
+        payload, src_p, src_s, dst_p, dst_s, codec=codec, dictionary=dictionary
+    ))
+    try:
+        _run_until(env, proc, deadline, (lambda: on_tick(simulator)) if on_tick else None)
+    finally:
+        _environments.release()
+
+    t_end = time.perf_counter()
+
+    result = proc.value
+    if result.get("status") == "FAILED":
+        raise TransmissionFailed(result["reason"])
+    meta = result["meta"]
+    meta["environment"] = {**warm, "ready": _environments.ready, "worker": os.getpid()}
+    meta["network_state"] = network
+    meta["stage_timings_ms"] = _stage_timings(simulator.stage_times, t0, t_setup, t_end)
+    meta["payload_cache"] = _cache_report(cache_before)
+    return (simulator, result) if with_simulator else result
+
+
+def _cache_report(before):
+    """Lo que hizo la caché de payloads durante una simulación (None si está desactivada)."""
+    if before is None:
+        return None
+    after = _payloads.stats()
+    delta = {k: after[k] - before[k] for k in ("hits", "disk_hits", "misses", "saved_ms", "saved_bytes")}
+    return {**delta, "entries": after["entries"], "bytes": after["bytes"], "worker": os.getpid()}
+
+
+def _stage_timings(stage_times, t0, t_setup, t_end):
+    """
+    Etapas del worker en ms. "simulation" es el tiempo de env.run sin las etapas que corren
+    dentro de process_and_send; "worker_total" permite al servidor deducir la espera en cola.
+    """
+    run_ms = (t_end - t_setup) * 1000
+    return {
+        "constellation_setup": (t_setup - t0) * 1000,
+        **stage_times,
+        "simulation": max(0.0, run_ms - sum(stage_times.values())),
+        "worker_total": (t_end - t0) * 1000,
+    }
+
+
+def _run_until(env, proc, deadline, on_tick=None):
+    """
+    Equivalente a env.run(until=proc), pero comprobando el plazo (y llamando a on_tick)
+    cada pocos eventos.
+    """
+    if deadline is None and on_tick is None:
+        env.run(until=proc)
+        return
+
+    steps = 0
+    while not proc.triggered:
+        try:
+            env.step()
+        except simpy.core.EmptySchedule:
+            raise RuntimeError("La simulación terminó sin completar la transmisión")
+        steps += 1
+        if steps % DEADLINE_CHECK_EVERY == 0:
+            if deadline is not None and time.time() > deadline:
+                raise SimulationTimeout("La simulación superó el tiempo máximo de la petición")
+            if on_tick is not None:
+                on_tick()
+    # Procesa el propio evento del proceso (propaga su excepción si falló)
+    while not proc.processed:
+        env.step()
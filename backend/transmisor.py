@@ -4,23 +4,35 @@ sys.path.append(os.path.join(os.path.dirname(__file__), "DRL-router"))
 
 import simpy
 import time
-import torch
 import json
 import random
+from array import array
+from collections import deque
+from itertools import repeat
 
 from satelites import ConstellationManager
-from router import IntelligentRouter
-
-# Importamos el módulo compilado de C++ (asumiendo que se llama cpp_core)
-try:
-    import cpp_core
-except ImportError:
-    print("[!] Error: No se encontró el módulo 'cpp_core'. Asegurate de compilar el binding.")
-    # Mock para que el código no falle si no has compilado aún
-    class MockCpp:
-        def compress(self, d): return d
-        def fragment(self, d, s): return [d[i:i+s] for i in range(0, len(d), s)]
-    cpp_core = MockCpp()
+from router import RouterModel
+import consideraciones
+# Clases de tráfico y políticas de reparto (en consideraciones: el servidor las valida sin torch)
+from consideraciones import TRAFFIC_CLASSES, SPLIT_POLICIES
+from receptor import Reassembler
+
+# Backend de compresión: cpp_core si está compilado, si no el respaldo en Python (misma API)
+from compresion import cpp_core, CHECKSUM, CODECS, compress_payload
+
+# Cabecera por fragmento en el enlace (id de transferencia, secuencia, offset, longitud, checksum)
+FRAGMENT_HEADER_BYTES = 24
+
+
+def fragment_view(table, pkt_id):
+    """
+    Vista (sin copia) del fragmento pkt_id de una tabla de _fragment_per_route: los datos son
+    porciones del buffer comprimido y la paridad, del buffer de paridad de _add_parity.
+    """
+    buf = table["data"] if pkt_id < table["n_data"] else table["parity"]
+    offset = table["offsets"][pkt_id]
+    return buf[offset : offset + table["lengths"][pkt_id]]
+
 
 class TransmissionSimulator:
     def __init__(self, env, constellation, router):
@@ -28,137 +40,493 @@ class TransmissionSimulator:
         self.constellation = constellation
         self.router = router
         self.transmission_log = [] # Aquí guardaremos todo para el Frontend
+        self.listener = None  # callable(tipo, datos): resultados progresivos (modo streaming)
+        self.payload_cache = None  # cache_compresion.PayloadCache: evita recomprimir payloads repetidos
+        # Tiempo de pared (ms) por etapa: compresión, fragmentación, candidatas, inferencia
+        self.stage_times = {"compression": 0.0, "fragmentation": 0.0, "candidates": 0.0, "inference": 0.0}
 
-    def process_and_send(self, raw_bytes, src_p, src_s, dst_p, dst_s):
+    def process_and_send(self, raw_bytes, src_p, src_s, dst_p, dst_s, split_policy="drl",
+                         adaptive=False, reroute_interval=None, traffic_class="bulk", deadline=None,
+                         codec="auto", fec=None, fec_code="cauchy", dictionary=None, routes=None):
         """
         Flujo principal: Comprime -> Fragmenta -> DRL Routing -> Simula Envío
+
+        split_policy: "drl" (ratios del modelo), "single" (todo por la ruta de menor delay),
+        "hops" (todo por la ruta de menos saltos) o "equal" (reparto uniforme). Las tres
+        últimas sirven como línea base.
+        adaptive: si es True, se vuelve a consultar al router cada `reroute_interval`
+        segundos de simulación (si se indica) y ante cada fallo de satélite, y los
+        fragmentos aún no enviados se reparten entre las nuevas candidatas.
+        traffic_class: clave de TRAFFIC_CLASSES; deadline sobrescribe el de la clase.
+        raw_bytes: cualquier objeto bytes-like (bytes, bytearray, memoryview); se comprime
+        sin copiarlo y los fragmentos son memoryviews sobre el buffer comprimido.
+        codec: uno de CODECS (ver compress_payload).
+        dictionary: nombre del diccionario para codec="lz4-dict" (None = DEFAULT_DICTIONARY).
+        fec: (k, m) para añadir m fragmentos de paridad por cada k de datos, repartidos
+        entre rutas para que la caída de una ruta se recupere sin retransmitir.
+        fec_code: "cauchy" (Reed-Solomon, hasta m pérdidas por grupo) o "xor" (m = 1).
+        routes: (candidatas, features, adj, ratios) ya calculados para la selección inicial
+        (p.ej. inferencia por lotes de muchos flujos); ratios=None los calcula aquí.
         """
+        if split_policy not in SPLIT_POLICIES:
+            raise ValueError(f"Política de reparto desconocida '{split_policy}'")
+        if traffic_class not in TRAFFIC_CLASSES:
+            raise ValueError(f"Clase de tráfico desconocida '{traffic_class}'")
+        qos = dict(TRAFFIC_CLASSES[traffic_class], name=traffic_class)
+        if deadline is not None:
+            qos["deadline"] = deadline
+
         if isinstance(raw_bytes, str):
             raw_bytes = raw_bytes.encode('utf-8')
 
-        print(f"\n[*] Iniciando transmisión de {len(raw_bytes)} bytes...")
+        original_size = memoryview(raw_bytes).nbytes
+        print(f"\n[*] Iniciando transmisión de {original_size} bytes...")
         
         # 1. PROCESAMIENTO HIBRIDO (C++)
-        # Convertir string a bytes
-        
-        original_size = len(raw_bytes)
         
+        if codec not in CODECS:
+            raise ValueError(f"Códec desconocido '{codec}'")
+
         t0 = time.time()
-        compressed = cpp_core.compress(raw_bytes)
-        # Fragmentar (ej. 1024 bytes por paquete para la simulación)
-        fragments = cpp_core.fragment(compressed, 1024) 
+        cache_entry = None
+        if self.payload_cache is not None:
+            compressed, codec, cache_entry = self.payload_cache.compress(raw_bytes, codec, dictionary)
+        else:
+            compressed, codec = compress_payload(raw_bytes, codec, dictionary)
         proc_time = (time.time() - t0) * 1000 # ms
+        self.stage_times["compression"] += proc_time
         
-        print(f"    -> Comprimido: {len(compressed)} bytes. Fragmentos: {len(fragments)}")
+        print(f"    -> Comprimido: {len(compressed)} bytes.")
+        self._emit("compressed", {"original_size": original_size, "compressed_size": len(compressed),
+                                  "codec": codec, "processing_time_ms": proc_time})
 
         # 2. SELECCIÓN DE RUTAS (DRL - Python)
-        candidates, features, adj = self.router.find_best_routes(src_p, src_s, dst_p, dst_s)
+        candidates, ratios_list = self._select_routes(src_p, src_s, dst_p, dst_s, split_policy, qos, len(compressed), routes)
         
         if not candidates:
             return {"status": "FAILED", "reason": "No routes found"}
 
-        # Obtener ratios del modelo
-        state_tensor = torch.tensor(features, dtype=torch.float32).to(self.router.device)
-        adj_tensor = adj.to(self.router.device) if adj is not None else None
-        
-        with torch.no_grad():
-            ratios, _ = self.router.agent(state_tensor, adj_tensor)
-            ratios_list = ratios.cpu().numpy().tolist()
-
-        # 3. DISTRIBUCIÓN DE PAQUETES (Multipath)
-        # Asignar fragmentos a rutas basado en el ratio (Weighted Round Robin simplificado)
-        assignments = []
-        total_frags = len(fragments)
-        
-        # Calcular cuántos paquetes van por cada ruta
-        counts = [int(r * total_frags) for r in ratios_list]
-        # Ajustar por errores de redondeo asignando el resto a la mejor ruta
-        while sum(counts) < total_frags:
-            counts[counts.index(max(counts))] += 1
-
-        frag_idx = 0
-        packets_in_flight = []
-
-        # Estructura para el frontend: Definir rutas activas
-        active_routes_info = []
-        
-        for route_idx, count in enumerate(counts):
-            route = candidates[route_idx]
-            route_fragments = fragments[frag_idx : frag_idx + count]
-            frag_idx += count
-            
-            if not route_fragments: continue
-
-            # Guardar info de ruta para frontend
-            active_routes_info.append({
-                "route_id": route_idx,
-                "path": route['enlaces'], # Lista ["S0_0-S0_1", ...]
-                "strategy": route['estrategia'],
-                "assigned_packets": len(route_fragments),
-                "ratio": ratios_list[route_idx],
-                "color": ["#00ff00", "#0000ff", "#ff0000"][route_idx % 3] # Hex colors para Three.js
-            })
+        # Fragmentar cada porción con el tamaño adecuado a su ruta
+        t0 = time.time()
+        route_fragments, fragment_sizes, table = self._fragment_per_route(compressed, candidates, ratios_list, cache_entry)
+        fragment_time = (time.time() - t0) * 1000 # ms
 
-            # Iniciar procesos de simulación para este grupo de fragmentos
-            for pkt_id, frag in enumerate(route_fragments):
-                p = self.env.process(
-                    self.simulate_packet_travel(
-                        pkt_id, frag, route, route_idx, len(route_fragments)
-                    )
-                )
-                packets_in_flight.append(p)
-            print(len(packets_in_flight))
-        
-        # MOVIDO FUERA DEL LOOP
-        if not packets_in_flight:
+        total_frags = table["n_data"]
+        print(f"    -> Fragmentos: {total_frags} (tamaños por ruta: {fragment_sizes})")
+        if not total_frags:
             return {
                 "status": "FAILED",
                 "reason": "No packets were scheduled for transmission"
             }
 
-        # Esperar a que todos los paquetes lleguen
-        yield simpy.AllOf(self.env, packets_in_flight)
+        # Paridad FEC repartida entre rutas
+        fec_info = None
+        if fec:
+            t0 = time.time()
+            route_fragments, fec_info = self._add_parity(route_fragments, candidates, table, fec, fec_code)
+            fragment_time += (time.time() - t0) * 1000 # ms
+        proc_time += fragment_time
+        self.stage_times["fragmentation"] += fragment_time
+
+        # 3. DISTRIBUCIÓN DE PAQUETES (Multipath)
+        # Estado de la transferencia: rutas activas (para el frontend), colas de
+        # fragmentos pendientes por ruta y contadores de entrega.
+        transfer = {
+            "routes": [],
+            "candidates": [],
+            "pending": [],
+            "sending": set(),
+            "outstanding": sum(len(frags) for frags in route_fragments),
+            "fragments": table,
+            "arrivals": {},  # id de fragmento -> latencia desde el inicio
+            # Receptor en el destino: conoce offsets, longitudes y checksums por id (cabeceras)
+            "receiver": Reassembler(len(compressed), table["offsets"], table["lengths"], total_frags,
+                                    table["checksums"], fec_info),
+            "reroutes": 0,
+            "qos": qos,
+            "done": self.env.event(),
+        }
+        start_time = self.env.now
+        transfer["start"] = start_time
+
+        for route, ratio, frags, size in zip(candidates, ratios_list, route_fragments, fragment_sizes):
+            if frags:
+                route_idx = self._enqueue_fragments(transfer, route, ratio, frags)
+                transfer["routes"][route_idx]["fragment_size"] = size
+                transfer["routes"][route_idx]["header_overhead"] = FRAGMENT_HEADER_BYTES / (size + FRAGMENT_HEADER_BYTES)
+        self._emit("routes", {"routes": transfer["routes"], "total_fragments": total_frags, "reroutes": 0})
+
+        if adaptive:
+            self.env.process(self._adaptive_controller(
+                transfer, src_p, src_s, dst_p, dst_s, split_policy, reroute_interval
+            ))
+
+        # Esperar a que todos los paquetes lleguen (o se pierdan)
+        yield transfer["done"]
         
-        print("[*] Transmisión completada.")
+        completion_time = self.env.now - start_time
+        print(f"[*] Transmisión completada en {completion_time:.4f}s (sim).")
+        delivery = self._delivery_report(transfer, fec_info)
+        receiver = transfer["receiver"]
+        receiver_report = receiver.finish(raw_bytes)
+        print(f"[*] Receptor: {'verificado' if receiver_report['verified'] else 'INCOMPLETO o distinto'} "
+              f"(profundidad de reordenamiento {receiver_report['reorder_depth']}, "
+              f"pico de buffer {receiver_report['buffer_high_water_bytes']} bytes)")
         
         # 4. PREPARAR RESPUESTA PARA LA API / FRONTEND
+        active_routes_info = transfer["routes"]
+        used_links = [l for info in active_routes_info for l in info['path']]
         response_payload = {
             "meta": {
                 "original_size": original_size,
                 "compressed_size": len(compressed),
+                "codec": codec,
+                "dictionary": cpp_core.dictionary_id(compressed) if codec == "lz4-dict" else None,
                 "processing_time_ms": proc_time,
-                "total_fragments": total_frags
+                "stage_timings_ms": dict(self.stage_times),
+                "total_fragments": total_frags,
+                "fragment_sizes": [size for frags, size in zip(route_fragments, fragment_sizes) if frags],
+                "fragment_header_bytes": FRAGMENT_HEADER_BYTES,
+                "checksum": CHECKSUM,
+                "wire_bytes": sum(table["lengths"]) + FRAGMENT_HEADER_BYTES * len(table["lengths"]),
+                "split_policy": split_policy,
+                "adaptive": adaptive,
+                "reroutes": transfer["reroutes"],
+                "completion_time": completion_time,
+                "delivered_fragments": delivery["delivered_fragments"],
+                "lost_fragments": delivery["lost_fragments"],
+                "throughput_mbps": (len(compressed) * 8 / completion_time) / 1e6 if completion_time > 0 else 0.0,
+                "goodput_mbps": (delivery["delivered_bytes"] * 8 / completion_time) / 1e6 if completion_time > 0 else 0.0,
+                # Extremo a extremo: bytes originales útiles / tiempo hasta tener el payload completo
+                "end_to_end_goodput_mbps": (original_size * 8 / receiver.complete_at) / 1e6
+                    if receiver_report["verified"] and receiver.complete_at else 0.0,
+                "receiver": receiver_report,
+                "fec": delivery["fec"],
+                "qos": self._qos_report(transfer, delivery)
             },
             "routes": active_routes_info,
+            "links": self.constellation.links.stats(used_links), # Utilización y colas por enlace
             "timeline": self.transmission_log # Lista cronológica de eventos para animación
         }
         
         return response_payload
 
-    def simulate_packet_travel(self, pkt_id, data, route, route_idx, total_in_group):
+    def _select_routes(self, src_p, src_s, dst_p, dst_s, split_policy, qos, payload_bytes, routes=None):
+        """
+        Consulta al router y devuelve (candidatas, ratios) según la política de reparto.
+        Las clases urgentes ignoran el split_policy y llenan primero las rutas de menor delay.
+        routes: consulta ya resuelta (candidatas, features, adj, ratios del modelo o None).
+        """
+        if routes is not None:
+            candidates, features, adj, model_ratios = routes
+        else:
+            t0 = time.time()
+            candidates, features, adj = self.router.find_best_routes(src_p, src_s, dst_p, dst_s)
+            self.stage_times["candidates"] += (time.time() - t0) * 1000
+            model_ratios = None
+        
+        if not candidates:
+            return None, None
+
+        if qos["scheduling"] == "delay":
+            return candidates, consideraciones.EarliestFinishSplit(
+                payload_bytes,
+                [c['delay'] for c in candidates],
+                [c['throughput'] for c in candidates],
+            )
+
+        if split_policy == "single":
+            best = min(range(len(candidates)), key=lambda i: candidates[i]['delay'])
+            return candidates, [1.0 if i == best else 0.0 for i in range(len(candidates))]
+        if split_policy == "hops":
+            best = min(range(len(candidates)), key=lambda i: candidates[i]['hops'])
+            return candidates, [1.0 if i == best else 0.0 for i in range(len(candidates))]
+        if split_policy == "equal":
+            return candidates, [1.0 / len(candidates)] * len(candidates)
+
+        # Obtener ratios del modelo
+        if model_ratios is None:
+            t0 = time.time()
+            model_ratios, _ = self.router.model.forward(features, adj)
+            self.stage_times["inference"] += (time.time() - t0) * 1000
+        return candidates, model_ratios.cpu().numpy().tolist()
+
+    def _fragment_per_route(self, compressed, candidates, ratios_list, cache_entry=None):
+        """
+        Divide el buffer comprimido en porciones contiguas proporcionales a los ratios
+        y fragmenta cada una con un tamaño según el BDP de su ruta.
+        Devuelve (ids de fragmento por candidata como range, tamaño por candidata, tabla).
+        La tabla no crea un objeto por fragmento: el buffer comprimido y arreglos contiguos
+        de offsets ("Q"), longitudes ("Q") y checksums ("I", ver CHECKSUM) indexados por id;
+        fragment_view(tabla, id) da la vista de un fragmento cuando hace falta.
+        Los ids siguen el orden del buffer para poder reensamblar.
+        cache_entry: entrada de payload_cache; reutiliza los índices de fragmentación ya hechos.
+        """
+        byte_counts = consideraciones.LargestRemainder(len(compressed), ratios_list)
+        view = memoryview(compressed)  # las porciones son vistas, no copias
+        table = {"data": view, "parity": None, "n_data": 0,
+                 "offsets": array("Q"), "lengths": array("Q"), "checksums": array("I")}
+        route_fragments, fragment_sizes = [], []
+        offset, next_id = 0, 0
+        for route, count in zip(candidates, byte_counts):
+            size = consideraciones.FragmentSize(
+                route['throughput'], route['delay'], count, header_bytes=FRAGMENT_HEADER_BYTES
+            )
+            n = -(-count // size)
+            if n:
+                # Una sola pasada en C++ para los checksums de todos los fragmentos de la porción
+                if cache_entry is not None:
+                    _, _, _, crcs = self.payload_cache.fragment_index(cache_entry, view, offset, count, size)
+                else:
+                    _, _, _, crcs = cpp_core.fragment_index(view[offset : offset + count], size)
+                table["checksums"].frombytes(memoryview(crcs).cast("B"))
+                table["offsets"].extend(range(offset, offset + count, size))
+                table["lengths"].extend(repeat(size, n - 1))
+                table["lengths"].append(count - (n - 1) * size)
+            route_fragments.append(range(next_id, next_id + n))
+            fragment_sizes.append(size)
+            offset += count
+            next_id += n
+        table["n_data"] = next_id
+        return route_fragments, fragment_sizes, table
+
+    def _add_parity(self, route_fragments, candidates, table, fec, fec_code):
+        """
+        Agrupa los fragmentos de datos en grupos de k tomándolos por turnos de cada ruta
+        (así un grupo abarca varias rutas) y genera m fragmentos de paridad por grupo.
+        Cada paridad va a la ruta que menos fragmentos lleva de ese grupo.
+        Los ids de paridad empiezan en n_data: se añaden a la tabla con un único buffer de
+        paridad y sus checksums se calculan en una sola llamada al final.
+        Devuelve (ids por ruta, info FEC).
+        """
+        k, m = fec
+        if not hasattr(cpp_core, "fec_encode"):
+            print("[!] FEC no disponible sin cpp_core: se envía sin paridad.")
+            return route_fragments, None
+
+        active = [i for i, frags in enumerate(route_fragments) if frags]
+        interleaved = []
+        for depth in range(max(len(route_fragments[i]) for i in active)):
+            for i in active:
+                if depth < len(route_fragments[i]):
+                    interleaved.append((i, route_fragments[i][depth]))
+
+        by_delay = sorted(active, key=lambda i: candidates[i]['delay'])
+        new_routes = [[] for _ in route_fragments]
+        parity_buf = bytearray()
+        parity_offsets, parity_lengths = array("Q"), array("Q")
+        groups, next_id = [], table["n_data"]
+        for g in range(0, len(interleaved), k):
+            members = interleaved[g : g + k]
+            parity = cpp_core.fec_encode([fragment_view(table, pkt_id) for _, pkt_id in members], m, fec_code)
+
+            load = {i: 0 for i in active}
+            for route_pos, pkt_id in members:
+                new_routes[route_pos].append(pkt_id)
+                load[route_pos] += 1
+
+            parity_ids = []
+            for shard in parity:
+                target = min(by_delay, key=lambda i: load[i])
+                new_routes[target].append(next_id)
+                parity_offsets.append(len(parity_buf))
+                parity_lengths.append(len(shard))
+                parity_buf += shard
+                load[target] += 1
+                parity_ids.append(next_id)
+                next_id += 1
+            groups.append(([pkt_id for _, pkt_id in members], parity_ids))
+
+        table["parity"] = memoryview(parity_buf)
+        table["offsets"].extend(parity_offsets)
+        table["lengths"].extend(parity_lengths)
+        crcs = cpp_core.crc32c_fragments(parity_buf, parity_offsets, parity_lengths)
+        table["checksums"].frombytes(memoryview(crcs).cast("B"))
+        parity_bytes = len(parity_buf)
+
+        return new_routes, {"k": k, "m": m, "code": fec_code, "groups": groups, "parity_bytes": parity_bytes}
+
+    def _assign_fragments(self, transfer, candidates, ratios_list, fragments):
+        """
+        Reparte `fragments` (lista de ids) entre las candidatas con
+        largest-remainder sobre los ratios. Los fragmentos conservan su tamaño original.
+        """
+        counts = consideraciones.LargestRemainder(len(fragments), ratios_list)
+        frag_idx = 0
+        for route, ratio, count in zip(candidates, ratios_list, counts):
+            if not count:
+                continue
+            self._enqueue_fragments(transfer, route, ratio, fragments[frag_idx : frag_idx + count])
+            frag_idx += count
+
+    def _enqueue_fragments(self, transfer, route, ratio, fragments):
+        """
+        Encola fragmentos en una ruta y arranca su emisor si no está activo.
+        Una candidata con el mismo camino que una ruta ya activa reutiliza su índice.
+        """
+        route_idx = self._route_index(transfer, route, ratio)
+        transfer["pending"][route_idx].extend(fragments)
+
+        if route_idx not in transfer["sending"]:
+            transfer["sending"].add(route_idx)
+            self.env.process(self._route_sender(transfer, route_idx))
+        return route_idx
+
+    def _emit(self, kind, data):
+        if self.listener is not None:
+            self.listener(kind, data)
+
+    def _route_index(self, transfer, route, ratio):
+        for route_idx, info in enumerate(transfer["routes"]):
+            if info["path"] == route['enlaces']:
+                info["ratio"] = ratio
+                return route_idx
+
+        route_idx = len(transfer["routes"])
+        # Guardar info de ruta para frontend
+        transfer["routes"].append({
+            "route_id": route_idx,
+            "path": route['enlaces'], # Lista ["S0_0-S0_1", ...]
+            "strategy": route['estrategia'],
+            "assigned_packets": 0,
+            "ratio": ratio,
+            "color": ["#00ff00", "#0000ff", "#ff0000"][route_idx % 3] # Hex colors para Three.js
+        })
+        transfer["candidates"].append(route)
+        transfer["pending"].append(deque())
+        return route_idx
+
+    def _delivery_report(self, transfer, fec_info):
+        """
+        Cuenta fragmentos de datos entregados, recuperados por FEC en el receptor y perdidos.
+        Los datos recuperados cuentan como llegados cuando el receptor los reconstruyó.
+        """
+        arrivals = transfer["arrivals"]
+        table = transfer["fragments"]
+        n_data, lengths = table["n_data"], table["lengths"]
+        latencies = {pkt_id: arrivals[pkt_id] for pkt_id in range(n_data) if pkt_id in arrivals}
+        delivered = len(latencies)
+        recovered = 0
+        for pkt_id, t in transfer["receiver"].recovered.items():
+            recovered += pkt_id not in latencies
+            latencies[pkt_id] = min(t, latencies.get(pkt_id, t))
+
+        fec_report = None
+        if fec_info:
+            data_bytes = table["data"].nbytes
+            fec_report = {
+                "k": fec_info["k"],
+                "m": fec_info["m"],
+                "code": fec_info["code"],
+                "groups": len(fec_info["groups"]),
+                "parity_fragments": sum(len(p) for _, p in fec_info["groups"]),
+                "parity_bytes": fec_info["parity_bytes"],
+                "overhead": fec_info["parity_bytes"] / data_bytes if data_bytes else 0.0,
+                "recovered_fragments": recovered,
+            }
+
+        return {
+            "delivered_fragments": delivered,
+            "recovered_fragments": recovered,
+            "lost_fragments": n_data - len(latencies),
+            "delivered_bytes": sum(lengths[i] for i in latencies),
+            "latencies": list(latencies.values()),
+            "fec": fec_report,
+        }
+
+    def _qos_report(self, transfer, delivery):
+        """Percentiles de latencia por fragmento y tasa de incumplimiento del deadline."""
+        qos = transfer["qos"]
+        latencies = delivery["latencies"]
+        report = {
+            "class": qos["name"],
+            "priority": qos["priority"],
+            "deadline": qos["deadline"],
+            "latency_p50": consideraciones.Percentile(latencies, 50),
+            "latency_p95": consideraciones.Percentile(latencies, 95),
+            "latency_p99": consideraciones.Percentile(latencies, 99),
+            "deadline_miss_rate": None,
+        }
+        if qos["deadline"] is not None:
+            total = len(latencies) + delivery["lost_fragments"]
+            missed = sum(1 for l in latencies if l > qos["deadline"]) + delivery["lost_fragments"]
+            report["deadline_miss_rate"] = missed / total if total else 0.0
+        return report
+
+    def _route_sender(self, transfer, route_idx):
+        """
+        Emisor de una ruta: saca fragmentos de su cola pendiente al ritmo de línea del
+        primer enlace. Lo que sigue en la cola aún no se ha enviado y puede reasignarse.
+        """
+        route = transfer["candidates"][route_idx]
+        info = transfer["routes"][route_idx]
+        queue = transfer["pending"][route_idx]
+        lengths = transfer["fragments"]["lengths"]
+        first_hop = route['enlaces'][0].split('-')[1] if route['enlaces'] else None
+
+        while queue:
+            pkt_id = queue.popleft()
+            info["assigned_packets"] += 1
+            self.env.process(self.simulate_packet_travel(pkt_id, route, route_idx, transfer))
+
+            bw = self.constellation.satellites[first_hop].available_bandwidth if first_hop else 0.0
+            wire_bits = (lengths[pkt_id] + FRAGMENT_HEADER_BYTES) * 8
+            yield self.env.timeout(wire_bits / (bw * 1e6) if bw > 0 else 0)
+
+        transfer["sending"].discard(route_idx)
+
+    def _adaptive_controller(self, transfer, src_p, src_s, dst_p, dst_s, split_policy, reroute_interval):
+        """Re-consulta al router por intervalo o fallo y reasigna los fragmentos no enviados."""
+        while any(transfer["pending"]):
+            triggers = [transfer["done"], self.constellation.failure_event]
+            if reroute_interval:
+                triggers.append(self.env.timeout(reroute_interval))
+            yield self.env.any_of(triggers)
+
+            if transfer["done"].triggered:
+                return
+
+            pending = sorted(pkt_id for queue in transfer["pending"] for pkt_id in queue)
+            if not pending:
+                return
+
+            lengths = transfer["fragments"]["lengths"]
+            pending_bytes = sum(lengths[pkt_id] for pkt_id in pending)
+            candidates, ratios_list = self._select_routes(
+                src_p, src_s, dst_p, dst_s, split_policy, transfer["qos"], pending_bytes
+            )
+            if not candidates:
+                continue  # Sin alternativas: se mantiene la asignación actual
+
+            for queue in transfer["pending"]:
+                queue.clear()
+
+            transfer["reroutes"] += 1
+            self._assign_fragments(transfer, candidates, ratios_list, pending)
+            self.transmission_log.append({
+                "time": self.env.now,
+                "type": "REROUTE",
+                "pending_packets": len(pending),
+                "routes": [info["route_id"] for info, q in zip(transfer["routes"], transfer["pending"]) if q]
+            })
+            self._emit("routes", {"routes": transfer["routes"], "total_fragments": transfer["fragments"]["n_data"],
+                                  "reroutes": transfer["reroutes"]})
+
+    def simulate_packet_travel(self, pkt_id, route, route_idx, transfer):
         """
         Simula el paso del paquete nodo por nodo para generar eventos de animación.
+        Cada enlace es un recurso con cola compartido con el resto de paquetes y flujos.
+        Los bytes del fragmento solo se leen al entregarlo (vista sobre la tabla de fragmentos).
         """
         path_links = route['enlaces']
+        table = transfer["fragments"]
         if not path_links:
             print("theres no link")
             yield self.env.timeout(0)  # <-- Esto desbloquea SimPy correctamente
+            transfer["receiver"].receive(pkt_id, fragment_view(table, pkt_id), self.env.now - transfer["start"])
+            self._packet_finished(transfer, pkt_id, delivered=True)
             return
 
-        # Calcular latencia total de la ruta (simplificado, idealmente es hop-by-hop)
-        # Usamos los datos pre-calculados del router para velocidad
-
-        total_delay = route['delay'] 
-        hop_delay = total_delay / len(path_links)
-        throughput = route['throughput'] # Mbps
-        if throughput == 0:
-            
-            print("[*]DEBUG: throughput es 0")
-        
-        # Tiempo de serialización (tamaño / ancho de banda)
-        packet_size_bits = len(data) * 8
-        serialization_time = packet_size_bits / (throughput * 1e6)
-        
         current_time = self.env.now
         
         # FRONTEND: Evento de Salida
@@ -171,11 +539,23 @@ class TransmissionSimulator:
         })
 
         # Simular viaje hop-by-hop
-        for i, link in enumerate(path_links):
-            u, v = link.split('-')
+        for link_id in path_links:
+            link = self.constellation.links.get(link_id)
             
-            # Simular tiempo de viaje en este enlace
-            yield self.env.timeout(hop_delay + serialization_time)
+            # Cola + serialización + propagación en este enlace
+            queue_delay = yield from link.transmit(table["lengths"][pkt_id] + FRAGMENT_HEADER_BYTES, transfer["qos"]["priority"])
+
+            if queue_delay is None:
+                # FRONTEND: el paquete se pierde en un enlace caído
+                self.transmission_log.append({
+                    "time": self.env.now,
+                    "type": "PACKET_LOST",
+                    "route_idx": route_idx,
+                    "packet_id": pkt_id,
+                    "location": link_id.split('-')[0]
+                })
+                self._packet_finished(transfer, pkt_id, delivered=False)
+                return
             
             # FRONTEND: Evento de llegada a un nodo intermedio (Hop)
             self.transmission_log.append({
@@ -183,10 +563,20 @@ class TransmissionSimulator:
                 "type": "PACKET_HOP",
                 "route_idx": route_idx,
                 "packet_id": pkt_id,
-                "location": v # Nodo actual
+                "location": link_id.split('-')[1], # Nodo actual
+                "queue_delay": queue_delay
             })
 
-        print(f"[DEBUG] Paquete {pkt_id} por ruta {route_idx} completado.")
+        transfer["receiver"].receive(pkt_id, fragment_view(table, pkt_id), self.env.now - transfer["start"])
+        self._packet_finished(transfer, pkt_id, delivered=True)
+
+    def _packet_finished(self, transfer, pkt_id, delivered):
+        if delivered:
+            transfer["arrivals"][pkt_id] = self.env.now - transfer["start"]
+
+        transfer["outstanding"] -= 1
+        if transfer["outstanding"] == 0:
+            transfer["done"].succeed()
 
 # --- BLOQUE DE EJECUCIÓN  ---
 
@@ -196,7 +586,7 @@ if __name__ == "__main__":
     constellation = ConstellationManager(env)
     
     # Cargar Router (Modo Inferencia)
-    router = IntelligentRouter(constellation, train_mode=False)
+    router = RouterModel().routing(constellation)
     
     
     transmitter = TransmissionSimulator(env, constellation, router)
@@ -208,7 +598,7 @@ if __name__ == "__main__":
     
     # Capturar resultado con contexto de función
     result_json = [None] 
-    test_data = "test" * 50000
+    test_data = b"test" * 50000
     def capture_result():
         # Asignamos el resultado del yield a la lista
         result_json[0] = yield env.process(transmitter.process_and_send(test_data,src_p, src_s, dst_p, dst_s))